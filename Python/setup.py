@@ -15,6 +15,10 @@ setup(
         "asyncua>=1.0.0",
         "pyserial>=3.5",
     ],
+    extras_require={
+        "telemetry": ["numpy"],
+        "test": ["pytest>=7.0"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
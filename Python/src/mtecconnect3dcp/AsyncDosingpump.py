@@ -0,0 +1,14 @@
+from .AsyncOPCUAMachine import AsyncOPCUAMachine
+from .Dosingpump import Dosingpump
+
+class AsyncDosingpump(AsyncOPCUAMachine):
+    """
+    Class for controlling a dosing pump via OPC-UA with asyncio.
+    Inherits from AsyncOPCUAMachine.
+
+    Readable properties (e.g. 'run', 'speed', 'm_speed', 'cleaning', 's_ready') are the same as
+    for Dosingpump and return awaitables.
+    Values are changed with 'set_run()', 'set_speed()' and 'set_cleaning()'.
+    """
+    _model = "flow-matic PX"
+    _properties = Dosingpump._properties
@@ -0,0 +1,10 @@
+from .AsyncMixingpump import AsyncMixingpump
+
+class AsyncDuomix(AsyncMixingpump):
+    """
+    AsyncDuomix
+
+    Asyncio client class for m-tec Duo-Mix 3DCP machines (Mixingpump).
+    Inherits from AsyncMixingpump.
+    """
+    _model = "duo-mix 3DCP"
@@ -0,0 +1,11 @@
+from .AsyncDuomix import AsyncDuomix
+from .AsyncMixingpumpPlus import AsyncMixingpumpPlus
+
+class AsyncDuomixPlus(AsyncDuomix, AsyncMixingpumpPlus):
+    """
+    AsyncDuomixPlus
+
+    Asyncio client class for m-tec Duo-Mix 3DCP+ machines (Mixingpump).
+    Inherits from AsyncDuomix and AsyncMixingpumpPlus.
+    """
+    _model = "duo-mix 3DCP+"
@@ -0,0 +1,68 @@
+from .AsyncOPCUAMachine import AsyncOPCUAMachine
+from .Mixingpump import Mixingpump
+
+class AsyncMixingpump(AsyncOPCUAMachine):
+    """
+    Class for controlling a mixing pump via OPC-UA with asyncio.
+    Inherits from AsyncOPCUAMachine.
+
+    Readable properties (e.g. 'run', 'speed', 'm_speed', 's_error', 's_ready') are the same as
+    for Mixingpump and return awaitables. Writable properties are changed with 'set_...' coroutines
+    (e.g. 'await mp.set_speed(35)').
+    """
+    _properties = Mixingpump._properties
+
+    @property
+    def s_pumping(self):
+        """
+        Awaitable bool: True if the mixingpump is running.
+        """
+        return self._s_pumping()
+
+    async def _s_pumping(self) -> bool:
+        values = await self.read_many(["aut_mixingpump_net", "aut_mixingpump_fc"])
+        return bool(values["aut_mixingpump_net"] or values["aut_mixingpump_fc"])
+
+    async def setDigital(self, pin: int, value: bool):
+        """
+        Changes the state of a digital output.
+
+        Args:
+            pin (int): Pin number.
+            value (bool): True for high, False for low.
+        """
+        await self.change(f"reserve_DO_{pin}", value, "bool")
+
+    async def getDigital(self, pin: int) -> bool:
+        """
+        Reads the state of a digital input.
+
+        Args:
+            pin (int): Pin number.
+
+        Returns:
+            bool: True for high, False for low.
+        """
+        return await self.read(f"reserve_DI_{pin}")
+
+    async def setAnalog(self, pin: int, value: int):
+        """
+        Changes the state of an analog output.
+
+        Args:
+            pin (int): Pin number.
+            value (int): Value to set (0 to 65535).
+        """
+        await self.change(f"reserve_AO_{pin}", value, "uint16")
+
+    async def getAnalog(self, pin: int) -> int:
+        """
+        Reads the state of an analog input.
+
+        Args:
+            pin (int): Pin number.
+
+        Returns:
+            int: Actual value (0 - 65535).
+        """
+        return await self.read(f"reserve_AI_{pin}")
@@ -0,0 +1,12 @@
+from .MixingpumpPlus import MixingpumpPlus
+
+class AsyncMixingpumpPlus():
+    """
+    Asyncio class extension for m-tec Mixingpump 3DCP+ machines.
+    Combined with AsyncMixingpump in AsyncDuomixPlus and AsyncSmpPlus.
+
+    Readable properties (e.g. 'm_pressure', 'm_water', 's_fc') are the same as for
+    MixingpumpPlus and return awaitables.
+    Values are changed with 'set_dosingpump()', 'set_dosingspeed()' and 'set_water()'.
+    """
+    _properties = MixingpumpPlus._properties
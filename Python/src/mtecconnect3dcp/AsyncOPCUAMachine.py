@@ -0,0 +1,361 @@
+from asyncua import Client, ua #https://github.com/FreeOpcUa/asyncua
+
+import asyncio
+from typing import Optional, Callable, Any, Union, Dict, List, Tuple
+
+from .OPCUAMachine import _endpoint_url, _to_variants, _properties, _variables, _convert_results
+from .Parameter import Parameter, ENCODERS
+from .SubscriptionManager import MonitoringOptions
+
+class AsyncOPCUAMachine:
+    """
+    Base class for OPC-UA machine communication with asyncio.
+
+    Uses the asynchronous asyncua client directly (one session, no extra thread).
+    Readable properties return awaitables (e.g. 'await machine.m_speed'), values are
+    changed with the 'set_...' coroutines (e.g. 'await machine.set_speed(35)').
+
+    Args:
+        baseNode (str): Base node of the machine.
+        livebitNode (str): Livebit variable written by the client.
+    """
+    # Same format as OPCUAMachine._properties, the awaitable properties and the 'set_...' coroutines of writable Parameters are generated from it.
+    _properties: Dict[str, Parameter] = {}
+    _model: Optional[str] = None
+
+    def __init__(self, baseNode = "ns=4;s=|var|B-Fortis CC-Slim S04.Application.GVL_OPC.", livebitNode = "Livebit2machine"):
+        self._baseNode = baseNode
+        self._liveBitNode = livebitNode
+        self._connected = False
+        self._client: Optional[Client] = None
+        self._node_cache = {}
+        self._livebit_subscription = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, parameter in _properties(cls).items():
+            if not any(name in base.__dict__ for base in cls.__mro__):
+                setattr(cls, name, _awaitable_property(parameter))
+            if parameter.writable and not any("set_" + name in base.__dict__ for base in cls.__mro__):
+                setattr(cls, "set_" + name, _setter_coroutine(name, parameter))
+
+    async def connect(self, ip: str):
+        """
+        Connects to the machine using the provided IP address.
+
+        Args:
+            ip (str): IP address of the machine.
+        """
+        self._ip = _endpoint_url(ip)
+        self._client = Client(url=self._ip)
+        await self._client.connect()
+        self._node_cache = {}
+        self._connected = True
+
+        # check if Livebit2machine exists, otherwise use Livebit2DuoMix
+        try:
+            await self.read(self._liveBitNode)
+        except ua.UaError:
+            self._liveBitNode = "Livebit2DuoMix"
+        # check if Livebit2DuoMix exists, otherwise throw error
+        try:
+            await self.read(self._liveBitNode)
+        except ua.UaError:
+            await self.disconnect()
+            raise ValueError("Livebit node not found. Machine not supported.")
+
+        self._livebit_subscription = await self._client.create_subscription(500, _LivebitHandler(self))
+        await self._livebit_subscription.subscribe_data_change(self._node("Livebit2extern"))
+
+    async def disconnect(self):
+        """
+        Disconnects from the machine.
+        """
+        self._connected = False
+        self._livebit_subscription = None
+        self._node_cache = {}
+        await self._client.disconnect()
+
+    async def __aenter__(self) -> "AsyncOPCUAMachine":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._connected:
+            await self.disconnect()
+
+    def _node(self, parameter: str):
+        node = self._node_cache.get(parameter)
+        if node is None:
+            node = self._client.get_node(self._baseNode + parameter)
+            self._node_cache[parameter] = node
+        return node
+
+    async def change(self, parameter: str, value: Any, typ: str):
+        """
+        Changes the value of an OPC-UA variable.
+
+        Args:
+            parameter (str): Variable to change.
+            value (Any): Value to change the variable to.
+            typ (str): String of variable type ("bool", "uint16", "int32", "float").
+        """
+        encode = ENCODERS.get(typ)
+        if encode is None:
+            return
+        await self._write(parameter, encode(value))
+
+    async def _write(self, parameter: str, variant: ua.Variant):
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        await self._node(parameter).write_value(variant)
+
+    async def change_many(self, values: Dict[str, Any]) -> Dict[str, ua.StatusCode]:
+        """
+        Changes several OPC-UA variables with a single OPC-UA write request, so the machine receives them in the same cycle.
+
+        Args:
+            values (Dict[str, Any]): Variable -> (value, type), type as for change() ("bool", "uint16", "int32", "float"),
+                or writable property name -> value in the unit of the property (e.g. {'speed': 35, 'water': 120}).
+
+        Returns:
+            Dict[str, ua.StatusCode]: Status code of the write by variable (check with 'status.is_good()').
+
+        Raises:
+            ValueError: If a type is unknown or a value is out of range.
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        parameters, variants = _to_variants(values, _properties(type(self)))
+        if not parameters:
+            return {}
+        results = await self._client.write_values([self._node(parameter) for parameter in parameters], variants, raise_on_partial_error=False)
+        return dict(zip(parameters, results))
+
+    async def safe_change(self, parameter: str, value: Any, typ: str) -> bool:
+        """
+        Changes the value of an OPC-UA variable, with feature-not-supported feedback.
+
+        Args:
+            parameter (str): Variable to change.
+            value (Any): Value to change the variable to.
+            typ (str): String of variable type ("bool", "uint16", "int32", "float").
+
+        Returns:
+            bool: True if successful, False if not supported.
+        """
+        try:
+            await self.change(parameter, value, typ)
+            return True
+        except ua.UaStatusCodeError:
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return False
+
+    async def read(self, parameter: str) -> Any:
+        """
+        Reads the value of an OPC-UA variable.
+
+        Args:
+            parameter (str): Variable to read.
+
+        Returns:
+            Any: Value of the variable.
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        return await self._node(parameter).read_value()
+
+    async def safe_read(self, parameter: str, default: Any) -> Any:
+        """
+        Reads the value of an OPC-UA variable, with feature-not-supported feedback.
+
+        Args:
+            parameter (str): Variable to read.
+            default: Value to return if parameter is not available.
+
+        Returns:
+            Any: Value of the variable or default if not available.
+        """
+        try:
+            return await self.read(parameter)
+        except ua.UaStatusCodeError:
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return default
+
+    async def read_many(self, parameters: List[str], convert: bool = True) -> Dict[str, Any]:
+        """
+        Reads several OPC-UA variables with a single OPC-UA read request.
+
+        Args:
+            parameters (List[str]): Variables to read.
+            convert (bool): Whether to convert the values the same way the properties do (Hz scaling, inverted flags). Default is True.
+
+        Returns:
+            Dict[str, Any]: Values by variable. Variables not supported by the machine get the property default (or None).
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        parameters = list(dict.fromkeys(parameters))
+        if not parameters:
+            return {}
+        results = await self._client.read_attributes([self._node(parameter) for parameter in parameters], ua.AttributeIds.Value)
+        return _convert_results(type(self), parameters, results, convert)
+
+    async def snapshot(self, properties: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Reads the values of several properties with a single OPC-UA read request.
+
+        Args:
+            properties (List[str], optional): Property names (e.g. 'm_speed', 's_ready'). Defaults to all readable properties of the machine.
+
+        Returns:
+            Dict[str, Any]: Converted values by property name.
+        """
+        table = _properties(type(self))
+        if properties is None:
+            properties = list(table)
+        values = await self.read_many([table[name].variable for name in properties])
+        return {name: values[table[name].variable] for name in properties}
+
+    def subscribe(self, parameter: Union[str, List[str]], interval: int = 500, convert: bool = True, max_queue: int = 1000, options: Optional[MonitoringOptions] = None) -> "AsyncSubscription":
+        """
+        Subscribes to OPC-UA parameters. Iterate the result with 'async for parameter, value in ...'.
+
+        Args:
+            parameter (Union[str, List[str]]): The OPC-UA parameter(s) to subscribe to.
+            interval (int): Interval in ms for checking the parameters.
+            convert (bool): Whether to convert the values the same way the properties do. Default is True.
+            max_queue (int): Maximum number of pending notifications, the oldest are dropped. Default is 1000.
+            options (MonitoringOptions, optional): Deadband, sampling interval and queue options. Defaults to None (every change, fastest sampling).
+
+        Returns:
+            AsyncSubscription: Async iterator of (parameter, value) tuples.
+        """
+        parameters = [parameter] if isinstance(parameter, str) else list(parameter)
+        return AsyncSubscription(self, parameters, interval, convert, max_queue, options)
+
+    async def changeLivebit(self, value: bool, parameter=None):
+        """
+        Changes the Livebit value.
+
+        Args:
+            value (bool): The value to change the Livebit to.
+            parameter: Unused, for callback compatibility.
+        """
+        await self.change(self._liveBitNode, value, "bool")
+
+    async def _read_property(self, parameter: Parameter) -> Any:
+        if parameter.default is None:
+            value = await self.read(parameter.variable)
+        else:
+            value = await self.safe_read(parameter.variable, parameter.default)
+        return parameter.decode(value) if parameter.decode is not None and value is not None else value
+
+def _awaitable_property(parameter: Parameter) -> property:
+    """
+    Creates a read-only property returning an awaitable of the decoded value of a Parameter.
+    """
+    def getter(self):
+        return self._read_property(parameter)
+    return property(getter, doc=f"Awaitable value of '{parameter.variable}'.")
+
+def _setter_coroutine(name: str, parameter: Parameter) -> Callable:
+    """
+    Creates the 'set_...' coroutine of a writable Parameter.
+    """
+    variable, encode, default = parameter.variable, parameter.encode, parameter.default
+    async def setter(self, value: Any):
+        variant = encode(value)
+        if default is None:
+            await self._write(variable, variant)
+            return
+        try:
+            await self._write(variable, variant)
+        except ua.UaStatusCodeError:
+            print(f"Feature '{variable}' is not supported on this machine.")
+    setter.__name__ = "set_" + name
+    setter.__doc__ = f"Changes '{name}' ('{variable}').\n\nArgs:\n    value: {parameter.doc}"
+    return setter
+
+class AsyncSubscription:
+    """
+    Async iterator over the data changes of OPC-UA variables, created by AsyncOPCUAMachine.subscribe().
+    The OPC-UA subscription is created when the iteration starts and deleted by close().
+    """
+    def __init__(self, machine: AsyncOPCUAMachine, parameters: List[str], interval: int, convert: bool, max_queue: int, options: Optional[MonitoringOptions] = None):
+        self._machine = machine
+        self._parameters = parameters
+        self._interval = interval
+        self._options = options if options is not None else MonitoringOptions()
+        self._convert = convert
+        self._queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._subscription = None
+        self._nodes: Dict[Any, str] = {}
+        self._closed = False
+        self.dropped = 0
+
+    async def start(self):
+        """
+        Creates the OPC-UA subscription (done automatically by 'async for' and 'async with').
+        """
+        if self._subscription is not None or self._closed:
+            return
+        if not self._machine._connected:
+            raise ua.UaError("Not connected to machine.")
+        nodes = [self._machine._node(parameter) for parameter in self._parameters]
+        self._nodes = {node.nodeid: parameter for node, parameter in zip(nodes, self._parameters)}
+        self._subscription = await self._machine._client.create_subscription(self._interval, self)
+        await self._subscription.create_monitored_items([self._options.request(node.nodeid, i + 1) for i, node in enumerate(nodes)])
+
+    async def close(self):
+        """
+        Deletes the OPC-UA subscription and ends the iteration.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._subscription is not None and self._machine._connected:
+            await self._subscription.delete()
+        self._put(None)
+
+    def datachange_notification(self, node, value, data):
+        parameter = self._nodes.get(node.nodeid)
+        if parameter is None:
+            return
+        if self._convert:
+            declared = _variables(type(self._machine)).get(parameter)
+            if declared is not None and declared.decode is not None and value is not None:
+                value = declared.decode(value)
+        self._put((parameter, value))
+
+    def _put(self, item):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def __aiter__(self) -> "AsyncSubscription":
+        return self
+
+    async def __anext__(self) -> Tuple[str, Any]:
+        await self.start()
+        item = await self._queue.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    async def __aenter__(self) -> "AsyncSubscription":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+class _LivebitHandler:
+    """
+    Echoes the Livebit of the machine.
+    """
+    def __init__(self, machine: AsyncOPCUAMachine):
+        self._machine = machine
+
+    async def datachange_notification(self, node, value, data):
+        await self._machine.changeLivebit(value)
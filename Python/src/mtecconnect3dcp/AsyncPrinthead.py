@@ -0,0 +1,14 @@
+from .AsyncOPCUAMachine import AsyncOPCUAMachine
+from .Printhead import Printhead
+
+class AsyncPrinthead(AsyncOPCUAMachine):
+    """
+    Class for controlling a printhead via OPC-UA with asyncio.
+    Inherits from AsyncOPCUAMachine.
+
+    Readable properties (e.g. 'run', 'speed', 'm_speed', 'm_pressure', 's_ready') are the same as
+    for Printhead and return awaitables.
+    Values are changed with 'set_run()' and 'set_speed()'.
+    """
+    _model = "flow-matic PX"
+    _properties = Printhead._properties
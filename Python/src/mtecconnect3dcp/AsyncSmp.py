@@ -0,0 +1,12 @@
+from .AsyncMixingpump import AsyncMixingpump
+from .Smp import Smp
+
+class AsyncSmp(AsyncMixingpump):
+    """
+    AsyncSmp
+
+    Asyncio client class for m-tec SMP machines (Mixingpump).
+    Inherits from AsyncMixingpump.
+    """
+    _model = "SMP 3DCP"
+    _properties = Smp._properties
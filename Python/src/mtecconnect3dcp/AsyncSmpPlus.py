@@ -0,0 +1,11 @@
+from .AsyncMixingpumpPlus import AsyncMixingpumpPlus
+from .AsyncSmp import AsyncSmp
+
+class AsyncSmpPlus(AsyncSmp, AsyncMixingpumpPlus):
+    """
+    AsyncSmpPlus
+
+    Asyncio client class for m-tec SMP 3DCP+ machines (Mixingpump).
+    Inherits from AsyncSmp and AsyncMixingpumpPlus.
+    """
+    _model = "SMP 3DCP+"
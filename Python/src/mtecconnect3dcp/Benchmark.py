@@ -0,0 +1,358 @@
+import asyncua #https://github.com/FreeOpcUa/asyncua
+
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import socket
+import threading
+import time
+from typing import Optional, Any, Dict, List
+
+from . import ModbusCodec
+from .Duomix import Duomix
+from .DuomixPlus import DuomixPlus
+from .OPCUAMachine import OPCUAMachine, _properties
+from .Printhead import Printhead
+from .Simulator import Simulator
+from .Smp import Smp
+from .SmpPlus import SmpPlus
+
+# Machine class used for each model of the simulator
+_CLASSES = {
+    "duo-mix 3DCP": Duomix,
+    "duo-mix 3DCP+": DuomixPlus,
+    "SMP 3DCP": Smp,
+    "SMP 3DCP+": SmpPlus,
+    "flow-matic PX": Printhead,
+}
+
+def run_benchmark(model: str = "duo-mix 3DCP+", iterations: int = 500, connects: int = 5, subscriptions: int = 200, rate: float = 20.0,
+                  interval: int = 50, duration: float = 10.0, output: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Measures the performance of the library against a local simulator (see Simulator) and returns the results.
+
+    Measured are: connect() time, read() and change() latency (also with one session instead of a reader and a writer
+    session, see connect(single_session=True)), the refresh of a property panel (all properties
+    one by one and with snapshot()), notification throughput and callback delivery latency (server write -> callback)
+    with many subscriptions, and the Livebit echo latency and jitter. Times are in ms, latencies as percentiles.
+    The results can be written as JSON to compare library versions on the same PC.
+
+    Args:
+        model (str): Simulated model (see Simulator). Default is 'duo-mix 3DCP+'.
+        iterations (int): Number of reads, writes and panel refreshes. Default is 500.
+        connects (int): Number of connect() calls. Default is 5.
+        subscriptions (int): Number of subscribed variables in the notification test. Default is 200.
+        rate (float): Changes of every subscribed variable per second in the notification test. Default is 20.
+        interval (int): Publishing interval of the subscriptions in ms. Default is 50.
+        duration (float): Duration of the notification and Livebit tests in s. Default is 10.
+        output (str, optional): Path of the JSON file. Defaults to None (not written).
+
+    Returns:
+        Dict[str, Any]: The results ('environment', 'settings' and one entry per measurement).
+    """
+    if model not in _CLASSES:
+        raise ValueError(f"Unknown model '{model}', use one of: {', '.join(_CLASSES)}.")
+    # no Livebit echo between the connect() calls, the watchdog must not stop the machine
+    simulator = Simulator(model, port=_free_port(), watchdog_timeout=60.0, extra=max(1, subscriptions))
+    loop = _start(simulator)
+    results: Dict[str, Any] = {
+        "environment": _environment(),
+        "settings": {"model": model, "iterations": iterations, "connects": connects, "subscriptions": subscriptions,
+                     "rate": rate, "interval": interval, "duration": duration},
+    }
+    machine = None
+    try:
+        print(f"Benchmarking {model} at {simulator.endpoint}")
+        results["connect"] = _connect(simulator.endpoint, _CLASSES[model], connects)
+        machine = _CLASSES[model]()
+        machine.connect(simulator.endpoint)
+        results["read"] = _timed(lambda i: machine.read("Livebit2extern"), iterations)
+        results["change"] = _timed(lambda i: machine.change("load_1", float(i), "float"), iterations)
+        results["sessions"] = _sessions(simulator.endpoint, _CLASSES[model], iterations)
+        names = list(_properties(type(machine)))
+        results["panel"] = {
+            "properties": len(names),
+            "one_by_one": _timed(lambda i: [getattr(machine, name) for name in names], max(1, iterations // 10)),
+            "snapshot": _timed(lambda i: machine.snapshot(), iterations),
+        }
+        results["notifications"] = _notifications(machine, simulator, loop, subscriptions, rate, interval, duration)
+        results["livebit"] = {"client": machine.livebit.metrics(), "server": simulator.metrics()}
+    finally:
+        if machine is not None:
+            machine.disconnect()
+        asyncio.run_coroutine_threadsafe(simulator.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+def _start(simulator: Simulator) -> asyncio.AbstractEventLoop:
+    """
+    Runs the simulator in an event loop of its own thread.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    errors: List[BaseException] = []
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(simulator.start())
+        except BaseException as e:
+            errors.append(e)
+            return
+        finally:
+            started.set()
+        loop.run_forever()
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    if errors:
+        raise errors[0]
+    return loop
+
+def _connect(endpoint: str, cls: type, count: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(count):
+        machine = cls()
+        start = time.perf_counter()
+        machine.connect(endpoint, shared=False)
+        samples.append(time.perf_counter() - start)
+        machine.disconnect()
+    return _stats(samples)
+
+def _sessions(endpoint: str, cls: type, count: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Latency of read() while another thread writes continuously and of change() alone,
+    with a reader and a writer session ('two_sessions') and with one session ('single_session').
+    """
+    results = {}
+    for name, single_session in (("two_sessions", False), ("single_session", True)):
+        machine = cls()
+        machine.connect(endpoint, shared=False, single_session=single_session)
+        try:
+            change = _timed(lambda i: machine.change("load_1", float(i), "float"), count)
+            stop = threading.Event()
+            def write():
+                i = 0
+                while not stop.is_set():
+                    machine.change("load_1", float(i), "float")
+                    i += 1
+            writer = threading.Thread(target=write, daemon=True)
+            writer.start()
+            try:
+                read = _timed(lambda i: machine.read("Livebit2extern"), count)
+            finally:
+                stop.set()
+                writer.join()
+            results[name] = {"read_while_writing": read, "change": change}
+        finally:
+            machine.disconnect()
+    return results
+
+def _timed(function, count: int) -> Dict[str, float]:
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        function(i)
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+def _notifications(machine: OPCUAMachine, simulator: Simulator, loop: asyncio.AbstractEventLoop, count: int, rate: float, interval: int, duration: float) -> Dict[str, Any]:
+    """
+    Subscribes to the 'load_' variables, changes all of them 'rate' times per second in the simulator
+    (value = round number) and measures the time from the write on the server to the callback.
+    """
+    variables = [f"load_{i}" for i in range(1, count + 1)]
+    written: Dict[int, float] = {} # round -> time written
+    latencies: List[float] = []
+    lock = threading.Lock()
+    def callback(value, parameter):
+        now = time.perf_counter()
+        sent = written.get(int(value))
+        if sent is not None:
+            with lock:
+                latencies.append(now - sent)
+    start = time.perf_counter()
+    handles = [machine.subscribe(variable, callback, interval)[0] for variable in variables]
+    subscribe_time = time.perf_counter() - start
+    monitored_items = machine.connection_metrics()["monitored_items"]
+    time.sleep(1.0) # initial values
+    with lock:
+        latencies.clear()
+    async def write():
+        period = 1 / rate
+        next_write = time.perf_counter()
+        for round_number in range(1, int(duration * rate) + 1):
+            await asyncio.sleep(max(0.0, next_write - time.perf_counter()))
+            written[round_number] = time.perf_counter()
+            await simulator.write({variable: round_number for variable in variables})
+            next_write += period
+    start = time.perf_counter()
+    asyncio.run_coroutine_threadsafe(write(), loop).result()
+    elapsed = time.perf_counter() - start
+    time.sleep(max(1.0, 2 * interval / 1000)) # last notifications
+    with lock:
+        samples = list(latencies)
+    for handle in handles:
+        handle.delete()
+    changes = len(variables) * len(written)
+    return {
+        "subscribe_time": subscribe_time * 1000,
+        "monitored_items": monitored_items, # of the connection, including the Livebit
+        "changes": changes,
+        "received": len(samples),
+        "coalesced": max(0, changes - len(samples)), # several changes within one publishing interval
+        "throughput": len(samples) / elapsed, # notifications per s
+        "latency": _stats(samples),
+    }
+
+def run_codec_benchmark(iterations: int = 20000, output: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Micro-benchmark of the Modbus RTU frame handling: the binary codec (ModbusCodec) against the hex string path
+    used by ModbusMachine before (hex padding in a loop, bit-by-bit CRC, responses re-encoded to hex for the CRC check).
+
+    Args:
+        iterations (int): Number of frames per measurement. Default is 20000.
+        output (str, optional): Path of the JSON file. Defaults to None (not written).
+
+    Returns:
+        Dict[str, Any]: Time per frame in µs ('string' and 'binary') and the speedup for encoding a request,
+            checking a CRC and decoding a response.
+    """
+    request = ModbusCodec.encode_read(1, 0xFD00)
+    response = ModbusCodec.with_crc(bytes([1, 3, 2, 0x09, 0xC4]))
+    if _legacy_encode("01", "03FD00", 1) != request or _legacy_decode(response) != ModbusCodec.decode(response).value:
+        raise RuntimeError("String and binary path differ.")
+    cases = {
+        "encode": (lambda: _legacy_encode("01", "03FD00", 1), lambda: ModbusCodec.encode_read(1, 0xFD00)),
+        "crc": (lambda: _legacy_crc(request[:-2].hex()), lambda: ModbusCodec.crc16(request[:-2])),
+        "decode": (lambda: _legacy_decode(response), lambda: ModbusCodec.decode(response)),
+    }
+    results: Dict[str, Any] = {"environment": _environment(), "settings": {"iterations": iterations}}
+    for name, (string, binary) in cases.items():
+        string_time = _per_call(string, iterations)
+        binary_time = _per_call(binary, iterations)
+        results[name] = {"string": string_time, "binary": binary_time, "speedup": string_time / binary_time}
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+def _per_call(function, count: int) -> float:
+    """
+    Fastest of 3 runs, in µs per call.
+    """
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(count):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+# String path of ModbusMachine up to version 2.1.0 (reference of run_codec_benchmark())
+def _legacy_int2hex(value: int, length: int) -> str:
+    s = hex(value)[2:]
+    while len(s) < length:
+        s = "0" + s
+    return s.upper()
+
+def _legacy_crc(command: str) -> str:
+    buffer = bytearray.fromhex(command)
+    crc = 0xFFFF
+    for pos in range(len(buffer)):
+        crc ^= buffer[pos]
+        for _ in range(8):
+            if (crc & 0x0001) != 0:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+    return _legacy_int2hex((crc % 256) * 256 + crc // 256, 4)
+
+def _legacy_encode(slave: str, parameter: str, value: int) -> bytes:
+    data = slave + parameter + _legacy_int2hex(value, 4)
+    return bytes.fromhex(data + _legacy_crc(data))
+
+def _legacy_decode(frame: bytes) -> Optional[int]:
+    # byte by byte as read from the port
+    command = _legacy_int2hex(frame[0], 2) + _legacy_int2hex(frame[1], 2) + _legacy_int2hex(frame[2], 2)
+    value = 0
+    for byte in frame[3:3 + frame[2]]:
+        value = (value << 8) + byte
+        command += _legacy_int2hex(value & 0xFF, 2)
+    crc = _legacy_int2hex(frame[-2], 2) + _legacy_int2hex(frame[-1], 2)
+    return value if _legacy_crc(command) == crc else None
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    """
+    Count, mean and percentiles of durations in s (result in ms).
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "min": ordered[0] * 1000,
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": ordered[-1] * 1000,
+    }
+
+def _environment() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+        library = version("mtecconnect3dcp")
+    except Exception:
+        library = None
+    return {
+        "library": library,
+        "asyncua": getattr(asyncua, "__version__", None),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance benchmark of mtecconnect3dcp against a local simulator.")
+    parser.add_argument("--model", default="duo-mix 3DCP+", choices=list(_CLASSES))
+    parser.add_argument("--iterations", type=int, default=500, help="reads, writes and panel refreshes")
+    parser.add_argument("--connects", type=int, default=5, help="connect() calls")
+    parser.add_argument("--subscriptions", type=int, default=200, help="subscribed variables in the notification test")
+    parser.add_argument("--rate", type=float, default=20.0, help="changes of every subscribed variable per second")
+    parser.add_argument("--interval", type=int, default=50, help="publishing interval in ms")
+    parser.add_argument("--duration", type=float, default=10.0, help="s of the notification and Livebit tests")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file of the results")
+    parser.add_argument("--codec", action="store_true", help="only run the Modbus codec micro-benchmark")
+    arguments = parser.parse_args()
+    if arguments.codec:
+        results = run_codec_benchmark(output=arguments.output)
+        for name in ("encode", "crc", "decode"):
+            print(f"{name}: string {results[name]['string']:.2f} µs, binary {results[name]['binary']:.2f} µs ({results[name]['speedup']:.1f}x)")
+        print("Results written to", arguments.output)
+    else:
+        results = run_benchmark(arguments.model, arguments.iterations, arguments.connects, arguments.subscriptions, arguments.rate,
+                                arguments.interval, arguments.duration, arguments.output)
+        for name in ("connect", "read", "change"):
+            print(f"{name}: p50 {results[name]['p50']:.2f} ms, p99 {results[name]['p99']:.2f} ms")
+        for name in ("two_sessions", "single_session"):
+            sessions = results["sessions"][name]
+            print(f"{name}: read while writing p50 {sessions['read_while_writing']['p50']:.2f} ms, p99 {sessions['read_while_writing']['p99']:.2f} ms, "
+                  f"change p50 {sessions['change']['p50']:.2f} ms, p99 {sessions['change']['p99']:.2f} ms")
+        print(f"panel ({results['panel']['properties']} properties): one by one {results['panel']['one_by_one']['p50']:.2f} ms, snapshot {results['panel']['snapshot']['p50']:.2f} ms")
+        notifications = results["notifications"]
+        print(f"notifications: {notifications['throughput']:.0f}/s, latency p50 {notifications['latency'].get('p50', 0):.2f} ms, p99 {notifications['latency'].get('p99', 0):.2f} ms")
+        print(f"livebit: echo {results['livebit']['server']['echo_latency_avg']:.1f} ms, jitter {results['livebit']['server']['echo_jitter_avg']:.1f} ms")
+        print("Results written to", arguments.output)
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from typing import Optional, Any, Dict
+
+class ConnectionCache:
+    """
+    On-disk (JSON) cache of information resolved while connecting to an OPC-UA server.
+    Entries are keyed by endpoint URL and server build, so they are discarded after a firmware update.
+
+    Args:
+        path (str): Path of the cache file.
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def get(self, url: str, build: str) -> Dict[str, Any]:
+        """
+        Returns the cached information of a server.
+
+        Args:
+            url (str): Endpoint URL.
+            build (str): Build identification of the server.
+
+        Returns:
+            Dict[str, Any]: Cached information (empty if nothing is cached).
+        """
+        with self._lock:
+            # copies, the sections are changed by put() in other threads
+            return {section: dict(values) if isinstance(values, dict) else values
+                    for section, values in self._load().get(self._key(url, build), {}).items()}
+
+    def update(self, url: str, build: str, **values: Any):
+        """
+        Stores information of a server.
+
+        Args:
+            url (str): Endpoint URL.
+            build (str): Build identification of the server.
+            **values: Values to store.
+        """
+        with self._lock:
+            self._entry(url, build).update(values)
+            self._save()
+
+    def put(self, url: str, build: str, section: str, key: str, value: Any):
+        """
+        Stores one value in a section of the information of a server.
+
+        Args:
+            url (str): Endpoint URL.
+            build (str): Build identification of the server.
+            section (str): Section (e.g. 'livebit').
+            key (str): Key within the section.
+            value (Any): Value to store.
+        """
+        with self._lock:
+            self._entry(url, build).setdefault(section, {})[key] = value
+            self._save()
+
+    def _entry(self, url: str, build: str) -> Dict[str, Any]:
+        entries = self._load()
+        # only keep the current build of a server
+        for key in [key for key in entries if key.startswith(url + "|")]:
+            if key != self._key(url, build):
+                del entries[key]
+        return entries.setdefault(self._key(url, build), {})
+
+    def _save(self):
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self._path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp, self._path)
+
+    def _key(self, url: str, build: str) -> str:
+        return url + "|" + build
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self._path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
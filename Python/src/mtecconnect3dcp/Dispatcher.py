@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from typing import Callable, Any, Dict, List
+
+class Dispatcher:
+    """
+    Base class for executing subscription callbacks.
+    """
+    def submit(self, key: str, callback: Callable, *args: Any) -> bool:
+        """
+        Executes a callback.
+
+        Args:
+            key (str): Ordering key (the OPC-UA parameter). Callbacks with the same key are executed in order.
+            callback (Callable): Callback function.
+            *args: Arguments for the callback.
+
+        Returns:
+            bool: True if the callback was accepted, False if it was dropped.
+        """
+        raise NotImplementedError
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Returns the dispatcher metrics.
+
+        Returns:
+            Dict[str, int]: 'queue_depth', 'max_queue_depth', 'dispatched' and 'dropped'.
+        """
+        raise NotImplementedError
+
+    def close(self, timeout: float = 1.0):
+        """
+        Stops the dispatcher. Callbacks not started yet are dropped.
+
+        Args:
+            timeout (float): Maximum time to wait for a running callback in s. Default is 1.0.
+        """
+        pass
+
+class InlineDispatcher(Dispatcher):
+    """
+    Executes callbacks directly in the thread receiving the notification (the OPC-UA client thread).
+    Lowest latency, but callbacks must not block and must not read or change machine values.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dispatched = 0
+
+    def submit(self, key: str, callback: Callable, *args: Any) -> bool:
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error in subscription callback for '{key}':", e)
+        with self._lock:
+            self._dispatched += 1
+        return True
+
+    def metrics(self) -> Dict[str, int]:
+        return {"queue_depth": 0, "max_queue_depth": 0, "dispatched": self._dispatched, "dropped": 0}
+
+class ThreadPoolDispatcher(Dispatcher):
+    """
+    Executes callbacks on a fixed number of worker threads with bounded queues.
+    All callbacks with the same key run on the same worker, so events of one parameter keep their order.
+    If the queue of a worker is full, new events are dropped.
+    The workers are started with the first callback and stopped by close() (started again by the next callback),
+    events still queued when closing are dropped.
+
+    Args:
+        workers (int): Number of worker threads. Default is 4.
+        max_queue (int): Maximum number of pending callbacks per worker. Default is 1000.
+    """
+    def __init__(self, workers: int = 4, max_queue: int = 1000):
+        if workers < 1:
+            raise ValueError("At least one worker is required.")
+        self._workers = workers
+        self._max_queue = max_queue
+        self._queues: List[queue.Queue] = [queue.Queue(max_queue) for _ in range(workers)]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._dispatched = 0
+        self._dropped = 0
+        self._max_queue_depth = 0
+
+    def submit(self, key: str, callback: Callable, *args: Any) -> bool:
+        if not self._threads:
+            self._start()
+        q = self._queues[hash(key) % len(self._queues)]
+        try:
+            q.put_nowait((key, callback, args))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        depth = q.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return True
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queue_depth": sum(q.qsize() for q in self._queues),
+            "max_queue_depth": self._max_queue_depth,
+            "dispatched": self._dispatched,
+            "dropped": self._dropped,
+        }
+
+    def close(self, timeout: float = 1.0):
+        with self._lock:
+            threads = self._threads
+            queues = self._queues
+            self._threads = []
+            if threads:
+                # workers started again later get new queues, the old ones only see the stop signal
+                self._queues = [queue.Queue(self._max_queue) for _ in range(self._workers)]
+        if not threads:
+            return
+        dropped = 0
+        for q in queues:
+            while True:
+                dropped += _drain(q)
+                try:
+                    q.put_nowait(None)
+                    break
+                except queue.Full: # filled by a submit in the meantime
+                    pass
+        with self._lock:
+            self._dropped += dropped
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            if thread is not threading.current_thread(): # close() called from a callback
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for q in self._queues:
+                thread = threading.Thread(target=self._work, args=(q,), daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self, q: queue.Queue):
+        while True:
+            task = q.get()
+            if task is None:
+                return
+            key, callback, args = task
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in subscription callback for '{key}':", e)
+            with self._lock:
+                self._dispatched += 1
+
+def _drain(q: queue.Queue) -> int:
+    """
+    Removes all pending events of a queue, returns their number.
+    """
+    count = 0
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return count
+        count += 1
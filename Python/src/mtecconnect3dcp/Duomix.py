@@ -7,4 +7,4 @@ class Duomix (Mixingpump):
     OPC-UA client class for m-tec Duo-Mix 3DCP+ machines (Mixingpump).
     Inherits from Mixingpump.
     """
-    pass
\ No newline at end of file
+    _model = "duo-mix 3DCP"
\ No newline at end of file
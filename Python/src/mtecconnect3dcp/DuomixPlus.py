@@ -1,4 +1,3 @@
-from .OPCUAMachine import SubscriptionWrapper
 from .Duomix import Duomix
 from .MixingpumpPlus import MixingpumpPlus
 
@@ -9,6 +8,7 @@ class DuomixPlus (Duomix, MixingpumpPlus):
     OPC-UA client class for m-tec Duo-Mix 3DCP+ machines (Mixingpump).
     Inherits from Duomix and MixingpumpPlus.
     """
+    _model = "duo-mix 3DCP+"
 
     """Backward compatibility"""
     def startDosingpump(self):
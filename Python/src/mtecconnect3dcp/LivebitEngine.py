@@ -0,0 +1,225 @@
+from asyncua import ua #https://github.com/FreeOpcUa/asyncua
+
+import threading
+import time
+from typing import Optional, Callable, Any, Dict
+
+from .Dispatcher import InlineDispatcher
+
+_HISTOGRAM_EDGES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf")) # ms
+
+class LivebitEngine:
+    """
+    Echoes 'Livebit2extern' to the Livebit variable of a machine (the PLC watchdog).
+
+    The notifications are handled directly in the client thread (not queued behind the
+    subscription callbacks) and the echo is written by a dedicated thread. Only the latest
+    value is echoed. The engine records the echo latency (notification received -> write
+    completed) and its jitter, and warns before the watchdog of the PLC times out.
+    Created by the connection, one per machine base node (see OPCUAMachine.livebit).
+
+    Args:
+        subscriptions (SubscriptionManager): Subscription manager of the connection.
+        source (Callable): Returns the node of 'Livebit2extern' (on the reading session).
+        target (Callable): Returns the node of the Livebit variable (on the writing session).
+        parameter (str): Name of the Livebit variable.
+        interval (int): Publishing interval in ms. Default is 500.
+    """
+    def __init__(self, subscriptions, source: Callable[[], Any], target: Callable[[], Any], parameter: str, interval: int = 500):
+        self._subscriptions = subscriptions
+        self._source = source
+        self._target = target
+        self._parameter = parameter
+        self._interval = interval
+        self._timeout = 2.0
+        self._warning_ratio = 0.5
+        self.on_warning: Optional[Callable[[float], Any]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._handle = None
+        self._value: Any = None
+        self._pending = False
+        self._received: Optional[float] = None # time the pending (or last) value was received
+        self._unanswered_since: Optional[float] = None # time the oldest value not echoed yet was received
+        self._period: Optional[float] = None # average time between two changes of 'Livebit2extern'
+        self._warned = False
+        self._echoes = 0
+        self._errors = 0
+        self._warnings = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._last_latency: Optional[float] = None
+        self._latency_histogram = [0] * len(_HISTOGRAM_EDGES)
+        self._jitter_histogram = [0] * len(_HISTOGRAM_EDGES)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def parameter(self) -> str:
+        """
+        str: The Livebit variable written by the engine.
+        """
+        return self._parameter
+
+    def start(self):
+        """
+        Subscribes to 'Livebit2extern' and starts the echo thread.
+        """
+        self._handle = self._subscriptions.add("Livebit2extern", self._source(), self._receive, self._interval, InlineDispatcher())
+        self._thread.start()
+
+    def stop(self, unsubscribe: bool = True, timeout: float = 1.0):
+        """
+        Stops the echo and waits for the echo thread.
+
+        Args:
+            unsubscribe (bool): Whether to delete the subscription on the server. Default is True.
+            timeout (float): Maximum time to wait for an echo being written in s. Default is 1.0.
+        """
+        self._stopped = True
+        self._wake.set()
+        if self._thread.ident is not None and self._thread is not threading.current_thread(): # stopped by the warning callback
+            self._thread.join(timeout)
+        if unsubscribe and self._handle is not None:
+            self._handle.delete()
+        self._handle = None
+
+    def configure(self, interval: Optional[int] = None, timeout: Optional[float] = None, warning_ratio: Optional[float] = None, on_warning: Optional[Callable[[float], Any]] = None):
+        """
+        Changes the settings of the echo.
+
+        Args:
+            interval (int, optional): Publishing interval of 'Livebit2extern' in ms (lower = faster echo).
+            timeout (float, optional): Watchdog timeout of the PLC in s. Default is 2.0.
+            warning_ratio (float, optional): Part of the timeout after which an unanswered change of 'Livebit2extern' triggers a warning. Default is 0.5.
+            on_warning (Callable, optional): Callback receiving the age of the unanswered change in s. Defaults to printing a message.
+        """
+        if timeout is not None:
+            if timeout <= 0:
+                raise ValueError("Timeout must be positive.")
+            self._timeout = timeout
+        if warning_ratio is not None:
+            if not 0 < warning_ratio <= 1:
+                raise ValueError("Warning ratio must be between 0 and 1.")
+            self._warning_ratio = warning_ratio
+        if on_warning is not None:
+            self.on_warning = on_warning
+        if interval is not None and interval != self._interval and not self._stopped:
+            old = self._handle
+            self._interval = interval
+            self._handle = self._subscriptions.add("Livebit2extern", self._source(), self._receive, interval, InlineDispatcher())
+            if old is not None:
+                old.delete()
+        self._wake.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the echo metrics.
+
+        Returns:
+            Dict[str, Any]: 'echoes', 'errors', 'warnings', 'latency_avg' and 'latency_max' (ms), 'period' (average time between
+                two changes of 'Livebit2extern' in ms), 'latency_histogram' and 'jitter_histogram' (upper bucket edge in ms -> count;
+                jitter is the difference between two consecutive latencies).
+        """
+        with self._lock:
+            return {
+                "echoes": self._echoes,
+                "errors": self._errors,
+                "warnings": self._warnings,
+                "latency_avg": self._latency_sum / self._echoes * 1000 if self._echoes else 0.0,
+                "latency_max": self._latency_max * 1000,
+                "period": self._period * 1000 if self._period is not None else None,
+                "latency_histogram": dict(zip(_HISTOGRAM_EDGES, self._latency_histogram)),
+                "jitter_histogram": dict(zip(_HISTOGRAM_EDGES, self._jitter_histogram)),
+            }
+
+    def _receive(self, value: Any, parameter: str):
+        # called in the client thread, must not block
+        now = time.perf_counter()
+        with self._lock:
+            if self._received is not None and value != self._value:
+                interval = now - self._received
+                self._period = interval if self._period is None else 0.8 * self._period + 0.2 * interval
+            self._value = value
+            self._received = now
+            self._pending = True
+            if self._unanswered_since is None:
+                self._unanswered_since = now
+        self._wake.set()
+
+    def _unanswered(self, now: float) -> float:
+        """
+        Age of the oldest change of 'Livebit2extern' not echoed yet: a pending echo, or a change
+        expected from the measured period that did not arrive (e.g. stalled subscription).
+        """
+        if self._received is None:
+            return 0.0
+        if self._unanswered_since is not None:
+            return now - self._unanswered_since
+        if self._period is not None:
+            return max(0.0, now - self._received - self._period)
+        return 0.0
+
+    def _run(self):
+        while not self._stopped:
+            with self._lock:
+                threshold = self._timeout * self._warning_ratio
+            self._wake.wait(min(0.1, threshold / 4))
+            self._wake.clear()
+            if self._stopped:
+                return
+            with self._lock:
+                pending = self._pending
+                value = self._value
+                received = self._received
+                self._pending = False
+            if pending:
+                self._echo(value, received)
+            self._check(threshold)
+
+    def _echo(self, value: Any, received: float):
+        try:
+            self._target().set_value(ua.Variant(bool(value), ua.VariantType.Boolean))
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+                # retried with the next wake-up
+                if self._received == received:
+                    self._pending = True
+            print(f"Error echoing Livebit '{self._parameter}':", e)
+            return
+        latency = time.perf_counter() - received
+        with self._lock:
+            self._echoes += 1
+            self._latency_sum += latency
+            self._latency_max = max(self._latency_max, latency)
+            self._latency_histogram[_bucket(latency)] += 1
+            if self._last_latency is not None:
+                self._jitter_histogram[_bucket(abs(latency - self._last_latency))] += 1
+            self._last_latency = latency
+            # a value received during the write is still unanswered
+            self._unanswered_since = self._received if self._pending else None
+            self._warned = False
+
+    def _check(self, threshold: float):
+        with self._lock:
+            age = self._unanswered(time.perf_counter())
+            if age < threshold or self._warned:
+                return
+            self._warned = True
+            self._warnings += 1
+            callback = self.on_warning
+        if callback is None:
+            print(f"Warning: Livebit '{self._parameter}' not echoed for {age:.2f} s (PLC timeout {self._timeout:.1f} s).")
+            return
+        try:
+            callback(age)
+        except Exception as e:
+            print("Error in Livebit warning callback:", e)
+
+def _bucket(seconds: float) -> int:
+    milliseconds = seconds * 1000
+    for i, edge in enumerate(_HISTOGRAM_EDGES):
+        if milliseconds <= edge:
+            return i
+    return len(_HISTOGRAM_EDGES) - 1
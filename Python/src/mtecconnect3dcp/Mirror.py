@@ -0,0 +1,102 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+class Mirror:
+    """
+    Local copy of OPC-UA variables, kept up to date by one subscription.
+    Created by OPCUAMachine.mirror(); while it is open, reads of the mirrored variables
+    (and the properties using them) are served from the copy.
+
+    A value is only used if it was received (or read) within max_age seconds. Values that
+    do not change are therefore read from the machine again every max_age seconds.
+
+    Args:
+        parameters (List[str]): Mirrored variables.
+        max_age (float): Maximum age of a value in seconds before it is read from the machine again.
+    """
+    def __init__(self, parameters: List[str], max_age: float):
+        self._parameters = frozenset(parameters)
+        self._max_age = max_age
+        self._values: Dict[str, Tuple[Any, float]] = {} # variable -> (value, time received)
+        self._handles = []
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def parameters(self) -> List[str]:
+        """
+        List[str]: The mirrored variables (without the ones not supported by the machine).
+        """
+        return sorted(handle.parameter for handle in self._handles)
+
+    @property
+    def closed(self) -> bool:
+        """
+        bool: True if the mirror was closed.
+        """
+        return self._closed
+
+    def lookup(self, parameter: str) -> Tuple[bool, Any]:
+        """
+        Returns the mirrored value of a variable if it is recent enough.
+
+        Args:
+            parameter (str): Variable name.
+
+        Returns:
+            Tuple[bool, Any]: (True, value) or (False, None) if the variable is not mirrored or the value is too old.
+        """
+        if parameter not in self._parameters or self._closed:
+            return False, None
+        entry = self._values.get(parameter)
+        if entry is None or time.monotonic() - entry[1] > self._max_age:
+            self._misses += 1
+            return False, None
+        self._hits += 1
+        return True, entry[0]
+
+    def update(self, value: Any, parameter: str):
+        """
+        Stores a value received from the machine (subscription callback, also used after a read).
+
+        Args:
+            value (Any): Value of the variable.
+            parameter (str): Variable name.
+        """
+        if parameter not in self._parameters or self._closed:
+            return
+        if value is None:
+            self._values.pop(parameter, None)
+        else:
+            self._values[parameter] = (value, time.monotonic())
+
+    def values(self) -> Dict[str, Any]:
+        """
+        Returns the current copy, regardless of the age of the values.
+
+        Returns:
+            Dict[str, Any]: Raw values by variable.
+        """
+        return {parameter: value for parameter, (value, _) in list(self._values.items())}
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Returns the mirror metrics.
+
+        Returns:
+            Dict[str, int]: 'hits' (reads served from the copy), 'misses' (reads of mirrored variables that went to the machine) and 'size'.
+        """
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._values)}
+
+    def close(self):
+        """
+        Deletes the subscription, reads go to the machine again.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for handle in self._handles:
+            handle.delete()
+        self._handles = []
+        self._values = {}
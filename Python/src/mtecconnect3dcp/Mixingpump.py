@@ -1,151 +1,41 @@
 from .OPCUAMachine import OPCUAMachine, SubscriptionWrapper
-import threading
+from .Parameter import Parameter
+from .SetpointChannel import SetpointChannel
+
 class Mixingpump(OPCUAMachine):
     """
     Class for controlling a mixing pump via OPC-UA.
     Inherits from OPCUAMachine.
     """
-    @property
-    def run(self) -> bool:
-        """
-        bool: True if the machine is running, False otherwise.
-        """
-        return bool(self.read("Remote_start"))
-    @run.setter
-    def run(self, state: bool):
-        """
-        Set the running state of the machine.
-
-        Args:
-            state (bool): True to start, False to stop.
-        """
-        self.change("Remote_start", state, "bool")
-
-    @property
-    def speed(self) -> float:
-        """
-        float: Speed setting of the mixingpump in Hz.
-        """
-        return (self.read("set_value_mixingpump") * 30) / 65535 + 20 # 50Hz = 65535, 20Hz
-    @speed.setter
-    def speed(self, speed: float):
-        """
-        Set the speed of the mixingpump.
-
-        Args:
-            speed (float): Speed in Hz (20-50).
-
-        Raises:
-            ValueError: If speed is out of range.
-        """
-        if callable(speed):
-            self.easy_subscribe("set_value_mixingpump", speed)
-            return
-        if speed < 20:
-            raise ValueError("Speed in Hz cannot be below 20")
-        if speed > 50:
-            raise ValueError("Speed in Hz cannot be above 50")
-        hz = (speed-20) * 65535 / 30 # 50Hz = 65535, 20Hz = 0
-        self.change("set_value_mixingpump", hz, "uint16")
-
-    @property
-    def m_speed(self) -> float:
-        """
-        float: Real speed of the mixingpump in Hz.
-        """
-        speed = self.read("actual_value_mixingpump")
-        return speed * 50 / 65535 # 50Hz = 65535, 0Hz = 0
-
-    @m_speed.setter
-    def m_speed(self, callback: callable):
-        """
-        Create a subscription for the real speed of the mixingpump in Hz.
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        def cb(value, parameter):
-            sw = SubscriptionWrapper(callback, subscription)
-            sw.trigger(value=value * 50 /65535, parameter=parameter)
-        subscription = self.easy_subscribe("actual_value_mixingpump", cb, False)
-
-    @property
-    def s_error(self) -> bool:
-        """
-        bool: True if the machine is in error state.
-        """
-        return self.read("error")
-
-    @s_error.setter
-    def s_error(self, callback: callable):
-        """
-        Create a subscription for the error state of the machine.
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("error", callback)
-    
-    @property
-    def s_error_no(self) -> int:
-        """
-        int: Error number of the machine (0 = none).
-        """
-        return self.read("error_no")
-
-    @s_error_no.setter
-    def s_error_no(self, callback: callable):
-        """
-        Create a subscription for the error number of the machine.
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("error_no", callback)
-
-    @property
-    def s_ready(self) -> bool:
-        """
-        bool: True if the machine is ready for operation.
-        """
-        return self.read("Ready_for_operation")
-
-    @s_ready.setter
-    def s_ready(self, callback: callable):
-        """
-        Create a subscription for the ready state of the machine.
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("Ready_for_operation", callback)
-
-    @property
-    def s_mixing(self) -> bool:
-        """
-        bool: True if the mixer is running (automatic mode).
-        """
-        return self.read("aut_mixer")
+    _properties = {
+        "run": Parameter("Remote_start", "bool", writable=True, doc="bool: True if the machine is running, False otherwise."),
+        # 50Hz = 65535, 20Hz = 0
+        "speed": Parameter("set_value_mixingpump", "uint16", scale=30 / 65535, offset=20, writable=True, minimum=20, maximum=50, label="Speed in Hz",
+                           doc="float: Speed setting of the mixingpump in Hz (20-50)."),
+        # 50Hz = 65535, 0Hz = 0
+        "m_speed": Parameter("actual_value_mixingpump", "uint16", scale=50 / 65535, doc="float: Real speed of the mixingpump in Hz."),
+        "s_error": Parameter("error", "bool", doc="bool: True if the machine is in error state."),
+        "s_error_no": Parameter("error_no", "uint16", doc="int: Error number of the machine (0 = none)."),
+        "s_ready": Parameter("Ready_for_operation", "bool", doc="bool: True if the machine is ready for operation."),
+        "s_mixing": Parameter("aut_mixer", "bool", doc="bool: True if the mixer is running (automatic mode)."),
+        "s_pumping_net": Parameter("aut_mixingpump_net", "bool", doc="bool: True if the mixingpump is running on power supply (automatic mode)."),
+        "s_pumping_fc": Parameter("aut_mixingpump_fc", "bool", doc="bool: True if the mixingpump is running on frequency converter supply (automatic mode)."),
+        "s_solenoidvalve": Parameter("aut_solenoid_valve", "bool", doc="bool: True if the solenoid valve is open (automatic mode)."),
+        "s_waterpump": Parameter("aut_waterpump", "bool", doc="bool: True if the water pump is running (automatic mode)."),
+        "s_remote": Parameter("Remote_connected", "bool", doc="bool: True if remote is connected."),
+    }
+
+    def speed_channel(self, max_rate: float = 50) -> SetpointChannel:
+        """
+        Creates a non-blocking writer for the speed, for streaming the speed at a high rate.
+
+        Args:
+            max_rate (float): Maximum number of writes per second. Default is 50.
 
-    @s_mixing.setter
-    def s_mixing(self, callback: callable):
+        Returns:
+            SetpointChannel: The channel, use 'channel.set(speed)' with the speed in Hz (20-50).
         """
-        Create a subscription for the mixer running state (automatic mode).
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("aut_mixer", callback)
+        return self.property_channel("speed", max_rate)
 
     @property
     def s_pumping(self) -> bool:
@@ -164,10 +54,8 @@ class Mixingpump(OPCUAMachine):
         """
         if not callable(callback):
             raise ValueError("Callback is not callable.")
+        sw = SubscriptionWrapper(callback)
         def cb(value, parameter):
-            threading.Thread(target=thr, kwargs={"value": value, "parameter": parameter, "subscription": subscription}).start()
-        def thr(value, parameter, subscription):
-            sw = SubscriptionWrapper(callback, subscription)
             if value:
                 sw.trigger(value=value, parameter=parameter)
             else:
@@ -175,104 +63,8 @@ class Mixingpump(OPCUAMachine):
                     sw.trigger(value=self.s_pumping_fc, parameter=parameter)
                 elif parameter == "aut_mixingpump_fc":
                     sw.trigger(value=self.s_pumping_net, parameter=parameter)
-        subscription = self.easy_subscribe(["aut_mixingpump_net", "aut_mixingpump_fc"], cb, False)
-
-    @property
-    def s_pumping_net(self) -> bool:
-        """
-        bool: True if the mixingpump is running on power supply (automatic mode).
-        """
-        return self.read("aut_mixingpump_net")
-
-    @s_pumping_net.setter
-    def s_pumping_net(self, callback: callable):
-        """
-        Create a subscription for the mixingpump running state (net).
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("aut_mixingpump_net", callback)
-
-    @property
-    def s_pumping_fc(self) -> bool:
-        """
-        bool: True if the mixingpump is running on frequency converter supply (automatic mode).
-        """
-        return self.read("aut_mixingpump_fc")
-
-    @s_pumping_fc.setter
-    def s_pumping_fc(self, callback: callable):
-        """
-        Create a subscription for the mixingpump running state (fc).
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("aut_mixingpump_fc", callback)
-
-    @property
-    def s_solenoidvalve(self) -> bool:
-        """
-        bool: True if the solenoid valve is open (automatic mode).
-        """
-        return self.read("aut_solenoid_valve")
-
-    @s_solenoidvalve.setter
-    def s_solenoidvalve(self, callback: callable):
-        """
-        Create a subscription for the solenoid valve state (automatic mode).
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("aut_solenoid_valve", callback)
-    
-    @property
-    def s_waterpump(self) -> bool:
-        """
-        bool: True if the water pump is running (automatic mode).
-        """
-        return self.read("aut_waterpump")
-
-    @s_waterpump.setter
-    def s_waterpump(self, callback: callable):
-        """
-        Create a subscription for the water pump state (automatic mode).
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("aut_waterpump", callback)
-
-    @property
-    def s_remote(self) -> bool:
-        """
-        bool: True if remote is connected.
-        """
-        return self.read("Remote_connected")
-
-    @s_remote.setter
-    def s_remote(self, callback: callable):
-        """
-        Create a subscription for the remote connection state.
-
-        Args:
-            callback (callable): Callback function (optional parameters: 'value', 'parameter' and 'subscription').
-        """
-        if not callable(callback):
-            raise ValueError("Callback is not callable.")
-        self.easy_subscribe("Remote_connected", callback)
-
-
+        for subscription in self.easy_subscribe(["aut_mixingpump_net", "aut_mixingpump_fc"], cb, False):
+            sw.subscription(subscription)
 
     def setDigital(self, pin: int, value: bool):
         """
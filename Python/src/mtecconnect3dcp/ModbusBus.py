@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Union
+
+from . import ModbusCodec
+from .ModbusScheduler import ModbusScheduler, EMERGENCY
+from .Pump import Pump
+
+class ModbusBus:
+    """
+    RS485 line with several pumps (P20/P50) on one serial port, e.g. behind one USB converter.
+
+    The bus owns the port and hands out a Pump per slave address (frequency inverter ID). All pumps
+    share the transaction queue of the port: the slaves take turns within a priority class, an
+    emergency stop of any pump goes first, and the keepalives of all pumps run in one schedule.
+    Every slave has its own timeout, retries and statistics (see metrics()).
+
+    Args:
+        port (str): Serial port to use (e.g. 'COM3' or '/dev/ttyUSB0').
+        baudrate (int): Serial baudrate of all slaves. Default is 19200.
+        log (bool): Enable logging of the pumps. Default is False.
+    """
+    def __init__(self, port: str, baudrate: int = 19200, log: bool = False):
+        if not port:
+            raise ValueError("No serial port provided.")
+        self._port = port
+        self._baudrate = baudrate
+        self._logging = log
+        self._scheduler = ModbusScheduler.acquire(port, baudrate)
+        self._pumps: Dict[int, Pump] = {}
+
+    def pump(self, frequency_inverter_id: Union[str, int] = "01", timeout: float = 0.2, retries: int = 1) -> Pump:
+        """
+        Returns the pump with a slave address, connected on the first call.
+
+        Args:
+            frequency_inverter_id (Union[str, int]): Slave address of the frequency inverter ('01' as for Pump, or 1).
+            timeout (float): Response timeout of the slave per attempt in s. Default is 0.2.
+            retries (int): Attempts after the first one if the slave gave no valid response. Default is 1.
+
+        Returns:
+            Pump: The connected pump.
+        """
+        if self._scheduler is None:
+            raise RuntimeError("Bus is closed.")
+        if isinstance(frequency_inverter_id, int):
+            frequency_inverter_id = f"{frequency_inverter_id:02X}"
+        slave = int(frequency_inverter_id, 16)
+        if not 1 <= slave <= 247:
+            raise ValueError("Slave address must be between 1 and 247.")
+        pump = self._pumps.get(slave)
+        if pump is None:
+            pump = Pump(frequency_inverter_id, self._baudrate, self._logging)
+            pump.connect(self._port)
+            self._pumps[slave] = pump
+        pump._timeout = timeout
+        pump._retry_count = retries
+        return pump
+
+    @property
+    def pumps(self) -> List[Pump]:
+        """
+        List[Pump]: The pumps handed out, by slave address.
+        """
+        return [self._pumps[slave] for slave in sorted(self._pumps)]
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the metrics of the bus (see ModbusScheduler.metrics()).
+
+        Returns:
+            Dict[str, Any]: Bus utilisation, queue wait per priority class and per slave address the number of
+                transactions, failed transactions, timeouts, retries, invalid responses and the latency.
+        """
+        if self._scheduler is None:
+            raise RuntimeError("Bus is closed.")
+        return self._scheduler.metrics()
+
+    def emergency_stop(self):
+        """
+        Emergency stop of all pumps handed out (queued before all other transactions).
+        """
+        if self._scheduler is None:
+            raise RuntimeError("Bus is closed.")
+        for pump in self._pumps.values():
+            pump._last_running = False
+        transactions = [self._scheduler.submit(ModbusCodec.encode_write(slave, 0xFA00, Pump._EMERGENCY_STOP), pump._timeout, pump._retry_count, EMERGENCY, pump._log)
+                        for slave, pump in sorted(self._pumps.items())]
+        for transaction in transactions:
+            transaction.wait()
+
+    def close(self):
+        """
+        Disconnects all pumps and closes the port (if not used by other machines).
+        """
+        for pump in self._pumps.values():
+            pump.disconnect()
+        self._pumps = {}
+        if self._scheduler is not None:
+            self._scheduler.release()
+            self._scheduler = None
+
+    def __enter__(self) -> "ModbusBus":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,172 @@
+import struct
+from typing import Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+
+_REQUEST = struct.Struct(">BBHH") # slave, function, register, value (or count)
+_CRC = struct.Struct("<H") # the CRC is sent low byte first
+
+def _crc_table() -> Tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+_CRC_TABLE = _crc_table()
+
+def crc16(data: Buffer, crc: int = 0xFFFF) -> int:
+    """
+    Computes the Modbus CRC-16 of a frame (table-driven, one lookup per byte).
+
+    Args:
+        data (Buffer): Bytes of the frame (bytes, bytearray or memoryview).
+        crc (int): Start value, e.g. the CRC of the preceding bytes. Default is 0xFFFF.
+
+    Returns:
+        int: CRC (0 for a complete frame with a correct CRC).
+    """
+    table = _CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+def with_crc(data: Buffer) -> bytes:
+    """
+    Appends the CRC to a frame.
+
+    Args:
+        data (Buffer): Frame without CRC (address, function code and data).
+
+    Returns:
+        bytes: The frame including the CRC.
+    """
+    return bytes(data) + _CRC.pack(crc16(data))
+
+def encode(slave: int, function: int, register: int, value: int) -> bytes:
+    """
+    Encodes a request with a register and a 16 bit value (read holding registers: count, write single register: value).
+
+    Args:
+        slave (int): Slave address (e.g. 1).
+        function (int): Function code (e.g. READ_HOLDING_REGISTERS).
+        register (int): Register address (e.g. 0xFD00).
+        value (int): Value or register count (0 to 65535).
+
+    Returns:
+        bytes: The frame including the CRC.
+    """
+    return with_crc(_REQUEST.pack(slave, function, register, value))
+
+def encode_read(slave: int, register: int, count: int = 1) -> bytes:
+    """
+    Encodes a request reading holding registers (function code 0x03).
+
+    Args:
+        slave (int): Slave address.
+        register (int): First register address (e.g. 0xFD00).
+        count (int): Number of registers (1 to 125). Default is 1.
+
+    Returns:
+        bytes: The frame including the CRC.
+    """
+    if not 1 <= count <= 125:
+        raise ValueError("Register count must be between 1 and 125.")
+    return encode(slave, READ_HOLDING_REGISTERS, register, count)
+
+def encode_write(slave: int, register: int, value: int) -> bytes:
+    """
+    Encodes a request writing a single register (function code 0x06).
+
+    Args:
+        slave (int): Slave address.
+        register (int): Register address (e.g. 0xFA00).
+        value (int): Value (0 to 65535).
+
+    Returns:
+        bytes: The frame including the CRC.
+    """
+    return encode(slave, WRITE_SINGLE_REGISTER, register, value)
+
+def response_length(header: Buffer) -> int:
+    """
+    Returns the length of a response frame from its first 3 bytes (address, function code, byte count / register / exception code).
+
+    Args:
+        header (Buffer): At least the first 3 bytes of the response.
+
+    Returns:
+        int: Length of the complete frame including the CRC.
+    """
+    function = header[1]
+    if function == READ_HOLDING_REGISTERS:
+        return 3 + header[2] + 2
+    if function == WRITE_SINGLE_REGISTER:
+        return 8
+    return 5 # exception code + CRC
+
+class ModbusResponse:
+    """
+    Decoded response frame (see decode()).
+
+    Attributes:
+        slave (int): Slave address.
+        function (int): Function code (without the exception bit).
+        exception (int, optional): Exception code of an exception response, None otherwise.
+        address (int, optional): Register of a write response.
+        value (int, optional): Value of a write response, the registers of a read response as one big endian number.
+        data (bytes): Register data of a read response.
+    """
+    __slots__ = ("slave", "function", "exception", "address", "value", "data")
+
+    def __init__(self, slave: int, function: int, exception: Optional[int] = None, address: Optional[int] = None, value: Optional[int] = None, data: bytes = b""):
+        self.slave = slave
+        self.function = function
+        self.exception = exception
+        self.address = address
+        self.value = value
+        self.data = data
+
+    @property
+    def registers(self) -> Tuple[int, ...]:
+        """
+        Tuple[int, ...]: Register values of a read response.
+        """
+        return struct.unpack(f">{len(self.data) // 2}H", self.data)
+
+    def __repr__(self) -> str:
+        return (f"ModbusResponse(slave={self.slave}, function={self.function}, exception={self.exception}, "
+                f"address={self.address}, value={self.value}, data={self.data!r})")
+
+def decode(frame: Buffer) -> ModbusResponse:
+    """
+    Decodes a response frame and checks its CRC.
+
+    Args:
+        frame (Buffer): The complete frame (bytes, bytearray or memoryview).
+
+    Returns:
+        ModbusResponse: The decoded response (exception responses have 'exception' set).
+
+    Raises:
+        ValueError: If the frame is incomplete or the CRC is wrong.
+    """
+    if len(frame) < 5 or len(frame) != response_length(frame):
+        raise ValueError("Incomplete Modbus frame.")
+    if crc16(frame) != 0:
+        raise ValueError("CRC error.")
+    slave, function = frame[0], frame[1]
+    if function & 0x80:
+        return ModbusResponse(slave, function & 0x7F, exception=frame[2])
+    if function == READ_HOLDING_REGISTERS:
+        data = bytes(frame[3:-2])
+        return ModbusResponse(slave, function, value=int.from_bytes(data, "big"), data=data)
+    if function == WRITE_SINGLE_REGISTER:
+        address, value = struct.unpack_from(">HH", frame, 2)
+        return ModbusResponse(slave, function, address=address, value=value)
+    return ModbusResponse(slave, function)
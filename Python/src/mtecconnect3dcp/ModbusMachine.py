@@ -2,15 +2,16 @@
 
 
 # Standard library imports
-import math
 import time
-from threading import Timer
 
 # Third-party imports
 import serial
 
 # Typing
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Dict, Tuple
+
+from . import ModbusCodec
+from . import ModbusScheduler
 
 class ModbusMachine:
     """
@@ -24,15 +25,25 @@ class ModbusMachine:
     """
     def __init__(self, frequency_inverter_id: str = "01", baudrate: int = 19200, log: bool = False):
         self._frequency_inverter_id = frequency_inverter_id
+        self._slave = int(frequency_inverter_id, 16)
         self._baudrate = baudrate
         self._logging = log
         self._connected = False
         self._serial: Optional[serial.Serial] = None
-        self._keepalive_timer: Optional[Timer] = None
         self._keepalive_interval = 0.25  # seconds
         self._timeout = 0.2  # seconds
+        self._retry_count = 1
         self._keepalive_command = "03FD000001"
         self._keepalive_callback: Optional[Callable[[Any], None]] = None
+        self._scheduler: Optional[ModbusScheduler.ModbusScheduler] = None
+        self._transactions = 0
+        self._timeouts = 0
+        self._retries = 0
+        self._invalid = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._queue_wait_sum = 0.0
+        self._cpu_sum = 0.0
 
     def connect(self, port: str):
         """
@@ -44,13 +55,9 @@ class ModbusMachine:
         self._port = port
         if not self._port:
             raise ValueError("No serial port provided.")
-        self._serial = serial.Serial(
-            port=self._port,
-            baudrate=self._baudrate,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_TWO,
-            bytesize=serial.EIGHTBITS
-        )
+        # machines on the same port share the port and its transaction queue
+        self._scheduler = ModbusScheduler.ModbusScheduler.acquire(self._port, self._baudrate)
+        self._serial = self._scheduler.serial
         self._connected = True
         self._log(f"Connected to {self._port}")
 
@@ -58,167 +65,150 @@ class ModbusMachine:
         """
         Disconnects from the Modbus machine.
         """
-        if self._serial and self._serial.is_open:
-            self._serial.close()
+        self.stop_keepalive()
+        if self._scheduler is not None:
+            self._scheduler.release()
+            self._scheduler = None
+            self._serial = None
         self._connected = False
         self._log("Disconnected.")
 
-    def read(self, command: str) -> Any:
+    def read(self, command: str, priority: int = ModbusScheduler.POLLING) -> Any:
         """
         Reads a value from the Modbus machine.
 
         Args:
             command (str): The Modbus command to read.
+            priority (int): Priority class of the transaction (see ModbusScheduler). Default is POLLING.
 
         Returns:
             Any: The value read from the machine.
         """
-        return self._send_command("03" + command, 1)
+        return self._send_command("03" + command, 1, priority)
 
-    def write(self, command: str, value: int) -> Any:
+    def write(self, command: str, value: int, priority: int = ModbusScheduler.SETPOINT) -> Any:
         """
         Writes a value to the Modbus machine.
 
         Args:
             command (str): The Modbus command to write.
             value (int): The value to write.
+            priority (int): Priority class of the transaction (see ModbusScheduler). Default is SETPOINT.
 
         Returns:
             Any: The response from the machine.
         """
-        return self._send_command("06" + command, value)
+        return self._send_command("06" + command, value, priority)
 
-    def _send_command(self, parameter: str, value: int) -> Any:
-        data = self._frequency_inverter_id + parameter + self._int2hex(value, 4)
-        return self._send_hex_command(data)
+    def read_registers(self, command: str, count: int, priority: int = ModbusScheduler.POLLING) -> Optional[Tuple[int, ...]]:
+        """
+        Reads consecutive registers with one request (function code 0x03).
 
-    def _send_hex_command(self, data: str) -> Any:
-        crc = self._calc_crc(data)
-        command = data + crc
-        return self._send_and_receive(command)
+        Args:
+            command (str): The first register (e.g. 'FD00').
+            count (int): Number of registers (1 to 125).
+            priority (int): Priority class of the transaction (see ModbusScheduler). Default is POLLING.
 
-    def _send_and_receive(self, command: str) -> Any:
-        if not self._connected or not self._serial:
-            raise RuntimeError("Not connected to Modbus machine.")
-        self._log(f"Sending: {command}")
-        self._serial.write(bytes.fromhex(command))
-        res = self._wait_for_response()
-        if res is None:
-            self._log("No valid response received. - Retries once.")
-            self._serial.write(bytes.fromhex(command))
-            res = self._wait_for_response()
-        if res is None:
-            self._log("No valid response received after retry.")
-        return res
-
-
-    def _wait_for_response(self) -> Any:
-        ONE_SECOND = 1_000_000_000
-        timeout = time.time_ns() + (self._timeout * ONE_SECOND)
-        while True:
-            if self._serial.inWaiting() >= 2:
-                break
-            if time.time_ns() > timeout:
-                self._log("Timeout waiting for response header.")
-                self._serial.read(self._serial.inWaiting())
-                return None
-        message_fcID = int.from_bytes(self._serial.read(1), "little")
-        message_type = int.from_bytes(self._serial.read(1), "little")
-        command = self._int2hex(message_fcID, 2) + self._int2hex(message_type, 2)
-
-        if message_type == 3:  # Type: read
-            message_length = int.from_bytes(self._serial.read(1), "little")
-            command += self._int2hex(message_length, 2)
-            complete_data_length = message_length + 2  # data + CRC
-        elif message_type == 6:  # Type: send
-            complete_data_length = 6  # param(2) + value(2) + CRC(2)
-        else:
-            complete_data_length = 2  # CRC only
-
-        while True:
-            if self._serial.inWaiting() >= complete_data_length:
-                break
-            if time.time_ns() > timeout:
-                self._log("Timeout waiting for response body.")
-                self._serial.read(self._serial.inWaiting())
-                return None
-
-        is_error = False
-        if message_type == 3:
-            message_value = 0
-            for _ in range(message_length):
-                message_value = (message_value << 8) + int.from_bytes(self._serial.read(1), "little")
-                command += self._int2hex(message_value & 0xFF, 2)
-        elif message_type == 6:
-            param = self._int2hex(int.from_bytes(self._serial.read(1), "little"), 2) + self._int2hex(int.from_bytes(self._serial.read(1), "little"), 2)
-            command += param
-            value0 = int.from_bytes(self._serial.read(1), "little")
-            value1 = int.from_bytes(self._serial.read(1), "little")
-            message_value = value0 * 256 + value1
-            command += self._int2hex(message_value, 4)
-        elif message_type == 0x86:
-            message_value = int.from_bytes(self._serial.read(1), "little")
-            command += self._int2hex(message_value, 2)
-            is_error = True
-        else:
-            message_value = None
-
-        crc = self._int2hex(int.from_bytes(self._serial.read(1), "little"), 2) + self._int2hex(int.from_bytes(self._serial.read(1), "little"), 2)
-        if self._calc_crc(command) != crc:
-            is_error = True
-            self._log("CRC error.")
-        if is_error:
-            self._log("Error in Modbus response.")
+        Returns:
+            Tuple[int, ...]: The register values, None if no valid response was received.
+        """
+        response = self._transaction(ModbusCodec.encode_read(self._slave, int(command, 16), count), priority)
+        if response is None or len(response.data) != 2 * count:
             return None
-        return message_value
+        return response.registers
+
+    def _send_command(self, parameter: str, value: int, priority: int = ModbusScheduler.POLLING) -> Any:
+        # parameter: function code and register as hex (e.g. '03FD00')
+        return self._send_and_receive(ModbusCodec.encode(self._slave, int(parameter[:2], 16), int(parameter[2:], 16), value), priority)
+
+    def _send_hex_command(self, data: str, priority: int = ModbusScheduler.POLLING) -> Any:
+        return self._send_and_receive(ModbusCodec.with_crc(bytes.fromhex(data)), priority)
+
+    def _send_and_receive(self, frame: bytes, priority: int = ModbusScheduler.POLLING) -> Any:
+        response = self._transaction(frame, priority)
+        return response.value if response is not None else None
+
+    def _transaction(self, frame: bytes, priority: int) -> Optional[ModbusCodec.ModbusResponse]:
+        if not self._connected or not self._scheduler:
+            raise RuntimeError("Not connected to Modbus machine.")
+        start = time.perf_counter()
+        if self._logging:
+            self._log(f"Sending: {frame.hex().upper()}")
+        transaction = self._scheduler.execute(frame, self._timeout, self._retry_count, priority, self._log)
+        self._transactions += 1
+        self._retries += transaction.attempts - 1
+        self._timeouts += transaction.timeouts
+        self._invalid += transaction.invalid
+        latency = time.perf_counter() - start
+        self._latency_sum += latency
+        self._latency_max = max(self._latency_max, latency)
+        self._queue_wait_sum += transaction.queue_wait
+        self._cpu_sum += transaction.cpu
+        return transaction.response
+
+    def transaction_metrics(self) -> Dict[str, Any]:
+        """
+        Returns the metrics of the Modbus transactions (request and response, including a retry).
+
+        Returns:
+            Dict[str, Any]: 'transactions', 'timeouts', 'retries', 'invalid' (CRC or exception responses), 'latency_avg' and 'latency_max'
+                (ms, including the wait in the queue of the port), 'queue_wait_avg' (ms) and 'cpu_avg' (CPU time per transaction in ms).
+                See ModbusScheduler.metrics() for the metrics of the port.
+        """
+        count = self._transactions
+        return {
+            "transactions": count,
+            "timeouts": self._timeouts,
+            "retries": self._retries,
+            "invalid": self._invalid,
+            "latency_avg": self._latency_sum / count * 1000 if count else 0.0,
+            "latency_max": self._latency_max * 1000,
+            "queue_wait_avg": self._queue_wait_sum / count * 1000 if count else 0.0,
+            "cpu_avg": self._cpu_sum / count * 1000 if count else 0.0,
+        }
 
     def keepalive(self, callback: Optional[Callable[[Any], None]] = None, interval: float = 0.25):
         """
         Starts a keepalive loop sending a command at a regular interval.
+        The keepalives of all machines on the port run in one schedule (see ModbusScheduler.start_keepalive()),
+        without callback a keepalive is skipped if the machine answered another request within the interval.
 
         Args:
             callback (Callable): Function to call with the response.
             interval (float): Interval in seconds.
         """
+        if not self._connected or not self._scheduler:
+            raise RuntimeError("Not connected to Modbus machine.")
         self._keepalive_callback = callback
         self._keepalive_interval = interval
-        self._keepalive_loop()
-
-    def _keepalive_loop(self):
-        if not self._connected:
-            return
-        value = self._send_hex_command(self._frequency_inverter_id + self._keepalive_command)
-        if self._keepalive_callback:
-            self._keepalive_callback(value)
-        self._keepalive_timer = Timer(self._keepalive_interval, self._keepalive_loop)
-        self._keepalive_timer.start()
+        frame = ModbusCodec.with_crc(bytes.fromhex(self._frequency_inverter_id + self._keepalive_command))
+        self._scheduler.start_keepalive(self._slave, frame, interval, self._timeout, self._retry_count, callback, self._log)
 
     def stop_keepalive(self):
         """
         Stops the keepalive loop.
         """
-        if self._keepalive_timer:
-            self._keepalive_timer.cancel()
-            self._keepalive_timer = None
+        if self._scheduler is not None:
+            self._scheduler.stop_keepalive(self._slave)
+
+    def port_metrics(self) -> Dict[str, Any]:
+        """
+        Returns the metrics of the serial port shared by all machines on it (see ModbusScheduler.metrics()).
+
+        Returns:
+            Dict[str, Any]: Bus utilisation, queue wait per priority class and statistics per slave.
+        """
+        if self._scheduler is None:
+            raise RuntimeError("Not connected to Modbus machine.")
+        return self._scheduler.metrics()
 
     def _int2hex(self, value: int, length: int) -> str:
-        s = hex(value)[2:]
-        while len(s) < length:
-            s = "0" + s
-        return s.upper()
+        return format(value, f"0{length}X")
 
     def _calc_crc(self, command: str) -> str:
-        buffer = bytearray.fromhex(command)
-        crc = 0xFFFF
-        for pos in range(len(buffer)):
-            crc ^= buffer[pos]
-            for _ in range(8):
-                if (crc & 0x0001) != 0:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        return self._int2hex((crc % 256) * 256 + math.floor(crc / 256), 4)
+        # CRC of a hex frame as hex (low byte first), see ModbusCodec for frames as bytes
+        crc = ModbusCodec.crc16(bytes.fromhex(command))
+        return self._int2hex((crc & 0xFF) << 8 | crc >> 8, 4)
 
     def _log(self, content: str):
         if self._logging:
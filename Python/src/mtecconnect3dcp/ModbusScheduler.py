@@ -0,0 +1,484 @@
+import itertools
+import queue
+import threading
+import time
+from typing import Optional, Callable, Any, Dict, Tuple
+
+import serial
+
+from . import ModbusCodec
+
+# Priority classes, lower runs first
+EMERGENCY = 0 # emergency stop
+SETPOINT = 1 # writes (run, speed, direction)
+POLLING = 2 # keepalive and telemetry reads
+
+_PRIORITY_NAMES = {EMERGENCY: "emergency", SETPOINT: "setpoint", POLLING: "polling"}
+
+_BITS_PER_CHARACTER = 11 # start bit, 8 data bits, 2 stop bits
+
+class ModbusTransaction:
+    """
+    A request frame waiting for or holding its response (see ModbusScheduler.submit()).
+
+    Attributes:
+        frame (bytes): Request frame including the CRC.
+        timeout (float): Response timeout per attempt in s.
+        retries (int): Attempts after the first one if no valid response was received.
+        priority (int): Priority class (EMERGENCY, SETPOINT or POLLING).
+        response (ModbusResponse, optional): The response, None if no valid response was received.
+        attempts (int): Number of times the frame was sent.
+        timeouts (int): Attempts without a complete response.
+        invalid (int): Attempts with a CRC error or an exception response.
+        queue_wait (float): Time between submit and the first attempt in s.
+        duration (float): Time the bus was used by the transaction in s.
+        cpu (float): CPU time of the bus thread used by the transaction in s.
+    """
+    __slots__ = ("frame", "timeout", "retries", "priority", "log", "response", "error", "attempts", "timeouts", "invalid",
+                 "submitted", "queue_wait", "duration", "cpu", "_done")
+
+    def __init__(self, frame: bytes, timeout: float, retries: int, priority: int, log: Optional[Callable[[str], Any]] = None):
+        self.frame = frame
+        self.timeout = timeout
+        self.retries = retries
+        self.priority = priority
+        self.log = log
+        self.response: Optional[ModbusCodec.ModbusResponse] = None
+        self.error: Optional[BaseException] = None
+        self.attempts = 0
+        self.timeouts = 0
+        self.invalid = 0
+        self.submitted = time.perf_counter()
+        self.queue_wait = 0.0
+        self.duration = 0.0
+        self.cpu = 0.0
+        self._done = threading.Event()
+
+    def wait(self) -> Optional[ModbusCodec.ModbusResponse]:
+        """
+        Waits until the transaction was executed.
+
+        Returns:
+            ModbusResponse: The response, None if no valid response was received.
+
+        Raises:
+            Exception: Errors of the serial port.
+        """
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+class ModbusScheduler:
+    """
+    Serializes the Modbus transactions on one serial port.
+
+    All frames on the port are sent by one bus thread, one transaction (request, response and retries)
+    at a time, so the responses cannot be mixed up between threads (e.g. commands and the keepalive timer).
+    Waiting transactions run by priority class: EMERGENCY before SETPOINT before POLLING. Within a class the
+    slaves take turns (round robin by slave address, in order of submission per slave), so a busy drop cannot
+    starve the others. A running transaction is not interrupted.
+    Machines on the same port share one scheduler (see acquire()), the port is closed when the last one is released.
+
+    The keepalives of all slaves run in one schedule (see start_keepalive()). A keepalive without callback is
+    skipped if the slave answered another request within the interval.
+
+    Responses are read with blocking reads of the expected frame length (the serial timeout is only changed when
+    the response timeout of a transaction differs from the previous one), frames are separated by the
+    Modbus RTU silence of 3.5 characters (derived from the baudrate, 1.75 ms above 19200 baud).
+
+    Args:
+        port (str): Serial port (e.g. 'COM3' or '/dev/ttyUSB0').
+        baudrate (int): Baudrate. Default is 19200.
+    """
+    _registry: Dict[str, "ModbusScheduler"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, port: str, baudrate: int = 19200):
+        self.port = port
+        self.baudrate = baudrate
+        self.serial = serial.Serial(
+            port=port,
+            baudrate=baudrate,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_TWO,
+            bytesize=serial.EIGHTBITS,
+            timeout=0.2
+        )
+        self._read_timeout = 0.2 # timeout of the serial port
+        self._character_time = _BITS_PER_CHARACTER / baudrate
+        self._frame_gap = 3.5 * self._character_time if baudrate <= 19200 else 0.00175
+        self._last_activity = 0.0 # time the bus was last busy (perf_counter)
+        self._references = 0
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._busy = 0.0
+        self._transactions = 0
+        self._waits = {priority: [0, 0.0, 0.0] for priority in _PRIORITY_NAMES} # count, sum, max
+        self._served = {priority: 0 for priority in _PRIORITY_NAMES} # round of the last transaction executed
+        self._rounds: Dict[Tuple[int, int], int] = {} # (priority, slave) -> round of the last transaction queued
+        self._slaves: Dict[int, _SlaveStatistics] = {}
+        self._keepalives: Dict[int, _Keepalive] = {}
+        self._keepalive_wake = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def acquire(cls, port: str, baudrate: int = 19200) -> "ModbusScheduler":
+        """
+        Returns the scheduler of a port, opening the port if necessary.
+
+        Args:
+            port (str): Serial port.
+            baudrate (int): Baudrate. Default is 19200.
+
+        Returns:
+            ModbusScheduler: The scheduler, release() it when done.
+
+        Raises:
+            ValueError: If the port is already open with another baudrate.
+        """
+        with cls._registry_lock:
+            scheduler = cls._registry.get(port)
+            if scheduler is None:
+                scheduler = cls(port, baudrate)
+                cls._registry[port] = scheduler
+            elif scheduler.baudrate != baudrate:
+                raise ValueError(f"{port} is already open with {scheduler.baudrate} baud.")
+            scheduler._references += 1
+            return scheduler
+
+    def release(self):
+        """
+        Releases one reference, the port is closed when no reference is left.
+        """
+        with ModbusScheduler._registry_lock:
+            self._references -= 1
+            if self._references > 0:
+                return
+            if ModbusScheduler._registry.get(self.port) is self:
+                del ModbusScheduler._registry[self.port]
+        self.close()
+
+    def close(self):
+        """
+        Stops the bus thread (after the running transaction) and closes the port. Waiting transactions fail.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._keepalives.clear()
+        self._keepalive_wake.set()
+        self._queue.put((-1, -1, -1, None))
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+        if self.serial.is_open:
+            self.serial.close()
+
+    def submit(self, frame: bytes, timeout: float = 0.2, retries: int = 1, priority: int = POLLING, log: Optional[Callable[[str], Any]] = None) -> ModbusTransaction:
+        """
+        Queues a request.
+
+        Args:
+            frame (bytes): Request frame including the CRC (see ModbusCodec).
+            timeout (float): Response timeout per attempt in s. Default is 0.2.
+            retries (int): Attempts after the first one if no valid response was received. Default is 1.
+            priority (int): EMERGENCY, SETPOINT or POLLING. Default is POLLING.
+            log (Callable, optional): Receives messages about timeouts and invalid responses. Defaults to None.
+
+        Returns:
+            ModbusTransaction: The transaction, wait() for its response.
+        """
+        if priority not in _PRIORITY_NAMES:
+            raise ValueError(f"Unknown priority {priority}.")
+        transaction = ModbusTransaction(frame, timeout, retries, priority, log)
+        key = (priority, frame[0])
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.port} is closed.")
+            # round robin: the n-th waiting transaction of a slave runs in the n-th round from now
+            turn = max(self._served[priority], self._rounds.get(key, 0)) + 1
+            self._rounds[key] = turn
+            self._queue.put((priority, turn, next(self._sequence), transaction))
+        return transaction
+
+    def execute(self, frame: bytes, timeout: float = 0.2, retries: int = 1, priority: int = POLLING, log: Optional[Callable[[str], Any]] = None) -> ModbusTransaction:
+        """
+        Queues a request and waits until it was executed (see submit()).
+
+        Returns:
+            ModbusTransaction: The executed transaction ('response' is None if no valid response was received).
+        """
+        transaction = self.submit(frame, timeout, retries, priority, log)
+        transaction.wait()
+        return transaction
+
+    def start_keepalive(self, slave: int, frame: bytes, interval: float = 0.25, timeout: float = 0.2, retries: int = 1,
+                        callback: Optional[Callable[[Any], Any]] = None, log: Optional[Callable[[str], Any]] = None):
+        """
+        Sends a request to a slave at a regular interval (POLLING priority), replacing an earlier keepalive of the slave.
+
+        Args:
+            slave (int): Slave address.
+            frame (bytes): Request frame including the CRC.
+            interval (float): Interval in s. Default is 0.25.
+            timeout (float): Response timeout per attempt in s. Default is 0.2.
+            retries (int): Attempts after the first one. Default is 1.
+            callback (Callable, optional): Receives the value of every response (None if no valid response). Without callback the
+                keepalive is skipped when the slave answered another request within the interval. Defaults to None.
+            log (Callable, optional): Receives messages about timeouts and invalid responses. Defaults to None.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.port} is closed.")
+            self._keepalives[slave] = _Keepalive(frame, interval, timeout, retries, callback, log)
+            if self._keepalive_thread is None:
+                self._keepalive_thread = threading.Thread(target=self._keepalive_loop, daemon=True)
+                self._keepalive_thread.start()
+        self._keepalive_wake.set()
+
+    def stop_keepalive(self, slave: int):
+        """
+        Stops the keepalive of a slave.
+
+        Args:
+            slave (int): Slave address.
+        """
+        with self._lock:
+            self._keepalives.pop(slave, None)
+        self._keepalive_wake.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the metrics of the bus.
+
+        Returns:
+            Dict[str, Any]: 'transactions', 'queued' (waiting now), 'utilisation' (share of the time the bus was busy since it was opened),
+                per priority class the queue wait ('queue_wait': name -> 'count', 'avg' and 'max' in ms) and per slave address
+                ('slaves': address -> 'transactions', 'failed' (no valid response), 'timeouts', 'retries', 'invalid', 'latency_avg' and 'latency_max' in ms).
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            return {
+                "transactions": self._transactions,
+                "queued": self._queue.qsize(),
+                "utilisation": self._busy / elapsed if elapsed > 0 else 0.0,
+                "queue_wait": {_PRIORITY_NAMES[priority]: {"count": count, "avg": total / count * 1000 if count else 0.0, "max": maximum * 1000}
+                               for priority, (count, total, maximum) in self._waits.items()},
+                "slaves": {slave: statistics.metrics() for slave, statistics in sorted(self._slaves.items())},
+            }
+
+    def _run(self):
+        while True:
+            priority, turn, _, transaction = self._queue.get()
+            if transaction is None:
+                break
+            with self._lock:
+                self._served[priority] = max(self._served[priority], turn)
+            start = time.perf_counter()
+            cpu = time.thread_time()
+            transaction.queue_wait = start - transaction.submitted
+            try:
+                self._execute(transaction)
+            except BaseException as e:
+                transaction.error = e
+            transaction.duration = time.perf_counter() - start
+            transaction.cpu = time.thread_time() - cpu
+            with self._lock:
+                self._transactions += 1
+                self._busy += transaction.duration
+                wait = self._waits[transaction.priority]
+                wait[0] += 1
+                wait[1] += transaction.queue_wait
+                wait[2] = max(wait[2], transaction.queue_wait)
+                slave = transaction.frame[0]
+                statistics = self._slaves.get(slave)
+                if statistics is None:
+                    statistics = self._slaves[slave] = _SlaveStatistics()
+                statistics.add(transaction)
+            transaction._done.set()
+        # transactions queued while closing
+        while not self._queue.empty():
+            transaction = self._queue.get()[-1]
+            if transaction is not None:
+                transaction.error = RuntimeError(f"{self.port} was closed.")
+                transaction._done.set()
+
+    def _execute(self, transaction: ModbusTransaction):
+        log = transaction.log
+        if self._read_timeout != transaction.timeout:
+            # reconfigures the port, only when the timeout differs from the previous transaction
+            self.serial.timeout = transaction.timeout
+            self._read_timeout = transaction.timeout
+        for attempt in range(transaction.retries + 1):
+            if attempt > 0 and log is not None:
+                log("No valid response received. - Retries.")
+            transaction.attempts += 1
+            self._send(transaction.frame)
+            response = self._wait_for_response(transaction)
+            if response is not None:
+                transaction.response = response
+                return
+        if log is not None:
+            log("No valid response received after retry.")
+
+    def _send(self, frame: bytes):
+        """
+        Writes a frame after the inter-frame silence (3.5 characters since the bus was last busy).
+        """
+        silence = self._last_activity + self._frame_gap - time.perf_counter()
+        if silence > 0:
+            time.sleep(silence)
+        self.serial.reset_input_buffer() # late or garbled bytes of an earlier frame
+        self.serial.write(frame)
+        # the frame is on the line for its transmission time
+        self._last_activity = time.perf_counter() + len(frame) * self._character_time
+
+    def _receive(self, length: int, deadline: float) -> bytes:
+        """
+        Reads length bytes until they arrived or the deadline passed.
+
+        Bytes already received are read without blocking. Otherwise the read blocks in the serial driver
+        (for at most the timeout of the transaction) while that ends before the deadline, then the port is polled.
+        """
+        data = b""
+        while len(data) < length:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            waiting = self.serial.in_waiting
+            if waiting:
+                data += self.serial.read(min(waiting, length - len(data)))
+            elif remaining >= self._read_timeout:
+                data += self.serial.read(length - len(data))
+            else:
+                time.sleep(min(remaining, self._frame_gap))
+        if data:
+            self._last_activity = time.perf_counter()
+        return data
+
+    def _wait_for_response(self, transaction: ModbusTransaction) -> Optional[ModbusCodec.ModbusResponse]:
+        log = transaction.log or _ignore
+        # the response arrives at the earliest after the request was transmitted
+        deadline = max(time.perf_counter(), self._last_activity) + transaction.timeout
+        # address, function code and the first byte of the body (byte count, register or exception code)
+        header = self._receive(3, deadline)
+        if len(header) < 3:
+            log("Timeout waiting for response header.")
+            transaction.timeouts += 1
+            return None
+        remaining = ModbusCodec.response_length(header) - 3
+        body = self._receive(remaining, deadline)
+        if len(body) < remaining:
+            log("Timeout waiting for response body.")
+            transaction.timeouts += 1
+            return None
+        try:
+            response = ModbusCodec.decode(header + body)
+        except ValueError as e:
+            transaction.invalid += 1
+            log(str(e))
+            return None
+        if response.slave != transaction.frame[0]:
+            transaction.invalid += 1
+            log(f"Response from slave {response.slave} instead of {transaction.frame[0]}.")
+            return None
+        if response.exception is not None:
+            transaction.invalid += 1
+            log(f"Error in Modbus response (exception code {response.exception}).")
+            return None
+        return response
+
+    def _keepalive_loop(self):
+        while True:
+            self._keepalive_wake.clear()
+            now = time.perf_counter()
+            due = []
+            with self._lock:
+                if self._closed:
+                    return
+                wait = None
+                for slave, keepalive in self._keepalives.items():
+                    if keepalive.due <= now:
+                        statistics = self._slaves.get(slave)
+                        # answered another request since the last keepalive and within the interval
+                        answered = statistics is not None and statistics.last_response > max(keepalive.due - keepalive.interval, keepalive.answered)
+                        if keepalive.callback is not None or not answered:
+                            due.append(keepalive)
+                        keepalive.due = max(keepalive.due + keepalive.interval, now)
+                    wait = keepalive.due - now if wait is None else min(wait, keepalive.due - now)
+            # all due keepalives are queued at once and interleaved with the other transactions
+            transactions = []
+            for keepalive in due:
+                try:
+                    transactions.append((keepalive, self.submit(keepalive.frame, keepalive.timeout, keepalive.retries, POLLING, keepalive.log)))
+                except RuntimeError:
+                    return # closed
+            for keepalive, transaction in transactions:
+                try:
+                    response = transaction.wait()
+                    keepalive.answered = time.perf_counter()
+                    if keepalive.callback is not None:
+                        keepalive.callback(response.value if response is not None else None)
+                except Exception as e:
+                    print("Error in keepalive:", e)
+            if not transactions:
+                self._keepalive_wake.wait(wait)
+
+class _Keepalive:
+    __slots__ = ("frame", "interval", "timeout", "retries", "callback", "log", "due", "answered")
+
+    def __init__(self, frame: bytes, interval: float, timeout: float, retries: int, callback: Optional[Callable[[Any], Any]], log: Optional[Callable[[str], Any]]):
+        self.frame = frame
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.callback = callback
+        self.log = log
+        self.due = time.perf_counter()
+        self.answered = 0.0 # time the last keepalive was completed
+
+class _SlaveStatistics:
+    __slots__ = ("transactions", "failed", "timeouts", "retries", "invalid", "latency_sum", "latency_max", "last_response")
+
+    def __init__(self):
+        self.transactions = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.invalid = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.last_response = 0.0 # time of the last valid response (perf_counter)
+
+    def add(self, transaction: ModbusTransaction):
+        self.transactions += 1
+        self.timeouts += transaction.timeouts
+        self.retries += max(0, transaction.attempts - 1)
+        self.invalid += transaction.invalid
+        latency = transaction.queue_wait + transaction.duration
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        if transaction.response is None:
+            self.failed += 1
+        else:
+            self.last_response = time.perf_counter()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "transactions": self.transactions,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "invalid": self.invalid,
+            "latency_avg": self.latency_sum / self.transactions * 1000 if self.transactions else 0.0,
+            "latency_max": self.latency_max * 1000,
+        }
+
+def _ignore(message: str):
+    pass
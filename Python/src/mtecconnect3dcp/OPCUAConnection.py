@@ -0,0 +1,502 @@
+from asyncua.sync import Client #https://github.com/FreeOpcUa/asyncua
+from asyncua import ua #https://github.com/FreeOpcUa/asyncua
+
+import threading
+import time
+from typing import Optional, Callable, Any, Dict, List
+
+from .ConnectionCache import ConnectionCache
+from .Dispatcher import ThreadPoolDispatcher
+from .LivebitEngine import LivebitEngine
+from .SubscriptionManager import SubscriptionManager
+
+class OPCUAConnection:
+    """
+    OPC-UA sessions to one server.
+
+    Holds the reader and writer client, the node cache, the subscriptions and the Livebit echo.
+    In single-session mode reader and writer are the same client; the asyncua client multiplexes
+    concurrent requests from several threads over the one session.
+    Machine objects connecting to the same endpoint share one connection (see acquire()),
+    it is closed when the last machine disconnects.
+
+    With reconnect enabled, a supervisor thread checks the session every second. When the
+    session is lost it reconnects with exponential backoff and recreates all subscriptions
+    (including the Livebit echo) with one request per publishing interval. The callbacks stay
+    registered, so nothing has to be subscribed again.
+
+    Args:
+        url (str): Endpoint URL (opc.tcp://<ip>:<port>).
+        register_nodes (bool): Whether to register the used nodes on the server (OPC-UA RegisterNodes service). Default is False.
+        fast (bool): Whether to skip loading the data type definitions of the server. Default is False.
+        cache (str, optional): Path of a ConnectionCache file for information resolved while connecting. Defaults to None.
+        single_session (bool): Whether to use one session for reading and writing instead of two. Default is False.
+        reconnect (bool): Whether to reconnect automatically when the session is lost. Default is True.
+    """
+    check_interval = 1.0 # s between two checks of the session
+    reconnect_delay = 1.0 # s before the first reconnect attempt, doubled after every failed attempt
+    reconnect_max_delay = 30.0 # s, maximum delay between two reconnect attempts
+    close_timeout = 5.0 # s close() waits for the supervisor thread
+
+    _registry: Dict[str, "OPCUAConnection"] = {}
+    _registry_lock = threading.Lock()
+    _caches: Dict[str, ConnectionCache] = {}
+
+    def __init__(self, url: str, register_nodes: bool = False, fast: bool = False, cache: Optional[str] = None, single_session: bool = False, reconnect: bool = True):
+        self.url = url
+        self._register_nodes = register_nodes
+        self._fast = fast
+        self._single_session = single_session
+        self._reconnect = reconnect
+        self._cache: Optional[ConnectionCache] = None
+        if cache is not None:
+            self._cache = OPCUAConnection._caches.setdefault(cache, ConnectionCache(cache))
+        self._build = ""
+        self._references = 0
+        self._shared = False
+        self._lock = threading.RLock() # start_livebit() resolves nodes with the lock held
+        self._connected = False
+        self._listeners: List[Callable] = []
+        self._livebits: Dict[str, LivebitEngine] = {} # base node -> livebit echo
+        self._capabilities: Dict[str, Optional[Dict[str, str]]] = {} # base node -> variable -> data type
+        self._node_cache: Dict[Any, Dict[str, Any]] = {}
+        self.reader: Optional[Client] = None
+        self.writer: Optional[Client] = None
+        self.subscriptions: Optional[SubscriptionManager] = None
+        # default dispatcher of the manager, the machines pass their own
+        self._dispatcher = ThreadPoolDispatcher(workers=1)
+        self._closing = threading.Event()
+        self._wake = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self._reconnects = 0
+        self._downtime = 0.0
+        self._last_downtime = 0.0
+        self._down_since: Optional[float] = None
+        self._clients_open = False
+
+    @classmethod
+    def acquire(cls, url: str, **options: Any) -> "OPCUAConnection":
+        """
+        Returns the shared connection for an endpoint, opening it if necessary.
+        Options only take effect for the machine opening the connection.
+
+        Args:
+            url (str): Endpoint URL (opc.tcp://<ip>:<port>).
+            **options: Options of the connection (see OPCUAConnection).
+
+        Returns:
+            OPCUAConnection: The connection, release() it when done.
+        """
+        with cls._registry_lock:
+            connection = cls._registry.get(url)
+            if connection is None:
+                connection = cls(url, **options)
+                connection._shared = True
+                connection.open()
+                cls._registry[url] = connection
+            connection._references += 1
+            return connection
+
+    @classmethod
+    def open_connections(cls) -> List["OPCUAConnection"]:
+        """
+        Returns the shared connections that are open (one per endpoint, see acquire()).
+
+        Returns:
+            List[OPCUAConnection]: The connections ('url' is the endpoint).
+        """
+        with cls._registry_lock:
+            return list(cls._registry.values())
+
+    def open(self):
+        """
+        Opens the reader and writer session (one session in single-session mode).
+        """
+        self._open_clients()
+        self.subscriptions = SubscriptionManager(self.reader, self._dispatcher, self._status_change_callback)
+        if self._cache is not None:
+            self._build = self._read_build()
+        self._connected = True
+        if not self._shared:
+            self._references = 1
+        if self._reconnect:
+            self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+            self._supervisor.start()
+
+    def _open_clients(self):
+        reader = Client(url=self.url)
+        writer = reader if self._single_session else Client(url=self.url)
+        clients = [reader] if writer is reader else [reader, writer]
+        try:
+            for client in clients:
+                client.connect()
+            # the library only uses scalar built-in types, the (slow) definitions are only needed for custom code
+            if not self._fast:
+                for client in clients:
+                    client.load_data_type_definitions()
+        except Exception:
+            _disconnect_quietly(clients)
+            raise
+        with self._lock:
+            self.reader = reader
+            self.writer = writer
+            self._clients_open = True
+            # node handles are only valid for the session they were resolved (or registered) in
+            self._node_cache = {reader: {}, writer: {}}
+
+    def release(self):
+        """
+        Releases one reference, the sessions are closed when no reference is left.
+        """
+        with OPCUAConnection._registry_lock:
+            self._references -= 1
+            if self._references > 0:
+                return
+            if self._shared and OPCUAConnection._registry.get(self.url) is self:
+                del OPCUAConnection._registry[self.url]
+        self.close()
+
+    def close(self):
+        """
+        Closes both sessions. A shared connection closed while still referenced is no longer returned by acquire().
+        """
+        with OPCUAConnection._registry_lock:
+            if self._shared and OPCUAConnection._registry.get(self.url) is self:
+                del OPCUAConnection._registry[self.url]
+        self._closing.set()
+        self._wake.set()
+        supervisor = self._supervisor
+        if supervisor is not None and supervisor is not threading.current_thread(): # closed by a status listener
+            # a reconnect attempt in progress ends with the current request
+            supervisor.join(self.close_timeout)
+        connected = self._connected
+        for livebit in self._livebits.values():
+            livebit.stop(unsubscribe=False)
+        self.subscriptions.clear()
+        self._dispatcher.close()
+        self._livebits = {}
+        self._capabilities = {}
+        self._node_cache = {}
+        self._connected = False
+        if connected:
+            self._clients_open = False
+            for client in self._clients():
+                client.disconnect()
+        else:
+            # lost (or being reconnected by the supervisor)
+            self._close_clients()
+
+    @property
+    def connected(self) -> bool:
+        """
+        bool: True if the sessions are connected.
+        """
+        return self._connected
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the connection metrics.
+
+        Returns:
+            Dict[str, Any]: 'connected', 'reconnects', 'downtime' (total time without session in s), 'last_downtime' (s),
+                'disconnected_for' (duration of the current outage in s, 0 if connected), 'subscriptions' and 'monitored_items'
+                (of all machines sharing the connection, see SubscriptionManager.metrics()).
+        """
+        down_since = self._down_since
+        metrics = {
+            "connected": self._connected,
+            "reconnects": self._reconnects,
+            "downtime": self._downtime + (time.monotonic() - down_since if down_since is not None else 0.0),
+            "last_downtime": self._last_downtime,
+            "disconnected_for": time.monotonic() - down_since if down_since is not None else 0.0,
+        }
+        metrics.update(self.subscriptions.metrics())
+        return metrics
+
+    def add_listener(self, callback: Callable):
+        """
+        Adds a callback for connection status changes.
+
+        Args:
+            callback (Callable): Callback receiving the status.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable):
+        """
+        Removes a callback for connection status changes.
+
+        Args:
+            callback (Callable): Callback added with add_listener().
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def nodes(self, client: Client, nodeids: List[str]) -> list:
+        """
+        Returns the cached nodes for a client, resolving (and registering) all missing ones at once.
+
+        Args:
+            client (Client): Client (session) the nodes are used with.
+            nodeids (List[str]): Node ids.
+
+        Returns:
+            list: The nodes, in the order of the node ids.
+
+        Raises:
+            UaError: If the client is not (or no longer) a session of the connection.
+        """
+        with self._lock:
+            cache = self._node_cache.get(client)
+            if cache is None:
+                # client of a closed session (or of the session before a reconnect)
+                raise ua.UaError("Not connected to machine.")
+            missing = [nodeid for nodeid in dict.fromkeys(nodeids) if nodeid not in cache]
+            if not missing:
+                return [cache[nodeid] for nodeid in nodeids]
+        nodes = [client.get_node(nodeid) for nodeid in missing]
+        if self._register_nodes:
+            try:
+                nodes = client.register_nodes(nodes)
+            except ua.UaError:
+                pass # server does not support RegisterNodes, use the plain nodes
+        with self._lock:
+            cache.update(zip(missing, nodes))
+            return [cache[nodeid] for nodeid in nodeids]
+
+    def start_livebit(self, baseNode: str, livebitNode: str) -> LivebitEngine:
+        """
+        Starts echoing 'Livebit2extern' to the Livebit variable, once per base node.
+
+        Args:
+            baseNode (str): Base node of the machine.
+            livebitNode (str): Preferred Livebit variable ('Livebit2DuoMix' is tried as well).
+
+        Returns:
+            LivebitEngine: The echo of the base node ('parameter' is the Livebit variable used).
+
+        Raises:
+            ValueError: If no Livebit variable is found.
+        """
+        with self._lock:
+            if baseNode in self._livebits:
+                return self._livebits[baseNode]
+            cached = self._cached("livebit").get(baseNode)
+            index = self._browse(baseNode)
+            if cached is not None:
+                candidate = cached
+            elif index is not None:
+                for candidate in dict.fromkeys([livebitNode, "Livebit2DuoMix"]):
+                    if candidate in index:
+                        break
+                else:
+                    raise ValueError("Livebit node not found. Machine not supported.")
+            else:
+                # check if Livebit2machine exists, otherwise use Livebit2DuoMix
+                for candidate in dict.fromkeys([livebitNode, "Livebit2DuoMix"]):
+                    try:
+                        self.nodes(self.reader, [baseNode + candidate])[0].get_value()
+                        break
+                    except ua.UaError:
+                        pass
+                else:
+                    raise ValueError("Livebit node not found. Machine not supported.")
+                self._store("livebit", baseNode, candidate)
+            def target():
+                # resolved on every echo, the writer changes when the connection is reestablished
+                return self.nodes(self.writer, [baseNode + candidate])[0]
+            def source():
+                # resolved on every subscribe, registered nodes change when the connection is reestablished
+                return self.nodes(self.reader, [baseNode + "Livebit2extern"])[0]
+            livebit = LivebitEngine(self.subscriptions, source, target, candidate)
+            livebit.start()
+            self._livebits[baseNode] = livebit
+            return livebit
+
+    def capabilities(self, baseNode: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the variables available below a base node with their data types, browsed once per connection.
+
+        Args:
+            baseNode (str): Base node of the machine (the variable names are relative to it).
+
+        Returns:
+            Dict[str, str]: Data type name (e.g. 'Boolean', 'UInt16', 'Float') by variable, None if the server could not be browsed.
+        """
+        with self._lock:
+            return self._browse(baseNode)
+
+    def _browse(self, baseNode: str) -> Optional[Dict[str, str]]:
+        """
+        Browses the folder of a base node and reads the data types of its variables with one request (called with the lock held).
+        """
+        if baseNode in self._capabilities:
+            return self._capabilities[baseNode]
+        index = self._cached("capabilities").get(baseNode)
+        if index is None:
+            index = self._read_capabilities(baseNode)
+            if index is not None:
+                self._store("capabilities", baseNode, index)
+        self._capabilities[baseNode] = index
+        return index
+
+    def _read_capabilities(self, baseNode: str) -> Optional[Dict[str, str]]:
+        folder = baseNode[:-1] if baseNode.endswith(".") else baseNode
+        try:
+            children = self.reader.get_node(folder).get_children(nodeclassmask=ua.NodeClass.Variable)
+            types = self.reader.read_attributes(children, ua.AttributeIds.DataType) if children else []
+        except ua.UaError:
+            return None
+        index = {}
+        for child, result in zip(children, types):
+            nodeid = child.nodeid.to_string()
+            if nodeid.startswith(baseNode):
+                index[nodeid[len(baseNode):]] = _type_name(result)
+        # an empty folder means a wrong base node or a server hiding it, do not block the variables then
+        return index or None
+
+    def _clients(self) -> List[Client]:
+        """
+        Returns the distinct clients of the connection.
+        """
+        return [self.reader] if self.writer is self.reader else [self.reader, self.writer]
+
+    def _read_build(self) -> str:
+        """
+        Reads the build identification of the server (software version, build number and date) in one request.
+        """
+        nodes = [self.reader.get_node(ua.NodeId(identifier)) for identifier in (
+            ua.ObjectIds.Server_ServerStatus_BuildInfo_SoftwareVersion,
+            ua.ObjectIds.Server_ServerStatus_BuildInfo_BuildNumber,
+            ua.ObjectIds.Server_ServerStatus_BuildInfo_BuildDate,
+        )]
+        return "/".join(str(value) for value in self.reader.read_values(nodes))
+
+    def _cached(self, section: str) -> Dict[str, Any]:
+        """
+        Returns a section of the cache entry of this server (empty without cache).
+        """
+        if self._cache is None:
+            return {}
+        return self._cache.get(self.url, self._build).get(section, {})
+
+    def _store(self, section: str, key: str, value: Any):
+        """
+        Stores a value in a section of the cache entry of this server.
+        """
+        if self._cache is None:
+            return
+        self._cache.put(self.url, self._build, section, key, value)
+
+    def _status_change_callback(self, status):
+        """
+        Callback for subscription status changes.
+
+        Args:
+            status: The new status.
+        """
+        if self._reconnect:
+            # the supervisor checks the session and notifies the listeners
+            if status != ua.StatusCode(0):
+                self._wake.set()
+            return
+        self._connected = status == ua.StatusCode(0)
+        self._notify(status)
+
+    def _notify(self, status):
+        for listener in list(self._listeners):
+            listener(status)
+
+    def _supervise(self):
+        """
+        Supervisor thread: checks the session and reconnects when it is lost.
+        """
+        while not self._closing.is_set():
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+            if self._closing.is_set():
+                return
+            try:
+                self.reader.get_node(ua.NodeId(ua.ObjectIds.Server_ServerStatus_State)).get_value()
+                continue
+            except Exception as e:
+                if self._closing.is_set():
+                    return
+                print(f"Connection to {self.url} lost:", e)
+            self._connected = False
+            self._down_since = time.monotonic()
+            self.subscriptions.suspend()
+            self._notify(ua.StatusCode(ua.StatusCodes.BadConnectionClosed))
+            self._close_clients()
+            self._reestablish()
+
+    def _reestablish(self):
+        """
+        Reconnects with exponential backoff and recreates the subscriptions.
+        """
+        delay = self.reconnect_delay
+        resolve = None
+        if self._register_nodes:
+            # registered node ids are only valid in the lost session
+            registered = {node.nodeid: nodeid for nodeid, node in self._node_cache.get(self.reader, {}).items()}
+            resolve = lambda nodeids: self._reregister(registered, nodeids)
+        while not self._closing.wait(delay):
+            try:
+                self._open_clients()
+                self.subscriptions.restore(self.reader, resolve)
+            except Exception as e:
+                self._close_clients()
+                delay = min(delay * 2, self.reconnect_max_delay)
+                print(f"Reconnect to {self.url} failed, retrying in {delay:.0f} s:", e)
+                continue
+            if self._closing.is_set():
+                self._close_clients()
+                return
+            self._last_downtime = time.monotonic() - self._down_since
+            self._downtime += self._last_downtime
+            self._down_since = None
+            self._reconnects += 1
+            self._connected = True
+            print(f"Reconnected to {self.url} after {self._last_downtime:.1f} s.")
+            self._notify(ua.StatusCode(0))
+            return
+
+    def _reregister(self, registered: Dict[Any, str], nodeids: list) -> list:
+        """
+        Registers the nodes of the lost session again on the reader, by node id of the lost session.
+        """
+        originals = [registered.get(nodeid) for nodeid in nodeids]
+        known = [original for original in originals if original is not None]
+        nodes = dict(zip(known, self.nodes(self.reader, known))) if known else {}
+        return [nodes[original].nodeid if original is not None else nodeid for original, nodeid in zip(originals, nodeids)]
+
+    def _close_clients(self):
+        """
+        Closes the clients of a lost connection (once).
+        """
+        with self._lock:
+            if not self._clients_open:
+                return
+            self._clients_open = False
+        _disconnect_quietly(self._clients())
+
+def _type_name(result: ua.DataValue) -> str:
+    """
+    Name of the data type in the result of reading a DataType attribute ('Boolean', 'UInt16', ...).
+    """
+    if not result.StatusCode.is_good() or result.Value is None:
+        return ""
+    nodeid = result.Value.Value
+    if nodeid.NamespaceIndex == 0 and isinstance(nodeid.Identifier, int):
+        return ua.ObjectIdNames.get(nodeid.Identifier, nodeid.to_string())
+    return nodeid.to_string()
+
+def _disconnect_quietly(clients: List[Client]):
+    """
+    Closes clients whose connection may already be lost.
+    """
+    for client in clients:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
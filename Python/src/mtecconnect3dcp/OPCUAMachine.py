@@ -1,72 +1,184 @@
 from asyncua.sync import Client #https://github.com/FreeOpcUa/asyncua
 from asyncua import ua #https://github.com/FreeOpcUa/asyncua
 
+from .Dispatcher import Dispatcher, InlineDispatcher, ThreadPoolDispatcher
+from .LivebitEngine import LivebitEngine
+from .Mirror import Mirror
+from .OPCUAConnection import OPCUAConnection
+from .Parameter import Parameter, ENCODERS
+from .SetpointChannel import SetpointChannel
+from .SubscriptionManager import SubscriptionManager, SubscriptionHandle, MonitoringOptions
+
 import inspect
-from typing import Optional, Callable, Any, Union
-import threading
+from typing import Optional, Callable, Any, Union, Dict, List, Tuple
 
 class OPCUAMachine:
     """
     Base class for OPC-UA machine communication.
 
     Args:
-        ip (str): IP address of the machine.
         baseNode (str): Base node of the machine.
+        livebitNode (str): Livebit variable written by the client.
+        dispatcher (Dispatcher, optional): Executes the subscription callbacks. Defaults to a ThreadPoolDispatcher (stopped by disconnect()).
     """
-    def __init__(self, baseNode = "ns=4;s=|var|B-Fortis CC-Slim S04.Application.GVL_OPC.", livebitNode = "Livebit2machine"):
+    # Property name -> Parameter. The properties are generated from it (unless defined in the class) and it is
+    # used by read_many(), snapshot(), mirrors and recorders; subclasses extend it, all tables along the MRO are merged.
+    _properties: Dict[str, Parameter] = {}
+    # Machine model (e.g. 'duo-mix 3DCP+'), set by the concrete classes
+    _model: Optional[str] = None
+
+    def __init__(self, baseNode = "ns=4;s=|var|B-Fortis CC-Slim S04.Application.GVL_OPC.", livebitNode = "Livebit2machine", dispatcher: Optional[Dispatcher] = None):
         self._baseNode = baseNode
         self._liveBitNode = livebitNode
         self._connected = False
+        self._connection: Optional[OPCUAConnection] = None
+        self._handles: List[SubscriptionHandle] = []
+        self._channels: List[SetpointChannel] = []
+        self._mirrors: List[Mirror] = []
+        self._subscription_defaults: Dict[str, Tuple[Optional[int], Optional[MonitoringOptions]]] = {} # variable -> (interval, options)
+        self._dispatcher = dispatcher if dispatcher is not None else ThreadPoolDispatcher()
+        self._owns_dispatcher = dispatcher is None # a dispatcher passed in may be shared with other machines
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, parameter in _properties(cls).items():
+            if not any(name in base.__dict__ for base in cls.__mro__):
+                setattr(cls, name, _parameter_property(parameter))
+
+    @classmethod
+    def schema(cls) -> Dict[str, Parameter]:
+        """
+        Returns the parameters of the machine (merged '_properties' tables).
+
+        Returns:
+            Dict[str, Parameter]: Parameter by property name.
+        """
+        return dict(_properties(cls))
 
-    def connect(self, ip: str):
+    def connect(self, ip: str, register_nodes: bool = False, shared: bool = True, fast: bool = False, cache: Optional[str] = None, single_session: bool = False, reconnect: bool = True):
         """
         Connects to the machine using the provided IP address.
 
         Args:
             ip (str): IP address of the machine.
+            register_nodes (bool): Whether to register the used nodes on the server (OPC-UA RegisterNodes service) for faster access. Default is False.
+            shared (bool): Whether to share the sessions, subscriptions and Livebit echo with other machine objects connected to the same address (e.g. Printhead and Dosingpump of a flow-matic PX). Default is True.
+            fast (bool): Whether to skip loading the data type definitions of the server (not needed by this library). Default is False.
+            cache (str, optional): Path of a file caching information resolved while connecting (e.g. the Livebit variable), keyed by server address and build. Defaults to None.
+            single_session (bool): Whether to use one OPC-UA session for reads, writes and subscriptions instead of two (for servers with few session slots). Default is False.
+            reconnect (bool): Whether to reconnect automatically when the connection is lost. Subscriptions, mirrors and the Livebit echo are restored. Default is True.
         """
-        self._ip = ip
-        if not self._ip:
-            raise ValueError("No IP address provided.")
-        
-        # check if ip address starts with opc.tcp://, if not add it
-        if not self._ip.startswith("opc.tcp://"):
-            self._ip = "opc.tcp://" + self._ip
-
-        # check if ip address has port, if not add default port 4840
-        if ":" not in self._ip.split("//")[1]:
-            self._ip += ":4840"
+        self._ip = _endpoint_url(ip)
+        if self._connection is not None:
+            # connected before, release that connection (and its subscriptions) first
+            self.disconnect()
         
-        self._reader = Client(url=self._ip)
-        self._writer = Client(url=self._ip)
-        self._reader.connect()
-        self._writer.connect()
-        self._reader.load_data_type_definitions()
-        self._writer.load_data_type_definitions()
+        options = {"register_nodes": register_nodes, "fast": fast, "cache": cache, "single_session": single_session, "reconnect": reconnect}
+        if shared:
+            self._connection = OPCUAConnection.acquire(self._ip, **options)
+        else:
+            self._connection = OPCUAConnection(self._ip, **options)
+            self._connection.open()
+        self._connection.add_listener(self._status_change_callback)
+        self._handles = []
 
         self._connected = True
 
-        # check if Livebit2machine exists, otherwise use Livebit2DuoMix
-        try:
-            self.read(self._liveBitNode)
-        except ua.UaError:
-            self._liveBitNode = "Livebit2DuoMix"
-        # check if Livebit2DuoMix exists, otherwise throw error
         try:
-            self.read(self._liveBitNode)
-        except ua.UaError:
-            raise ValueError("Livebit node not found. Machine not supported.")
-
-        self.subscribe("Livebit2extern", self.changeLivebit, 500)
+            self._livebit = self._connection.start_livebit(self._baseNode, self._liveBitNode)
+            self._liveBitNode = self._livebit.parameter
+        except ValueError:
+            self.disconnect()
+            raise
         
     
     def disconnect(self):
         """
         Disconnects from the machine.
+        The sessions are only closed if no other machine object shares them. Does nothing if not connected.
         """
-        self._reader.disconnect()
-        self._writer.disconnect()
+        connection = self._connection
+        if connection is None:
+            return
+        for channel in self._channels:
+            channel.close()
+        self._channels = []
         self._connected = False
+        connection.remove_listener(self._status_change_callback)
+        # while the session is lost the subscriptions are only removed locally, so they are not restored
+        for mirror in self._mirrors:
+            mirror.close()
+        self._mirrors = []
+        for handle in self._handles:
+            handle.delete()
+        self._handles = []
+        self._connection = None
+        connection.release()
+        if self._owns_dispatcher:
+            self._dispatcher.close()
+
+    @property
+    def _reader(self) -> Client:
+        return self._open_connection.reader
+
+    @property
+    def _writer(self) -> Client:
+        return self._open_connection.writer
+
+    @property
+    def _subscriptions(self) -> SubscriptionManager:
+        return self._open_connection.subscriptions
+
+    @property
+    def _open_connection(self) -> OPCUAConnection:
+        if self._connection is None:
+            raise ua.UaError("Not connected to machine.")
+        return self._connection
+
+    @property
+    def livebit(self) -> LivebitEngine:
+        """
+        LivebitEngine: Echo of the Livebit (PLC watchdog), e.g. 'livebit.configure(interval=100, timeout=2.0, on_warning=callback)' and 'livebit.metrics()'.
+        """
+        return self._livebit
+
+    @property
+    def capabilities(self) -> Optional[Dict[str, str]]:
+        """
+        Dict[str, str]: Variables of the machine with their data types (e.g. {'Remote_start': 'Boolean', ...}), browsed once when connecting. None if the server could not be browsed.
+        """
+        return self._open_connection.capabilities(self._baseNode)
+
+    def supports(self, parameter: str) -> bool:
+        """
+        Checks if the machine has an OPC-UA variable, without contacting the machine.
+
+        Args:
+            parameter (str): Variable name.
+
+        Returns:
+            bool: False if the variable is not available, True if it is (or if the server could not be browsed).
+        """
+        capabilities = self.capabilities
+        return capabilities is None or parameter in capabilities
+
+    def connection_metrics(self) -> Dict[str, Any]:
+        """
+        Returns the metrics of the connection.
+
+        Returns:
+            Dict[str, Any]: 'connected', 'reconnects', 'downtime' (total time without connection in s), 'last_downtime' (s),
+                'disconnected_for' (duration of the current outage in s, 0 if connected), 'subscriptions' and 'monitored_items'
+                (of all machines sharing the connection).
+        """
+        return self._open_connection.metrics()
+
+    @property
+    def dispatcher(self) -> Dispatcher:
+        """
+        Dispatcher: Executes the subscription callbacks ('dispatcher.metrics()' shows queue depth and dropped events).
+        """
+        return self._dispatcher
 
     def _status_change_callback(self, status):
         """
@@ -76,7 +188,8 @@ class OPCUAMachine:
             status: The new status.
         """
         print("Connection status changed:", status)
-        self._connected = status == ua.StatusCode(0)
+        connection = self._connection
+        self._connected = connection is not None and connection.connected
 
     def safe_change(self, parameter: str, value: Any, typ: str) -> bool:
         """
@@ -90,10 +203,13 @@ class OPCUAMachine:
         Returns:
             bool: True if successful, False if not supported.
         """
+        if not self.supports(parameter):
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return False
         try:
             self.change(parameter, value, typ)
             return True
-        except KeyError:
+        except ua.UaStatusCodeError:
             print(f"Feature '{parameter}' is not supported on this machine.")
             return False
     
@@ -108,9 +224,12 @@ class OPCUAMachine:
         Returns:
             Any: Value of the variable or default if not available.
         """
+        if not self.supports(parameter):
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return default
         try:
             return self.read(parameter)
-        except KeyError:
+        except ua.UaStatusCodeError:
             print(f"Feature '{parameter}' is not supported on this machine.")
             return default
     
@@ -130,22 +249,108 @@ class OPCUAMachine:
             self.easy_subscribe(parameter, value)
             return
 
-        if typ == "bool":
-            t = ua.VariantType.Boolean
-            value = bool(value)
-        elif typ == "uint16":
-            t = ua.VariantType.UInt16
-            value = int(abs(value))
-        elif typ == "int32":
-            t = ua.VariantType.Int32
-            value = int(value)
-        elif typ == "float":
-            t = ua.VariantType.Float
-            value = float(value)
-        else:
+        encode = ENCODERS.get(typ)
+        if encode is None:
             return
-        node = self._writer.get_node(self._baseNode + parameter)
-        node.set_value(ua.Variant(value, t))
+        self._write(parameter, encode(value))
+
+    def _write(self, parameter: str, variant: ua.Variant):
+        """
+        Writes an encoded value to an OPC-UA variable.
+
+        Args:
+            parameter (str): Variable to change.
+            variant (ua.Variant): Encoded value.
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        self._node(self._writer, parameter).set_value(variant)
+
+    def _safe_write(self, parameter: str, variant: ua.Variant) -> bool:
+        """
+        Writes an encoded value to an OPC-UA variable, with feature-not-supported feedback.
+
+        Returns:
+            bool: True if successful, False if not supported.
+        """
+        if not self.supports(parameter):
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return False
+        try:
+            self._write(parameter, variant)
+            return True
+        except ua.UaStatusCodeError:
+            print(f"Feature '{parameter}' is not supported on this machine.")
+            return False
+
+    def change_many(self, values: Dict[str, Any]) -> Dict[str, ua.StatusCode]:
+        """
+        Changes several OPC-UA variables with a single OPC-UA write request, so the machine receives them in the same cycle.
+
+        Args:
+            values (Dict[str, Any]): Variable -> (value, type), type as for change() ("bool", "uint16", "int32", "float"),
+                or writable property name -> value in the unit of the property (e.g. {'speed': 35, 'water': 120}).
+
+        Returns:
+            Dict[str, ua.StatusCode]: Status code of the write by variable (check with 'status.is_good()').
+
+        Raises:
+            ValueError: If a type is unknown or a value is out of range.
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        parameters, variants = _to_variants(values, _properties(type(self)))
+        if not parameters:
+            return {}
+        results = self._writer.write_values(self._nodes(self._writer, parameters), variants, raise_on_partial_error=False)
+        return dict(zip(parameters, results))
+
+    def setpoint_channel(self, parameter: str, typ: str, max_rate: float = 50, conversion: Optional[Callable[[Any], Any]] = None) -> SetpointChannel:
+        """
+        Creates a non-blocking writer for an OPC-UA variable that is changed at a high rate (e.g. a speed streamed from a toolpath).
+        Only the latest value is written, at most max_rate times per second. The channel is closed on disconnect().
+
+        Args:
+            parameter (str): Variable to change.
+            typ (str): String of variable type ("bool", "uint16", "int32", "float").
+            max_rate (float): Maximum number of writes per second. Default is 50.
+            conversion (Callable, optional): Converts the set values to the raw value of the variable. Defaults to None.
+
+        Returns:
+            SetpointChannel: The channel, use 'channel.set(value)'.
+        """
+        make = ENCODERS.get(typ)
+        if make is None:
+            raise ValueError(f"Unknown type '{typ}' for '{parameter}'.")
+        encode = make if conversion is None else lambda value: make(conversion(value))
+        return self._setpoint_channel(parameter, encode, max_rate)
+
+    def property_channel(self, name: str, max_rate: float = 50) -> SetpointChannel:
+        """
+        Creates a non-blocking writer for a writable property (see setpoint_channel()), e.g. 'speed'.
+
+        Args:
+            name (str): Property name.
+            max_rate (float): Maximum number of writes per second. Default is 50.
+
+        Returns:
+            SetpointChannel: The channel, use 'channel.set(value)' with the value in the unit of the property.
+
+        Raises:
+            ValueError: If the property is not writable.
+        """
+        parameter = _properties(type(self)).get(name)
+        if parameter is None or not parameter.writable:
+            raise ValueError(f"'{name}' is not a writable property.")
+        return self._setpoint_channel(parameter.variable, parameter.encode, max_rate)
+
+    def _setpoint_channel(self, parameter: str, encode: Callable[[Any], ua.Variant], max_rate: float) -> SetpointChannel:
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        # the node is resolved on every write, the session changes when the connection is reestablished
+        channel = SetpointChannel(lambda: self._node(self._writer, parameter), parameter, encode, max_rate)
+        self._channels.append(channel)
+        return channel
 
     def read(self, parameter: str) -> Any:
         """
@@ -157,10 +362,132 @@ class OPCUAMachine:
         Returns:
             Any: Value of the variable.
         """
-        node = self._reader.get_node(self._baseNode + parameter)
-        return node.get_value()
+        for mirror in self._mirrors:
+            found, value = mirror.lookup(parameter)
+            if found:
+                return value
+        node = self._node(self._reader, parameter)
+        value = node.get_value()
+        for mirror in self._mirrors:
+            mirror.update(value, parameter)
+        return value
+
+    def read_many(self, parameters: List[str], convert: bool = True) -> Dict[str, Any]:
+        """
+        Reads several OPC-UA variables with a single OPC-UA read request.
+
+        Args:
+            parameters (List[str]): Variables to read.
+            convert (bool): Whether to convert the values the same way the properties do (Hz scaling, inverted flags). Default is True.
+
+        Returns:
+            Dict[str, Any]: Values by variable. Variables not supported by the machine get the property default (or None).
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        parameters = list(dict.fromkeys(parameters))
+        if not parameters:
+            return {}
+        # variables the machine does not have are not requested
+        capabilities = self.capabilities
+        supported = [parameter for parameter in parameters if capabilities is None or parameter in capabilities]
+        results = {}
+        if supported:
+            results = dict(zip(supported, self._reader.read_attributes(self._nodes(self._reader, supported), ua.AttributeIds.Value)))
+        return _convert_results(type(self), parameters, [results.get(parameter) for parameter in parameters], convert)
+
+    def snapshot(self, properties: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Reads the values of several properties with a single OPC-UA read request.
+
+        Args:
+            properties (List[str], optional): Property names (e.g. 'm_speed', 's_ready'). Defaults to all readable properties of the machine.
+
+        Returns:
+            Dict[str, Any]: Converted values by property name.
+        """
+        table = _properties(type(self))
+        if properties is None:
+            properties = list(table)
+        values = self.read_many([table[name].variable for name in properties])
+        return {name: values[table[name].variable] for name in properties}
+
+    def mirror(self, parameters: Optional[List[str]] = None, max_age: float = 1.0, interval: int = 100, options: Optional[MonitoringOptions] = None) -> Mirror:
+        """
+        Keeps a local copy of OPC-UA variables, updated by one subscription.
+        While the mirror is open, read() and the properties return the copied values without contacting the machine.
+
+        Args:
+            parameters (List[str], optional): Variables to mirror (e.g. 'actual_value_pressure', 'Ready_for_operation'). Defaults to all variables of the properties of the machine.
+            max_age (float): Maximum age of a copied value in seconds, older values are read from the machine (and the copy refreshed). Default is 1.0.
+            interval (int): Publishing interval of the subscription in ms. Default is 100.
+            options (MonitoringOptions, optional): Deadband, sampling interval and queue options. Defaults to None (every change, fastest sampling).
+
+        Returns:
+            Mirror: The mirror, close() it to read from the machine again. Closed by disconnect().
+        """
+        if not self._connected:
+            raise ua.UaError("Not connected to machine.")
+        if parameters is None:
+            parameters = list(_variables(type(self)))
+        parameters = list(dict.fromkeys(parameters))
+        mirror = Mirror(parameters, max_age)
+        # storing the value is cheap, no need for the worker threads
+        handles = self._subscriptions.add_many(parameters, self._nodes(self._reader, parameters), mirror.update, interval, InlineDispatcher(), options)
+        mirror._handles = list(handles.values())
+        self._mirrors = [other for other in self._mirrors if not other.closed]
+        self._mirrors.append(mirror)
+        return mirror
+
+    def _node(self, client: Client, parameter: str):
+        """
+        Returns the cached node of an OPC-UA variable for a client.
+
+        Args:
+            client (Client): Client (session) the node is used with.
+            parameter (str): Variable name.
+
+        Returns:
+            SyncNode: The node.
+        """
+        return self._open_connection.nodes(client, [self._baseNode + parameter])[0]
 
-    def easy_subscribe(self, parameter: Union[str, list], callback: Callable, wrap: bool = True, interval: int = 500):
+    def _nodes(self, client: Client, parameters: List[str]) -> list:
+        """
+        Returns the cached nodes of OPC-UA variables for a client, resolving (and registering) all missing ones at once.
+
+        Args:
+            client (Client): Client (session) the nodes are used with.
+            parameters (List[str]): Variable names.
+
+        Returns:
+            list: The nodes, in the order of the parameters.
+        """
+        return self._open_connection.nodes(client, [self._baseNode + parameter for parameter in parameters])
+
+    def subscription_options(self, parameter: Union[str, List[str]], interval: Optional[int] = None, **options: Any):
+        """
+        Sets the subscription options of variables, used when a subscription does not specify them
+        (e.g. the subscriptions created by assigning a callback to a property). Without options the defaults are restored.
+
+        Args:
+            parameter (Union[str, List[str]]): Variable(s) or property name(s) (e.g. 'actual_value_pressure' or 'm_pressure').
+            interval (int, optional): Publishing interval in ms. Defaults to None (500 ms).
+            **options: Options of MonitoringOptions ('deadband', 'deadband_type', 'sampling_interval', 'queue_size', 'discard_oldest').
+
+        Raises:
+            ValueError: If an option is invalid.
+        """
+        table = _properties(type(self))
+        monitoring = MonitoringOptions(**options) if options else None
+        for name in [parameter] if isinstance(parameter, str) else parameter:
+            variable = table[name].variable if name in table else name
+            if interval is None and monitoring is None:
+                self._subscription_defaults.pop(variable, None)
+            else:
+                self._subscription_defaults[variable] = (interval, monitoring)
+
+    def easy_subscribe(self, parameter: Union[str, list], callback: Callable, wrap: bool = True, interval: Optional[int] = None, options: Optional[MonitoringOptions] = None):
         """
         Easy subscription method for a given OPC-UA parameter.
 
@@ -168,7 +495,8 @@ class OPCUAMachine:
             parameter (Union[str, list]): The OPC-UA parameter(s) to subscribe to.
             callback (Callable): Callback function receiving value and parameter.
             wrap (bool): Whether to wrap the callback to filter arguments. Default is True.
-            interval (int): Interval in ms for checking the parameter.
+            interval (int, optional): Interval in ms for checking the parameter. Defaults to the subscription_options() of the parameter (500 ms).
+            options (MonitoringOptions, optional): Deadband, sampling interval and queue options. Defaults to the subscription_options() of the parameter.
 
         Returns:
             list: List of subscriptions created.
@@ -181,30 +509,32 @@ class OPCUAMachine:
         # check if parameter is a string or an array of strings
         if isinstance(parameter, str):
             if wrap:
-                subscription, handler = self.subscribe(parameter, sw.trigger)
+                subscription, handler = self.subscribe(parameter, sw.trigger, interval, options)
                 sw.subscription(subscription)
             else:
-                subscription, handler = self.subscribe(parameter, callback)
+                subscription, handler = self.subscribe(parameter, callback, interval, options)
                 subscriptions.append(subscription)
         elif isinstance(parameter, list):
             for param in parameter:
                 if isinstance(param, str):
                     if wrap:
-                        subscription, handler = self.subscribe(param, sw.trigger)
+                        subscription, handler = self.subscribe(param, sw.trigger, interval, options)
                         sw.subscription(subscription)
                     else:
-                        subscription, handler = self.subscribe(param, callback)
+                        subscription, handler = self.subscribe(param, callback, interval, options)
                         subscriptions.append(subscription)
         return subscriptions
 
-    def subscribe(self, parameter: str, callback: Callable, interval: int = 500):
+    def subscribe(self, parameter: str, callback: Callable, interval: Optional[int] = None, options: Optional[MonitoringOptions] = None):
         """
         Subscribes to a given OPC-UA parameter.
+        All parameters with the same interval share one OPC-UA subscription.
 
         Args:
             parameter (str): The OPC-UA parameter to subscribe to.
             callback (Callable): Callback function receiving value and parameter.
-            interval (int): Interval in ms for checking the parameter.
+            interval (int, optional): Interval in ms for checking the parameter. Defaults to the subscription_options() of the parameter (500 ms).
+            options (MonitoringOptions, optional): Deadband, sampling interval and queue options. Defaults to the subscription_options() of the parameter.
 
         Returns:
             list: [subscription, handler]
@@ -212,10 +542,15 @@ class OPCUAMachine:
         if not self._connected:
             raise ua.UaError("Not connected to machine.")
         
-        subscriptionHandler = OpcuaSubscriptionHandler(parameter, callback, self._status_change_callback)
-        subscription = self._reader.create_subscription(interval, subscriptionHandler)
-        handler = subscription.subscribe_data_change(self._reader.get_node(self._baseNode + parameter))
-        return [subscription, handler]
+        default_interval, default_options = self._subscription_defaults.get(parameter, (None, None))
+        if interval is None:
+            interval = default_interval if default_interval is not None else 500
+        if options is None:
+            options = default_options
+        subscription = self._subscriptions.add(parameter, self._node(self._reader, parameter), callback, interval, self._dispatcher, options)
+        self._handles = [handle for handle in self._handles if not handle.deleted]
+        self._handles.append(subscription)
+        return [subscription, subscription.server_handle]
 
     def changeLivebit(self, value: bool, parameter=None):
         """
@@ -230,9 +565,131 @@ class OPCUAMachine:
         
         self.change(self._liveBitNode, value, "bool")
 
+def _endpoint_url(ip: str) -> str:
+    """
+    Completes an IP address to an OPC-UA endpoint URL (opc.tcp://<ip>:4840).
+    """
+    if not ip:
+        raise ValueError("No IP address provided.")
+
+    # check if ip address starts with opc.tcp://, if not add it
+    if not ip.startswith("opc.tcp://"):
+        ip = "opc.tcp://" + ip
+
+    # check if ip address has port, if not add default port 4840
+    if ":" not in ip.split("//")[1]:
+        ip += ":4840"
+    return ip
+
+def _to_variants(values: Dict[str, Any], table: Optional[Dict[str, Parameter]] = None) -> Tuple[List[str], List[ua.Variant]]:
+    """
+    Encodes the values of change_many() as OPC-UA variants ((value, type) by variable, or value by writable property of the table).
+    """
+    parameters = []
+    variants = []
+    for name, value in values.items():
+        declared = table.get(name) if table is not None and not isinstance(value, tuple) else None
+        if declared is not None:
+            if not declared.writable:
+                raise ValueError(f"'{name}' is not a writable property.")
+            parameters.append(declared.variable)
+            variants.append(declared.encode(value))
+            continue
+        value, typ = value
+        encode = ENCODERS.get(typ)
+        if encode is None:
+            raise ValueError(f"Unknown type '{typ}' for '{name}'.")
+        parameters.append(name)
+        variants.append(encode(value))
+    return parameters, variants
+
+def _properties(cls) -> Dict[str, Parameter]:
+    """
+    Merges the '_properties' tables along the MRO of a machine class.
+    The variables of a model are the ones of its classes (e.g. DuomixPlus = Mixingpump + MixingpumpPlus).
+    """
+    table = _property_tables.get(cls)
+    if table is None:
+        table = {}
+        for base in reversed(cls.__mro__):
+            table.update(base.__dict__.get("_properties", {}))
+        _property_tables[cls] = table
+    return table
+
+def _variables(cls) -> Dict[str, Parameter]:
+    """
+    OPC-UA variable -> Parameter of a machine class.
+    """
+    table = _variable_tables.get(cls)
+    if table is None:
+        table = {parameter.variable: parameter for parameter in _properties(cls).values()}
+        _variable_tables[cls] = table
+    return table
+
+def _convert_results(cls, parameters: List[str], results: List[Optional[ua.DataValue]], convert: bool) -> Dict[str, Any]:
+    """
+    Converts the results of a read request of several variables with the conversions of a machine class (None = not read).
+    """
+    variables = _variables(cls)
+    values = {}
+    for name, result in zip(parameters, results):
+        parameter = variables.get(name)
+        if result is not None and result.StatusCode.is_good() and result.Value is not None:
+            value = result.Value.Value
+        else:
+            value = parameter.default if parameter is not None else None
+        if convert and parameter is not None and parameter.decode is not None and value is not None:
+            value = parameter.decode(value)
+        values[name] = value
+    return values
+
+def _parameter_property(parameter: Parameter) -> property:
+    """
+    Creates the property of a Parameter: reading returns the decoded value, assigning a callback subscribes to
+    the decoded value, assigning a value writes it (writable Parameters only).
+    """
+    variable, decode, encode, default = parameter.variable, parameter.decode, parameter.encode, parameter.default
+    def getter(self):
+        if default is None:
+            value = self.read(variable)
+        else:
+            value = self.safe_read(variable, default)
+        return decode(value) if decode is not None and value is not None else value
+    def setter(self, value):
+        if callable(value):
+            _subscribe_decoded(self, variable, decode, value)
+            return
+        if encode is None:
+            raise ValueError("Callback is not callable.")
+        variant = encode(value)
+        if default is None:
+            self._write(variable, variant)
+        else:
+            self._safe_write(variable, variant)
+    return property(getter, setter, doc=parameter.doc)
+
+def _subscribe_decoded(machine: OPCUAMachine, variable: str, decode: Optional[Callable[[Any], Any]], callback: Callable):
+    """
+    Subscribes a callback (optional parameters: 'value', 'parameter' and 'subscription') to the decoded values of a variable.
+    """
+    if decode is None:
+        return machine.easy_subscribe(variable, callback)
+    sw = SubscriptionWrapper(callback)
+    def cb(value, parameter):
+        sw.trigger(value=decode(value) if value is not None else value, parameter=parameter)
+    subscription = machine.easy_subscribe(variable, cb, False)
+    for s in subscription:
+        sw.subscription(s)
+    return subscription
+
+_property_tables: Dict[type, Dict[str, Parameter]] = {}
+_variable_tables: Dict[type, Dict[str, Parameter]] = {}
+
 class SubscriptionWrapper:
     def __init__(self, callback: Callable, subscription=None):
         self._callback = callback
+        # the signature is analysed once, not on every notification
+        self._accepted = frozenset(inspect.signature(callback).parameters)
         self._subscriptions = subscription if subscription is not None else []
 
     def subscription(self, subscription):
@@ -247,10 +704,8 @@ class SubscriptionWrapper:
         self.exec(value=value, parameter=parameter, subscription=self)
 
     def exec(self, **kwargs):
-        sig = inspect.signature(self._callback)
-        filtered_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters}
-        # execute the callback in a new thread to avoid blocking
-        threading.Thread(target=self._callback, kwargs=filtered_kwargs).start()
+        # callbacks are already executed by the dispatcher of the machine
+        self._callback(**{k: v for k, v in kwargs.items() if k in self._accepted})
 
 class OpcuaSubscriptionHandler:
     """
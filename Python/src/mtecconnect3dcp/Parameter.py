@@ -0,0 +1,111 @@
+from asyncua import ua #https://github.com/FreeOpcUa/asyncua
+
+from typing import Optional, Callable, Any, Dict
+
+# Encoders by type string ("bool", "uint16", "int32", "float"): value -> OPC-UA variant
+ENCODERS: Dict[str, Callable[[Any], ua.Variant]] = {
+    "bool": lambda value: ua.Variant(bool(value), ua.VariantType.Boolean),
+    "uint16": lambda value: ua.Variant(int(abs(value)), ua.VariantType.UInt16),
+    "int32": lambda value: ua.Variant(int(value), ua.VariantType.Int32),
+    "float": lambda value: ua.Variant(float(value), ua.VariantType.Float),
+}
+
+# Casts of the raw values by type string
+_CASTS: Dict[str, Callable[[Any], Any]] = {
+    "bool": bool,
+    "uint16": int,
+    "int32": int,
+    "float": float,
+}
+
+class Parameter:
+    """
+    Declaration of an OPC-UA variable of a machine, used in the '_properties' table of the machine classes.
+
+    The machine classes generate a property for every entry (reading, writing or subscribing to the
+    variable), and read_many(), snapshot(), mirrors and telemetry recorders convert the raw values
+    with the same decode function. decode() and encode() are built once from the declaration, so no
+    type or scaling is looked up when a value is converted.
+
+    Value = raw * scale + offset (inverted: value = not raw).
+
+    Args:
+        variable (str): OPC-UA variable (below the base node of the machine).
+        typ (str, optional): Type of the variable ("bool", "uint16", "int32", "float"). Required for writable variables, raw values are cast to it. Defaults to None (raw value).
+        scale (float): Scale of the raw value. Default is 1.
+        offset (float): Offset of the value. Default is 0.
+        inverted (bool): Whether the variable is an inverted flag (e.g. 'state_fc_error' -> frequency converter ok). Default is False.
+        default (Any, optional): Raw value used if the machine does not support the variable (the property then does not raise). Defaults to None (required variable).
+        writable (bool): Whether the property can be set. Default is False (assigning a callback subscribes).
+        minimum (float, optional): Lowest value that can be set. Defaults to None (no limit).
+        maximum (float, optional): Highest value that can be set. Defaults to None (no limit).
+        label (str, optional): Name of the value in error messages (e.g. 'Speed in Hz'). Defaults to the variable.
+        doc (str, optional): Docstring of the property.
+        conversion (Callable, optional): Own conversion of the raw value, replaces the one built from typ, scale, offset and inverted.
+    """
+    __slots__ = ("variable", "typ", "scale", "offset", "inverted", "default", "writable", "minimum", "maximum",
+                 "label", "doc", "decode", "encode")
+
+    def __init__(self, variable: str, typ: Optional[str] = None, scale: float = 1, offset: float = 0, inverted: bool = False, default: Any = None,
+                 writable: bool = False, minimum: Optional[float] = None, maximum: Optional[float] = None, label: Optional[str] = None,
+                 doc: Optional[str] = None, conversion: Optional[Callable[[Any], Any]] = None):
+        if typ is not None and typ not in ENCODERS:
+            raise ValueError(f"Unknown type '{typ}' for '{variable}'.")
+        if writable and typ is None:
+            raise ValueError(f"Writable variable '{variable}' needs a type.")
+        if scale == 0:
+            raise ValueError(f"Scale of '{variable}' cannot be 0.")
+        self.variable = variable
+        self.typ = typ
+        self.scale = scale
+        self.offset = offset
+        self.inverted = inverted
+        self.default = default
+        self.writable = writable
+        self.minimum = minimum
+        self.maximum = maximum
+        self.label = label if label is not None else f"Value of '{variable}'"
+        self.doc = doc
+        # None = raw value (no conversion)
+        self.decode: Optional[Callable[[Any], Any]] = conversion if conversion is not None else self._decoder()
+        self.encode: Optional[Callable[[Any], ua.Variant]] = self._encoder() if writable else None
+
+    def _decoder(self) -> Optional[Callable[[Any], Any]]:
+        if self.inverted:
+            return _invert
+        cast = _CASTS.get(self.typ)
+        scale, offset = self.scale, self.offset
+        if scale == 1 and offset == 0:
+            return cast
+        return lambda raw: raw * scale + offset
+
+    def _encoder(self) -> Callable[[Any], ua.Variant]:
+        make = ENCODERS[self.typ]
+        scale, offset = self.scale, self.offset
+        minimum, maximum, label = self.minimum, self.maximum, self.label
+        if self.inverted:
+            convert = lambda value: not value
+        elif scale == 1 and offset == 0:
+            convert = None
+        else:
+            convert = lambda value: (value - offset) / scale
+        if minimum is None and maximum is None:
+            if convert is None:
+                return make
+            return lambda value: make(convert(value))
+        def encode(value):
+            if minimum is not None and value < minimum:
+                raise ValueError(f"{label} cannot be below {minimum:g}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"{label} cannot be above {maximum:g}")
+            return make(convert(value) if convert is not None else value)
+        return encode
+
+    def __repr__(self) -> str:
+        return f"Parameter({self.variable!r}, typ={self.typ!r})"
+
+def _invert(value: Any) -> bool:
+    """
+    Conversion of inverted flags (e.g. 'state_fc_error' -> frequency converter ok).
+    """
+    return not bool(value)
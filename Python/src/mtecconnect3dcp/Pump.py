@@ -1,16 +1,81 @@
+import time
+from typing import Optional, Tuple
+
 from .ModbusMachine import ModbusMachine
+from . import ModbusScheduler
+
+class PumpSnapshot:
+    """
+    Values of a pump read with one request (see Pump.snapshot()).
+
+    Attributes:
+        timestamp (float): Unix time of the response in s.
+        frequency (float): Frequency in Hz (FD00).
+        current (float): Current in A (FD03).
+        voltage (float): Voltage in V (FD05).
+        switches (int): Switch states (FD06).
+        torque (float): Torque in Nm (FD18).
+        reverse (bool): Direction last commanded by this Pump object (not part of the register block).
+    """
+    __slots__ = ("timestamp", "frequency", "current", "voltage", "switches", "torque", "reverse", "_received")
+
+    def __init__(self, registers: Tuple[int, ...], reverse: bool):
+        self.timestamp = time.time()
+        self._received = time.monotonic()
+        self.frequency = registers[0x00] / 100
+        self.current = registers[0x03] / 100
+        self.voltage = registers[0x05] / 100
+        self.switches = registers[0x06]
+        self.torque = registers[0x18] / 100
+        self.reverse = reverse
+
+    @property
+    def age(self) -> float:
+        """
+        float: Time since the response in s.
+        """
+        return time.monotonic() - self._received
+
+    @property
+    def s_ready(self) -> bool:
+        """
+        bool: True if the machine is ready for operation.
+        """
+        return _ready(self.switches)
+
+    @property
+    def m_speed(self) -> float:
+        """
+        float: Real speed in Hz, negative in reverse direction.
+        """
+        return -self.frequency if self.reverse else self.frequency
+
+    def __repr__(self) -> str:
+        return (f"PumpSnapshot(frequency={self.frequency}, current={self.current}, voltage={self.voltage}, "
+                f"switches=0x{self.switches:04X}, torque={self.torque}, reverse={self.reverse})")
 
 class Pump(ModbusMachine):
     """
     Class for controlling a pump via Modbus.
     Inherits from ModbusMachine.
+
+    With snapshot_max_age > 0, m_speed, m_voltage, m_current, m_torque and s_ready are served from a
+    snapshot (one request for all of them, see snapshot()) that is at most that old.
+
+    Args:
+        snapshot_max_age (float): Age in s up to which the properties use the latest snapshot. Default is 0 (every property reads its register).
     """
     # Class-level bit masks for status decoding
     _RUNNING_MASK = 0x0400
     _REVERSE_MASK = 0x0200
+    _EMERGENCY_STOP = 0x1000
+    _SNAPSHOT_START = "FD00"
+    _SNAPSHOT_COUNT = 0x19 # FD00 .. FD18
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, snapshot_max_age: float = 0.0, **kwargs):
         super().__init__(*args, **kwargs)
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot: Optional[PumpSnapshot] = None
         self._last_speed: float = 0.0
         self._last_running: bool = False
         self._last_reverse: bool = False
@@ -20,8 +85,10 @@ class Pump(ModbusMachine):
         """
         bool: True if the machine is ready for operation (on, remote, mixer and mixingpump on).
         """
-        switches = self.read("FD06")
-        return ((switches % 32) - (switches % 16) != 0)
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.s_ready
+        return _ready(self.read("FD06"))
 
     @property
     def run(self) -> bool:
@@ -101,6 +168,9 @@ class Pump(ModbusMachine):
         """
         float: Frequency of the pump in Hz.
         """
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.frequency
         return self.read("FD00") / 100
 
     @_frequency.setter
@@ -118,6 +188,9 @@ class Pump(ModbusMachine):
         """
         float: Voltage of the pump in V.
         """
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.voltage
         return self.read("FD05") / 100
 
     @property
@@ -125,6 +198,9 @@ class Pump(ModbusMachine):
         """
         float: Current of the pump in A.
         """
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.current
         return self.read("FD03") / 100
 
     @property
@@ -132,23 +208,58 @@ class Pump(ModbusMachine):
         """
         float: Torque of the pump in Nm.
         """
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.torque
         return self.read("FD18") / 100
 
     def emergency_stop(self):
         """
-        Emergency stop for the pump.
+        Emergency stop for the pump (sent before all other waiting commands on the port).
         """
-        return self.write("FA00", 0x1000)
+        self._last_running = False
+        return self.write("FA00", self._EMERGENCY_STOP, ModbusScheduler.EMERGENCY)
 
     @property
     def m_speed(self) -> float:
         """
         float: Real speed of the pump in Hz. Negative values indicate reverse direction.
         """
+        snapshot = self._recent_snapshot()
+        if snapshot is not None:
+            return snapshot.m_speed
         if self.reverse:
             return -self._frequency
         return self._frequency
 
+    def snapshot(self, max_age: float = 0.0) -> Optional[PumpSnapshot]:
+        """
+        Reads frequency, current, voltage, switches and torque (registers FD00 to FD18) with one request.
+
+        Args:
+            max_age (float): Age in s up to which the latest snapshot is returned instead of reading. Default is 0 (always read).
+
+        Returns:
+            PumpSnapshot: The values, None if no valid response was received.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and max_age > 0 and snapshot.age <= max_age:
+            return snapshot
+        registers = self.read_registers(self._SNAPSHOT_START, self._SNAPSHOT_COUNT)
+        if registers is None:
+            return None
+        snapshot = PumpSnapshot(registers, self._last_running and self._last_reverse)
+        self._snapshot = snapshot
+        return snapshot
+
+    def _recent_snapshot(self) -> Optional[PumpSnapshot]:
+        """
+        Snapshot for the properties if enabled (snapshot_max_age), None to read the register.
+        """
+        if self.snapshot_max_age <= 0:
+            return None
+        return self.snapshot(self.snapshot_max_age)
+
     @property
     def speed(self) -> float:
         """
@@ -194,4 +305,7 @@ class Pump(ModbusMachine):
         """
         DEPRECATED: Use '.run = False' instead.
         """
-        self.run = False
\ No newline at end of file
+        self.run = False
+
+def _ready(switches: int) -> bool:
+    return (switches % 32) - (switches % 16) != 0
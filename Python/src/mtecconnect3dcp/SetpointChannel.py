@@ -0,0 +1,153 @@
+import collections
+import threading
+import time
+from typing import Optional, Callable, Any, Dict
+
+class SetpointChannel:
+    """
+    Non-blocking writer for one OPC-UA variable, e.g. a speed streamed from a toolpath.
+
+    set() only stores the value and returns immediately, a background thread writes it.
+    Only the latest value is written: values set while a write is in progress (or while
+    waiting for the rate limit) replace each other and the stale ones are never sent.
+    Created by OPCUAMachine.setpoint_channel().
+
+    Args:
+        node (Callable): Returns the node of the variable (on the writing session).
+        parameter (str): Variable name (for messages).
+        encode (Callable): Converts a value to the OPC-UA variant to write. Called in set(), so invalid values raise there.
+        max_rate (float): Maximum number of writes per second. Default is 50.
+    """
+    def __init__(self, node: Callable[[], Any], parameter: str, encode: Callable[[Any], Any], max_rate: float = 50):
+        if max_rate <= 0:
+            raise ValueError("Maximum rate must be positive.")
+        self._node = node
+        self._parameter = parameter
+        self._encode = encode
+        self._interval = 1 / max_rate
+        self._condition = threading.Condition()
+        self._pending: Optional[tuple] = None # (variant, time of set())
+        self._busy = False
+        self._closed = False
+        self._written = 0
+        self._superseded = 0
+        self._errors = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._latency_last = 0.0
+        self._write_times = collections.deque() # completion times of the writes in the last second
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def parameter(self) -> str:
+        """
+        str: The variable written by the channel.
+        """
+        return self._parameter
+
+    def set(self, value: Any):
+        """
+        Sets a new value without waiting for the write.
+
+        Args:
+            value (Any): The value (in the unit of the property, e.g. Hz for the mixingpump speed).
+
+        Raises:
+            ValueError: If the value is out of range.
+        """
+        variant = self._encode(value)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Setpoint channel for '{self._parameter}' is closed.")
+            if self._pending is not None:
+                self._superseded += 1
+            self._pending = (variant, time.perf_counter())
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the latest value has been written.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (no limit).
+
+        Returns:
+            bool: True if everything was written, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = 1):
+        """
+        Writes the pending value and stops the channel.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the pending value in seconds. Default is 1.
+        """
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Returns the channel metrics.
+
+        Returns:
+            Dict[str, float]: 'rate' (writes in the last second), 'written', 'superseded' (values replaced before being sent),
+                'errors' and the end-to-end latency from set() to the completed write in ms ('latency_last', 'latency_avg', 'latency_max').
+        """
+        with self._condition:
+            self._expire(time.perf_counter())
+            return {
+                "rate": len(self._write_times),
+                "written": self._written,
+                "superseded": self._superseded,
+                "errors": self._errors,
+                "latency_last": self._latency_last * 1000,
+                "latency_avg": self._latency_sum / self._written * 1000 if self._written else 0.0,
+                "latency_max": self._latency_max * 1000,
+            }
+
+    def _expire(self, now: float):
+        while self._write_times and self._write_times[0] <= now - 1:
+            self._write_times.popleft()
+
+    def _run(self):
+        next_write = 0.0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                # newer values replace the pending one while waiting for the rate limit
+                delay = next_write - time.perf_counter()
+                while delay > 0 and not self._closed:
+                    self._condition.wait(delay)
+                    delay = next_write - time.perf_counter()
+                if self._closed:
+                    return
+                variant, stamp = self._pending
+                self._pending = None
+                self._busy = True
+            start = time.perf_counter()
+            try:
+                self._node().set_value(variant)
+                error = False
+            except Exception as e:
+                print(f"Error writing setpoint '{self._parameter}':", e)
+                error = True
+            end = time.perf_counter()
+            next_write = start + self._interval
+            with self._condition:
+                self._busy = False
+                if error:
+                    self._errors += 1
+                else:
+                    latency = end - stamp
+                    self._written += 1
+                    self._latency_last = latency
+                    self._latency_sum += latency
+                    self._latency_max = max(self._latency_max, latency)
+                    self._write_times.append(end)
+                    self._expire(end)
+                self._condition.notify_all()
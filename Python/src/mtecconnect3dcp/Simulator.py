@@ -0,0 +1,442 @@
+from asyncua import Server, ua #https://github.com/FreeOpcUa/asyncua
+from asyncua.common.callback import CallbackType
+
+import argparse
+import asyncio
+import datetime
+import random
+import time
+from typing import Optional, Any, Dict, List, Tuple
+
+from .Dosingpump import Dosingpump
+from .Duomix import Duomix
+from .DuomixPlus import DuomixPlus
+from .OPCUAMachine import _properties
+from .Parameter import Parameter
+from .Printhead import Printhead
+from .Smp import Smp
+from .SmpPlus import SmpPlus
+
+_BASE = "|var|B-Fortis CC-Slim S04.Application.GVL_OPC"
+_NAMESPACE = "CODESYSSPV3/3S/IecVarAccess"
+
+# Machine classes by model, the node tree of a model is built from their parameters
+_MODELS: Dict[str, Tuple[type, ...]] = {
+    "duo-mix 3DCP": (Duomix,),
+    "duo-mix 3DCP+": (DuomixPlus,),
+    "SMP 3DCP": (Smp,),
+    "SMP 3DCP+": (SmpPlus,),
+    "flow-matic PX": (Printhead, Dosingpump),
+}
+
+_VARIANT_TYPES = {
+    "bool": ua.VariantType.Boolean,
+    "uint16": ua.VariantType.UInt16,
+    "int32": ua.VariantType.Int32,
+    "float": ua.VariantType.Float,
+}
+
+# Values of a machine ready for operation (all other variables start at 0/False)
+_INITIAL: Dict[str, Any] = {
+    "Ready_for_operation": True,
+    "Ready_for_operation_printhead": True,
+    "Ready_for_operation_dosingpump": True,
+    "emergency_stop_ok": True,
+    "state_machine_on": True,
+    "state_safety_mp": True,
+    "state_safety_mixer": True,
+    "state_circuit_breaker_ok": True,
+    "state_circuit_breaker_fc_ok": True,
+    "state_water_pressure_ok": True,
+    "state_wetmaterialprobe": True,
+    "state_remote_start_local": True,
+    "actual_value_water_temp": 15.0,
+    "actual_value_mat_temp": 20.0,
+    "Silo_Level": 80.0,
+}
+
+_PINS = range(1, 5) # reserve_DI_1 .. reserve_DI_4 etc. of the mixingpumps
+
+class _Drive:
+    """
+    A driven axis: while 'run' is set, 'actual' ramps toward the setpoint (in the unit of the properties),
+    the pressure follows the actual value with a first order lag.
+    """
+    def __init__(self, run: str, setpoint: str, actual: str, ramp: float, pressure: Optional[str] = None, gain: float = 0.0,
+                 running: Tuple[str, ...] = (), percent: Optional[Tuple[str, float]] = None):
+        self.run = run
+        self.setpoint = setpoint
+        self.actual = actual
+        self.ramp = ramp # units per s
+        self.pressure = pressure
+        self.gain = gain # bar per unit
+        self.running = running # flags set while the axis moves
+        self.percent = percent # (variable, full scale) showing the actual value in %
+        self.value = 0.0
+
+_DRIVES = (
+    _Drive("Remote_start", "set_value_mixingpump", "actual_value_mixingpump", ramp=10.0, pressure="actual_value_pressure", gain=0.4,
+           running=("aut_mixingpump_fc", "aut_mixer", "aut_waterpump", "aut_solenoid_valve", "state_fc_fwd", "aut_cw", "aut_comp", "aut_vib_1", "aut_vib_2")),
+    _Drive("Remote_start", "set_value_water_flow", "actual_value_water_flow", ramp=300.0, percent=("actual_value_water_valve", 600.0)),
+    _Drive("state_printhead_on", "set_value_printhead", "actual_value_printhead", ramp=200.0, pressure="actual_value_pressure_printhead", gain=0.05,
+           running=("state_fc_printhead",)),
+    _Drive("state_dosingpump_on", "set_value_dosingpump", "actual_value_additive", ramp=500.0, pressure="actual_value_pressure_dosingpump", gain=0.01,
+           running=("state_fc_dosingpump",), percent=("actual_value_dosingpump", 1000.0)),
+)
+
+_PRESSURE_LAG = 1.0 # s
+_SILO_USAGE = 0.05 # % per s while the mixingpump runs
+
+class Simulator:
+    """
+    OPC-UA server simulating an m-tec machine, for tests and load tests without a real machine.
+
+    Exposes the variables of the model below 'ns=4;s=|var|B-Fortis CC-Slim S04.Application.GVL_OPC.' with
+    the data types of the machine classes, so the library (and other clients) can connect as to a real machine.
+    The machine toggles 'Livebit2extern' and runs a watchdog on the echo: if the client does not echo it
+    within the timeout, the machine stops and is not ready for operation until the echo resumes.
+    While running, the actual speeds ramp toward the setpoints and the pressures follow the flow.
+
+    Run it from the command line ('python -m mtecconnect3dcp.Simulator --model "duo-mix 3DCP+" --port 4840')
+    or in an asyncio program ('async with Simulator(...)').
+
+    Args:
+        model (str): 'duo-mix 3DCP', 'duo-mix 3DCP+', 'SMP 3DCP', 'SMP 3DCP+' or 'flow-matic PX' (printhead and dosingpump). Default is 'duo-mix 3DCP+'.
+        host (str): Address to listen on. Default is '127.0.0.1'.
+        port (int): Port to listen on. Default is 4840.
+        rate (float): Updates of the simulated values per second. Default is 10.
+        livebit_interval (float): Time between two changes of 'Livebit2extern' in s. Default is 0.5.
+        watchdog_timeout (float): Time without Livebit echo after which the machine stops, in s. Default is 2.0.
+        livebit (str): Variable the client echoes the Livebit to. Default is 'Livebit2machine' ('Livebit2DuoMix' on older duo-mix firmware).
+        noise (float): Relative noise added to the measured values on every update (e.g. 0.01), so subscriptions receive changes at the update rate. Default is 0.
+        extra (int): Number of additional float variables 'load_1' .. 'load_<extra>' (not simulated, see write()), e.g. for subscription load tests. Default is 0.
+    """
+    def __init__(self, model: str = "duo-mix 3DCP+", host: str = "127.0.0.1", port: int = 4840, rate: float = 10.0, livebit_interval: float = 0.5,
+                 watchdog_timeout: float = 2.0, livebit: str = "Livebit2machine", noise: float = 0.0, extra: int = 0):
+        if model not in _MODELS:
+            raise ValueError(f"Unknown model '{model}', use one of: {', '.join(_MODELS)}.")
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self._model = model
+        self._endpoint = f"opc.tcp://{host}:{port}"
+        self._rate = rate
+        self._livebit_interval = livebit_interval
+        self._watchdog_timeout = watchdog_timeout
+        self._livebit = livebit
+        self._noise = noise
+        self._extra = extra
+        self._parameters = _variables(model)
+        self._types: Dict[str, ua.VariantType] = {}
+        self._values: Dict[str, Any] = {}
+        self._nodeids: Dict[str, ua.NodeId] = {}
+        self._names: Dict[ua.NodeId, str] = {}
+        self._drives = [_Drive(d.run, d.setpoint, d.actual, d.ramp, d.pressure, d.gain, d.running, d.percent)
+                        for d in _DRIVES if {d.run, d.setpoint, d.actual} <= set(self._parameters)]
+        self._pressures: Dict[str, float] = {}
+        self._server: Optional[Server] = None
+        self._task: Optional[asyncio.Task] = None
+        self._livebit_value = False
+        self._livebit_changed = 0.0
+        self._echoed = 0.0 # time of the last correct echo
+        self._tripped = False
+        self._ticks = 0
+        self._late = 0
+        self._trips = 0
+        self._echoes = 0
+        self._echo_latency_sum = 0.0
+        self._echo_latency_max = 0.0
+        self._echo_latency_last: Optional[float] = None
+        self._echo_jitter_sum = 0.0
+        self._echo_jitter_max = 0.0
+
+    @property
+    def endpoint(self) -> str:
+        """
+        str: Endpoint URL of the server.
+        """
+        return self._endpoint
+
+    @property
+    def variables(self) -> List[str]:
+        """
+        List[str]: The simulated variables (below the base node).
+        """
+        return list(self._nodeids)
+
+    async def start(self):
+        """
+        Starts the server and the simulation.
+        """
+        server = Server()
+        await server.init()
+        server.set_endpoint(self._endpoint)
+        server.set_server_name(f"m-tec {self._model} simulator")
+        # the variables of the machines are in namespace 4 (as on the PLC)
+        namespace = await server.register_namespace(_NAMESPACE)
+        while namespace < 4:
+            namespace = await server.register_namespace(f"{_NAMESPACE}/{namespace}")
+        folder = await server.nodes.objects.add_folder(ua.NodeId(_BASE, 4), "GVL_OPC")
+        for name, (typ, value) in self._declarations().items():
+            nodeid = ua.NodeId(f"{_BASE}.{name}", 4)
+            node = await folder.add_variable(nodeid, name, ua.Variant(value, typ))
+            await node.set_writable()
+            self._types[name] = typ
+            self._values[name] = value
+            self._nodeids[name] = nodeid
+            self._names[nodeid] = name
+        server.subscribe_server_callback(CallbackType.PostWrite, self._written)
+        await server.start()
+        self._server = server
+        now = time.perf_counter()
+        self._echoed = now
+        self._livebit_changed = now
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the simulation and the server.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._server is not None:
+            await self._server.stop()
+            self._server = None
+
+    async def __aenter__(self) -> "Simulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    def serve(self):
+        """
+        Runs the simulator until interrupted (blocking).
+        """
+        async def main():
+            async with self:
+                print(f"Simulating {self._model} at {self._endpoint} ({len(self._nodeids)} variables, {self._rate:g} updates/s)")
+                while True:
+                    await asyncio.sleep(3600)
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+
+    async def write(self, values: Dict[str, Any]):
+        """
+        Sets variables of the simulated machine, as the PLC would (e.g. errors or the 'load_' variables). Simulated values are overwritten on the next update.
+
+        Args:
+            values (Dict[str, Any]): Variable -> value (converted to the data type of the variable).
+
+        Raises:
+            KeyError: If a variable is not simulated.
+        """
+        for name in values:
+            if name not in self._nodeids:
+                raise KeyError(f"'{name}' is not simulated.")
+        await self._write(values)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the simulation metrics.
+
+        Returns:
+            Dict[str, Any]: 'ticks' (updates), 'late' (updates started more than one period late), 'watchdog_trips',
+                'tripped' (watchdog currently tripped), 'echoes' (Livebit echoes), the echo latency ('echo_latency_avg', 'echo_latency_max' in ms)
+                and its jitter ('echo_jitter_avg', 'echo_jitter_max' in ms, difference between two consecutive latencies).
+        """
+        return {
+            "ticks": self._ticks,
+            "late": self._late,
+            "watchdog_trips": self._trips,
+            "tripped": self._tripped,
+            "echoes": self._echoes,
+            "echo_latency_avg": self._echo_latency_sum / self._echoes * 1000 if self._echoes else 0.0,
+            "echo_latency_max": self._echo_latency_max * 1000,
+            "echo_jitter_avg": self._echo_jitter_sum / (self._echoes - 1) * 1000 if self._echoes > 1 else 0.0,
+            "echo_jitter_max": self._echo_jitter_max * 1000,
+        }
+
+    def _declarations(self) -> Dict[str, Tuple[ua.VariantType, Any]]:
+        """
+        Variable -> (data type, initial value) of the model.
+        """
+        declarations = {"Livebit2extern": (ua.VariantType.Boolean, False), self._livebit: (ua.VariantType.Boolean, False)}
+        for name, parameter in self._parameters.items():
+            typ = _variant_type(parameter)
+            declarations[name] = (typ, _cast(typ, _INITIAL.get(name, 0)))
+        if "set_value_mixingpump" in self._parameters:
+            for pin in _PINS:
+                declarations[f"reserve_DI_{pin}"] = (ua.VariantType.Boolean, False)
+                declarations[f"reserve_DO_{pin}"] = (ua.VariantType.Boolean, False)
+                declarations[f"reserve_AI_{pin}"] = (ua.VariantType.UInt16, 0)
+                declarations[f"reserve_AO_{pin}"] = (ua.VariantType.UInt16, 0)
+        for i in range(1, self._extra + 1):
+            declarations[f"load_{i}"] = (ua.VariantType.Float, 0.0)
+        return declarations
+
+    def _written(self, event, dispatcher=None):
+        """
+        Server callback after a write (called in the server loop).
+        """
+        if not event.is_external:
+            return
+        now = time.perf_counter()
+        for item, status in zip(event.request_params.NodesToWrite, event.response_params):
+            if not status.is_good():
+                continue
+            name = self._names.get(item.NodeId)
+            if name is None:
+                continue
+            value = item.Value.Value.Value
+            self._values[name] = value
+            if name == self._livebit and value == self._livebit_value and self._echoed < self._livebit_changed:
+                latency = now - self._livebit_changed
+                self._echoes += 1
+                self._echo_latency_sum += latency
+                self._echo_latency_max = max(self._echo_latency_max, latency)
+                if self._echo_latency_last is not None:
+                    jitter = abs(latency - self._echo_latency_last)
+                    self._echo_jitter_sum += jitter
+                    self._echo_jitter_max = max(self._echo_jitter_max, jitter)
+                self._echo_latency_last = latency
+                self._echoed = now
+
+    async def _run(self):
+        period = 1 / self._rate
+        last = time.perf_counter()
+        next_tick = last + period
+        while True:
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = time.perf_counter()
+            if now - next_tick > period:
+                self._late += 1
+                next_tick = now # do not catch up
+            next_tick += period
+            self._ticks += 1
+            try:
+                await self._step(now, now - last)
+            except Exception as e:
+                print("Error in simulation step:", e)
+            last = now
+
+    async def _step(self, now: float, dt: float):
+        updates: Dict[str, Any] = {}
+        # Livebit and watchdog
+        if now - self._livebit_changed >= self._livebit_interval:
+            self._livebit_value = not self._livebit_value
+            self._livebit_changed = now
+            updates["Livebit2extern"] = self._livebit_value
+        unanswered = now - self._echoed if self._echoed < self._livebit_changed else 0.0
+        tripped = unanswered > self._watchdog_timeout
+        if tripped != self._tripped:
+            self._tripped = tripped
+            if tripped:
+                self._trips += 1
+                print(f"Simulator watchdog: no Livebit echo for {unanswered:.1f} s, machine stopped.")
+            for name in ("Ready_for_operation", "Ready_for_operation_printhead", "Ready_for_operation_dosingpump"):
+                if name in self._values:
+                    updates[name] = not tripped
+        if tripped:
+            for drive in self._drives:
+                if self._values.get(drive.run):
+                    updates[drive.run] = False
+        # Dynamics
+        lag = min(1.0, dt / _PRESSURE_LAG)
+        for drive in self._drives:
+            running = bool(self._values.get(drive.run)) and not tripped
+            target = self._decode(drive.setpoint) if running else 0.0
+            step = drive.ramp * dt
+            drive.value = min(target, drive.value + step) if drive.value < target else max(target, drive.value - step)
+            updates[drive.actual] = self._encode(drive.actual, self._noisy(drive.value))
+            for name in drive.running:
+                if name in self._values:
+                    updates[name] = drive.value > 0
+            if drive.percent is not None and drive.percent[0] in self._values:
+                updates[drive.percent[0]] = self._encode(drive.percent[0], min(100.0, drive.value / drive.percent[1] * 100))
+            if drive.pressure is not None and drive.pressure in self._values:
+                pressure = self._pressures.get(drive.pressure, 0.0)
+                pressure += (drive.gain * drive.value - pressure) * lag
+                self._pressures[drive.pressure] = pressure
+                updates[drive.pressure] = self._encode(drive.pressure, self._noisy(pressure))
+        if "Silo_Level" in self._values and self._values.get("aut_mixingpump_fc"):
+            updates["Silo_Level"] = max(0.0, self._values["Silo_Level"] - _SILO_USAGE * dt)
+        await self._write({name: value for name, value in updates.items() if value != self._values.get(name)})
+
+    async def _write(self, updates: Dict[str, Any]):
+        stamp = datetime.datetime.now(datetime.timezone.utc)
+        for name, value in updates.items():
+            typ = self._types[name]
+            value = _cast(typ, value)
+            self._values[name] = value
+            await self._server.write_attribute_value(self._nodeids[name], ua.DataValue(ua.Variant(value, typ), SourceTimestamp=stamp, ServerTimestamp=stamp))
+
+    def _decode(self, name: str) -> float:
+        parameter = self._parameters.get(name)
+        value = self._values.get(name) or 0
+        if parameter is not None and parameter.decode is not None:
+            value = parameter.decode(value)
+        return float(value)
+
+    def _encode(self, name: str, value: float) -> Any:
+        parameter = self._parameters.get(name)
+        if parameter is not None:
+            value = (value - parameter.offset) / parameter.scale
+        return value
+
+    def _noisy(self, value: float) -> float:
+        if self._noise and value:
+            return max(0.0, value * (1 + random.uniform(-self._noise, self._noise)))
+        return value
+
+def _variables(model: str) -> Dict[str, Parameter]:
+    """
+    Variable -> Parameter of all machine classes of a model.
+    """
+    variables = {}
+    for cls in _MODELS[model]:
+        for parameter in _properties(cls).values():
+            variables.setdefault(parameter.variable, parameter)
+    return variables
+
+def _variant_type(parameter: Parameter) -> ua.VariantType:
+    """
+    Data type of a variable (the type of its Parameter, declared for every variable of the machine classes).
+    """
+    if parameter.typ is None:
+        raise ValueError(f"No type declared for '{parameter.variable}'.")
+    return _VARIANT_TYPES[parameter.typ]
+
+def _cast(typ: ua.VariantType, value: Any) -> Any:
+    if typ == ua.VariantType.Boolean:
+        return bool(value)
+    if typ == ua.VariantType.Float:
+        return float(value)
+    value = int(round(value))
+    if typ == ua.VariantType.UInt16:
+        return min(65535, max(0, value))
+    return value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OPC-UA simulator of m-tec machines.")
+    parser.add_argument("--model", default="duo-mix 3DCP+", choices=list(_MODELS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4840)
+    parser.add_argument("--rate", type=float, default=10.0, help="updates of the simulated values per second")
+    parser.add_argument("--livebit-interval", type=float, default=0.5, help="s between two changes of Livebit2extern")
+    parser.add_argument("--watchdog-timeout", type=float, default=2.0, help="s without Livebit echo until the machine stops")
+    parser.add_argument("--livebit", default="Livebit2machine", help="variable the client echoes the Livebit to")
+    parser.add_argument("--noise", type=float, default=0.0, help="relative noise of the measured values")
+    parser.add_argument("--extra", type=int, default=0, help="number of additional float variables load_1 .. load_<extra>")
+    arguments = parser.parse_args()
+    Simulator(arguments.model, arguments.host, arguments.port, arguments.rate, arguments.livebit_interval,
+              arguments.watchdog_timeout, arguments.livebit, arguments.noise, arguments.extra).serve()
@@ -7,4 +7,5 @@ class SmpPlus(Smp, MixingpumpPlus):
 
     OPC-UA client class for m-tec SMP machines (Mixingpump).
     Inherits from Smp and MixingpumpPlus.
-    """
\ No newline at end of file
+    """
+    _model = "SMP 3DCP+"
\ No newline at end of file
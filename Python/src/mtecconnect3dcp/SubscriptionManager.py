@@ -0,0 +1,385 @@
+from asyncua import ua #https://github.com/FreeOpcUa/asyncua
+
+import itertools
+import threading
+from typing import Optional, Callable, Any, Dict, List, Tuple
+
+from .Dispatcher import Dispatcher
+
+class MonitoringOptions:
+    """
+    Sampling and filter options of a monitored item.
+
+    Args:
+        deadband (float): Minimum change of the value to send a notification (0 = every change). Default is 0.
+        deadband_type (str): "absolute" (in the unit of the variable) or "percent" (of the value range, only for variables with an EURange). Default is "absolute".
+        sampling_interval (float, optional): Sampling interval in ms, separate from the publishing interval. Defaults to None (fastest rate of the server).
+        queue_size (int): Number of values the server queues between two publishes (0 = only the latest). Default is 0.
+        discard_oldest (bool): Whether to discard the oldest (True) or the newest (False) value if the queue is full. Default is True.
+    """
+    _deadband_types = {"absolute": ua.DeadbandType.Absolute, "percent": ua.DeadbandType.Percent}
+
+    def __init__(self, deadband: float = 0, deadband_type: str = "absolute", sampling_interval: Optional[float] = None, queue_size: int = 0, discard_oldest: bool = True):
+        if deadband < 0:
+            raise ValueError("Deadband cannot be negative.")
+        if deadband_type not in MonitoringOptions._deadband_types:
+            raise ValueError(f"Unknown deadband type '{deadband_type}' (use 'absolute' or 'percent').")
+        if queue_size < 0:
+            raise ValueError("Queue size cannot be negative.")
+        self.deadband = float(deadband)
+        self.deadband_type = deadband_type
+        self.sampling_interval = sampling_interval
+        self.queue_size = int(queue_size)
+        self.discard_oldest = bool(discard_oldest)
+
+    def _key(self) -> tuple:
+        return (self.deadband, self.deadband_type if self.deadband else None, self.sampling_interval, self.queue_size, self.discard_oldest)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, MonitoringOptions) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (f"MonitoringOptions(deadband={self.deadband}, deadband_type='{self.deadband_type}', sampling_interval={self.sampling_interval}, "
+                f"queue_size={self.queue_size}, discard_oldest={self.discard_oldest})")
+
+    def request(self, nodeid, client_handle: int) -> ua.MonitoredItemCreateRequest:
+        """
+        Creates the request for a monitored item of the value of a node.
+
+        Args:
+            nodeid (ua.NodeId): Node id of the variable.
+            client_handle (int): Client handle of the item (unique within the subscription).
+
+        Returns:
+            ua.MonitoredItemCreateRequest: The request.
+        """
+        rv = ua.ReadValueId()
+        rv.NodeId = nodeid
+        rv.AttributeId = ua.AttributeIds.Value
+        mparams = ua.MonitoringParameters()
+        mparams.ClientHandle = client_handle
+        mparams.QueueSize = self.queue_size
+        mparams.DiscardOldest = self.discard_oldest
+        if self.sampling_interval is not None:
+            mparams.SamplingInterval = float(self.sampling_interval)
+        if self.deadband:
+            mfilter = ua.DataChangeFilter()
+            mfilter.Trigger = ua.DataChangeTrigger.StatusValue
+            mfilter.DeadbandType = MonitoringOptions._deadband_types[self.deadband_type]
+            mfilter.DeadbandValue = self.deadband
+            mparams.Filter = mfilter
+        mir = ua.MonitoredItemCreateRequest()
+        mir.ItemToMonitor = rv
+        mir.MonitoringMode = ua.MonitoringMode.Reporting
+        mir.RequestedParameters = mparams
+        return mir
+
+_default_options = MonitoringOptions()
+
+class SubscriptionManager:
+    """
+    Manages the OPC-UA subscriptions of one client.
+
+    Monitored items are grouped into one subscription per publishing interval and every
+    variable is monitored only once per interval and monitoring options. Notifications are routed to all
+    callbacks registered for the variable and executed by the dispatcher.
+    While the session is lost (see suspend()), callbacks are only removed locally, restore() does not recreate them.
+
+    Args:
+        client (Client): Client the subscriptions are created on.
+        dispatcher (Dispatcher): Dispatcher executing the callbacks.
+        status_change_callback (Callable, optional): Callback for subscription status changes. Defaults to None.
+    """
+    def __init__(self, client, dispatcher: Dispatcher, status_change_callback: Optional[Callable] = None):
+        self._client = client
+        self._dispatcher = dispatcher
+        self._status_change_callback = status_change_callback
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, Any] = {} # publishing interval -> subscription
+        self._items: Dict[int, "_MonitoredItem"] = {} # client handle -> item
+        self._keys: Dict[Tuple[int, Any, MonitoringOptions], "_MonitoredItem"] = {} # (publishing interval, node id, options) -> item
+        self._client_handles = itertools.count(1)
+        self._generation = 0 # incremented by restore(), notifications of older subscriptions are ignored
+        self._suspended = False # session lost, nothing is sent to the server until restore()
+
+    def add(self, parameter: str, node, callback: Callable, interval: int = 500, dispatcher: Optional[Dispatcher] = None, options: Optional[MonitoringOptions] = None) -> "SubscriptionHandle":
+        """
+        Registers a callback for data changes of an OPC-UA variable.
+
+        Args:
+            parameter (str): Variable name, passed to the callback.
+            node (SyncNode): Node of the variable.
+            callback (Callable): Callback function receiving value and parameter.
+            interval (int): Publishing interval in ms.
+            dispatcher (Dispatcher, optional): Dispatcher executing this callback. Defaults to the dispatcher of the manager.
+            options (MonitoringOptions, optional): Sampling and filter options. Defaults to None (every change, fastest sampling).
+
+        Returns:
+            SubscriptionHandle: Handle to remove the callback again.
+        """
+        return self._add([parameter], [node], callback, interval, dispatcher, options, True)[parameter]
+
+    def add_many(self, parameters: List[str], nodes: list, callback: Callable, interval: int = 500, dispatcher: Optional[Dispatcher] = None, options: Optional[MonitoringOptions] = None) -> Dict[str, "SubscriptionHandle"]:
+        """
+        Registers a callback for data changes of several OPC-UA variables, creating the missing monitored items with one request.
+
+        Args:
+            parameters (List[str]): Variable names, passed to the callback.
+            nodes (list): Nodes of the variables, in the order of the parameters.
+            callback (Callable): Callback function receiving value and parameter.
+            interval (int): Publishing interval in ms.
+            dispatcher (Dispatcher, optional): Dispatcher executing this callback. Defaults to the dispatcher of the manager.
+            options (MonitoringOptions, optional): Sampling and filter options. Defaults to None (every change, fastest sampling).
+
+        Returns:
+            Dict[str, SubscriptionHandle]: Handles by variable. Variables the server rejected (e.g. not supported by the machine) are left out.
+        """
+        return self._add(parameters, nodes, callback, interval, dispatcher, options, False)
+
+    def _add(self, parameters: List[str], nodes: list, callback: Callable, interval: int, dispatcher: Optional[Dispatcher], options: Optional[MonitoringOptions], strict: bool) -> Dict[str, "SubscriptionHandle"]:
+        dispatcher = dispatcher if dispatcher is not None else self._dispatcher
+        options = options if options is not None else _default_options
+        handles = {}
+        replays = []
+        with self._lock:
+            missing = []
+            for parameter, node in zip(parameters, nodes):
+                entry = (callback, dispatcher)
+                item = self._keys.get((interval, node.nodeid, options))
+                if item is None:
+                    missing.append((parameter, node, entry))
+                    continue
+                item.callbacks = item.callbacks + (entry,)
+                if item.has_value:
+                    replays.append((parameter, entry, item.value))
+                handles[parameter] = SubscriptionHandle(self, item, entry)
+            if missing:
+                for parameter, (item, entry) in self._create_items(missing, interval, options, strict).items():
+                    handles[parameter] = SubscriptionHandle(self, item, entry)
+        for parameter, (callback, dispatcher), value in replays:
+            # the server only sends the initial value when the item is created
+            dispatcher.submit(parameter, callback, value, parameter)
+        return handles
+
+    def remove(self, handle: "SubscriptionHandle"):
+        """
+        Removes a callback. The monitored item (and the subscription) are deleted on the server when no callback is left.
+
+        Args:
+            handle (SubscriptionHandle): Handle returned by add().
+        """
+        with self._lock:
+            item = handle._item
+            callbacks = list(item.callbacks)
+            for i, entry in enumerate(callbacks):
+                if entry is handle._entry:
+                    del callbacks[i]
+                    break
+            else:
+                return
+            item.callbacks = tuple(callbacks)
+            if item.callbacks or self._items.get(item.client_handle) is not item:
+                return
+            self._forget_item(item)
+            if self._suspended:
+                # the subscriptions are gone with the session
+                if not any(other.interval == item.interval for other in self._items.values()):
+                    self._subscriptions.pop(item.interval, None)
+                return
+            try:
+                if any(other.interval == item.interval for other in self._items.values()):
+                    if item.server_handle is not None:
+                        self._subscriptions[item.interval].unsubscribe(item.server_handle)
+                else:
+                    self._delete_unused(item.interval)
+            except Exception:
+                pass # session lost meanwhile, the item is not restored
+
+    def suspend(self):
+        """
+        Marks the session as lost: removed callbacks are only forgotten locally until restore().
+        """
+        with self._lock:
+            self._suspended = True
+
+    def restore(self, client, resolve: Optional[Callable[[list], list]] = None):
+        """
+        Recreates all subscriptions and monitored items on a new client (after a reconnect), with one request per publishing interval.
+        The registered callbacks and handles stay valid.
+
+        Args:
+            client (Client): The new client.
+            resolve (Callable, optional): Maps the node ids of the old session to the new one (registered nodes). Defaults to None (same node ids).
+        """
+        with self._lock:
+            self._client = client
+            self._generation += 1
+            self._subscriptions = {}
+            if resolve is not None and self._items:
+                items = list(self._items.values())
+                for item, nodeid in zip(items, resolve([item.nodeid for item in items])):
+                    item.nodeid = nodeid
+                    item.key = (item.interval, nodeid, item.options)
+                self._keys = {item.key: item for item in items}
+            intervals: Dict[int, List["_MonitoredItem"]] = {}
+            for item in self._items.values():
+                item.server_handle = None
+                intervals.setdefault(item.interval, []).append(item)
+            for interval, items in intervals.items():
+                subscription = client.create_subscription(interval, _SubscriptionHandler(self))
+                self._subscriptions[interval] = subscription
+                results = subscription.create_monitored_items([item.options.request(item.nodeid, item.client_handle) for item in items])
+                for item, result in zip(items, results):
+                    if isinstance(result, ua.StatusCode):
+                        print(f"Subscription of '{item.parameter}' could not be restored:", result)
+                    else:
+                        item.server_handle = result
+            self._suspended = False
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Returns the number of subscriptions and monitored items.
+
+        Returns:
+            Dict[str, int]: 'subscriptions' (one per publishing interval) and 'monitored_items' (including the Livebit).
+        """
+        with self._lock:
+            return {"subscriptions": len(self._subscriptions), "monitored_items": len(self._items)}
+
+    def clear(self):
+        """
+        Forgets all subscriptions without contacting the server (e.g. after the session was closed).
+        """
+        with self._lock:
+            self._subscriptions = {}
+            self._items = {}
+            self._keys = {}
+
+    def _create_items(self, missing: List[Tuple[str, Any, Tuple[Callable, Dispatcher]]], interval: int, options: MonitoringOptions, strict: bool) -> Dict[str, Tuple["_MonitoredItem", Tuple[Callable, Dispatcher]]]:
+        """
+        Creates monitored items with one request. Rejected items raise if strict, otherwise they are left out of the result.
+        """
+        subscription = self._subscriptions.get(interval)
+        if subscription is None:
+            subscription = self._client.create_subscription(interval, _SubscriptionHandler(self))
+            self._subscriptions[interval] = subscription
+        items = []
+        for parameter, node, entry in missing:
+            item = _MonitoredItem(parameter, node.nodeid, interval, options, next(self._client_handles))
+            item.callbacks = (entry,)
+            # register before creating, the initial notification may arrive before the response
+            self._items[item.client_handle] = item
+            self._keys[item.key] = item
+            items.append(item)
+        try:
+            results = subscription.create_monitored_items([options.request(item.nodeid, item.client_handle) for item in items])
+        except Exception:
+            for item in items:
+                self._forget_item(item)
+            self._delete_unused(interval)
+            raise
+        created = {}
+        rejected = None
+        for (parameter, _, entry), item, result in zip(missing, items, results):
+            if isinstance(result, ua.StatusCode):
+                self._forget_item(item)
+                rejected = result
+                continue
+            item.server_handle = result
+            created[parameter] = (item, entry)
+        self._delete_unused(interval)
+        if strict and rejected is not None:
+            rejected.check()
+        return created
+
+    def _delete_unused(self, interval: int):
+        """
+        Deletes the subscription of an interval if it has no monitored items.
+        """
+        if interval in self._subscriptions and not any(item.interval == interval for item in self._items.values()):
+            self._subscriptions.pop(interval).delete()
+
+    def _forget_item(self, item: "_MonitoredItem"):
+        del self._items[item.client_handle]
+        del self._keys[item.key]
+
+    def _notify(self, generation: int, client_handle: int, value: Any):
+        # called from the event loop thread of the client, must not block on the lock
+        if generation != self._generation:
+            return
+        item = self._items.get(client_handle)
+        if item is None:
+            return
+        item.value = value
+        item.has_value = True
+        for callback, dispatcher in item.callbacks:
+            dispatcher.submit(item.parameter, callback, value, item.parameter)
+
+class SubscriptionHandle:
+    """
+    Handle of a callback registered on a SubscriptionManager.
+    """
+    def __init__(self, manager: SubscriptionManager, item: "_MonitoredItem", entry: Tuple[Callable, Dispatcher]):
+        self._manager = manager
+        self._item = item
+        self._entry = entry
+
+    @property
+    def parameter(self) -> str:
+        """
+        str: The subscribed variable.
+        """
+        return self._item.parameter
+
+    @property
+    def deleted(self) -> bool:
+        """
+        bool: True if the callback was removed.
+        """
+        return not any(entry is self._entry for entry in self._item.callbacks)
+
+    @property
+    def server_handle(self) -> Optional[int]:
+        """
+        int: Server handle of the monitored item.
+        """
+        return self._item.server_handle
+
+    def delete(self):
+        """
+        Removes the callback from the subscription.
+        """
+        self._manager.remove(self)
+
+class _MonitoredItem:
+    def __init__(self, parameter: str, nodeid, interval: int, options: MonitoringOptions, client_handle: int):
+        self.parameter = parameter
+        self.nodeid = nodeid
+        self.interval = interval
+        self.options = options
+        self.key = (interval, nodeid, options)
+        self.client_handle = client_handle
+        self.server_handle: Optional[int] = None
+        self.callbacks: Tuple[Tuple[Callable, Dispatcher], ...] = () # (callback, dispatcher)
+        self.value: Any = None
+        self.has_value = False
+
+class _SubscriptionHandler:
+    """
+    Handler routing the notifications of one subscription to the SubscriptionManager.
+    """
+    def __init__(self, manager: SubscriptionManager):
+        self._manager = manager
+        self._generation = manager._generation
+
+    def datachange_notification(self, node, value, data):
+        self._manager._notify(self._generation, data.monitored_item.ClientHandle, value)
+
+    def status_change_notification(self, status):
+        if self._generation != self._manager._generation:
+            return
+        if self._manager._status_change_callback:
+            self._manager._status_change_callback(status)
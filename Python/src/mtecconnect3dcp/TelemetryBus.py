@@ -0,0 +1,348 @@
+import os
+import re
+import struct
+import threading
+import time
+from typing import Optional, Any, Dict, List, Tuple
+
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python 3.8+, see TelemetryPublisher
+    shared_memory = None
+
+from .OPCUAMachine import OPCUAMachine
+from .TelemetryRecorder import _default_channels, _subscribe, _unsubscribe, _poll
+
+# Layout of the shared memory segment (little endian):
+#   header:    magic, layout version, channel count, history length, pid of the publisher (0 = stopped)
+#   directory: channel names, NAME_SIZE bytes each (UTF-8, zero padded)
+#   channels:  per channel a block of sequence (seqlock, odd while written), samples written,
+#              latest timestamp and value, followed by the history ring of (timestamp, value)
+_MAGIC = b"MTEC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIq")
+_HEADER_SIZE = 32
+_NAME_SIZE = 64
+_CHANNEL = struct.Struct("<QQdd")
+_SEQUENCE = struct.Struct("<Q")
+_SAMPLE = struct.Struct("<dd")
+_PID_OFFSET = 16
+_WRITE_TIMEOUT = 1.0 # s a reader waits for a running publisher to finish writing a channel
+
+_published = set() # segments created by this process (registered with the resource tracker)
+
+class TelemetryPublisher:
+    """
+    Publishes the values of one machine to a shared memory segment, so other processes on the
+    same PC can read them with TelemetryReader (no network traffic, no extra PLC sessions).
+
+    The segment has a fixed layout: the latest value and a short history (ring) per channel.
+    Every channel is versioned with a seqlock, readers retry while a value is being written
+    and never block the publisher. Values are stored as float (bools as 0/1, missing values
+    as NaN), timestamps as Unix time in seconds. Run one publisher per machine. Requires Python 3.8+.
+
+    Args:
+        machine (Any): An OPCUAMachine (e.g. Duomix, Printhead, subscribed) or a Pump (polled).
+        name (str, optional): Name of the segment. Defaults to a name derived from the IP address (OPC-UA) or the serial port.
+        channels (List[str], optional): Property names or OPC-UA variables, as for TelemetryRecorder.attach(). Defaults to all readable properties
+            of an OPCUAMachine, or 'm_speed', 'm_current', 'm_voltage' and 'm_torque' of a Pump.
+        history (int): Number of samples kept per channel. Default is 256.
+        interval (int): Publishing interval (OPC-UA) or polling interval (others) in ms. Default is 100.
+
+    Raises:
+        FileExistsError: If another running publisher uses the name.
+    """
+    def __init__(self, machine: Any, name: Optional[str] = None, channels: Optional[List[str]] = None, history: int = 256, interval: int = 100):
+        if shared_memory is None:
+            raise ImportError("TelemetryPublisher requires Python 3.8 or newer (multiprocessing.shared_memory).")
+        if history < 1:
+            raise ValueError("History must be positive.")
+        self._name = name if name is not None else segment_name(machine)
+        self._channels = _default_channels(machine) if channels is None else list(dict.fromkeys(channels))
+        encoded = [channel.encode("utf-8") for channel in self._channels]
+        if any(len(channel) > _NAME_SIZE for channel in encoded):
+            raise ValueError(f"Channel names are limited to {_NAME_SIZE} bytes.")
+        self._history = history
+        block = _CHANNEL.size + history * _SAMPLE.size
+        directory = _HEADER_SIZE + len(encoded) * _NAME_SIZE
+        self._offsets = {channel: directory + i * block for i, channel in enumerate(self._channels)}
+        self._memory = _create(self._name, directory + len(encoded) * block)
+        buffer = self._memory.buf
+        _HEADER.pack_into(buffer, 0, _MAGIC, _VERSION, len(encoded), history, os.getpid())
+        for i, channel in enumerate(encoded):
+            buffer[_HEADER_SIZE + i * _NAME_SIZE:_HEADER_SIZE + i * _NAME_SIZE + len(channel)] = channel
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._closed = False
+        self._handles = []
+        self._poller = None
+        if isinstance(machine, OPCUAMachine):
+            self._handles = _subscribe(machine, self._channels, interval, self.publish)
+        else:
+            self._poller = _poll(machine, self._channels, interval, self.publish, self._stopped)
+
+    @property
+    def name(self) -> str:
+        """
+        str: Name of the shared memory segment (pass it to TelemetryReader).
+        """
+        return self._name
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        List[str]: The published channels.
+        """
+        return list(self._channels)
+
+    def publish(self, channel: str, value: Any, timestamp: Optional[float] = None):
+        """
+        Writes a sample (called by the subscription or polling, can be used for own values of a published channel).
+
+        Args:
+            channel (str): Channel name.
+            value (Any): Value (number or bool, None is stored as NaN).
+            timestamp (float, optional): Unix time in s. Defaults to now.
+        """
+        offset = self._offsets[channel]
+        if timestamp is None:
+            timestamp = time.time()
+        value = float("nan") if value is None else float(value)
+        with self._lock:
+            if self._closed:
+                return
+            buffer = self._memory.buf
+            sequence, written, _, _ = _CHANNEL.unpack_from(buffer, offset)
+            _SEQUENCE.pack_into(buffer, offset, sequence + 1) # odd: being written
+            _SAMPLE.pack_into(buffer, offset + _CHANNEL.size + (written % self._history) * _SAMPLE.size, timestamp, value)
+            _CHANNEL.pack_into(buffer, offset, sequence + 1, written + 1, timestamp, value)
+            _SEQUENCE.pack_into(buffer, offset, sequence + 2)
+
+    def close(self):
+        """
+        Stops publishing and removes the segment (readers keep their mapping until they close, see TelemetryReader.active).
+        """
+        if self._closed:
+            return
+        self._stopped.set()
+        _unsubscribe(self._handles)
+        self._handles = []
+        with self._lock:
+            self._closed = True
+            struct.pack_into("<q", self._memory.buf, _PID_OFFSET, 0)
+        self._memory.close()
+        try:
+            self._memory.unlink()
+        except FileNotFoundError:
+            pass
+        _published.discard(self._name)
+
+    def __enter__(self) -> "TelemetryPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class TelemetryReader:
+    """
+    Reads the values published by a TelemetryPublisher in another process.
+
+    Args:
+        name (str): Name of the segment (TelemetryPublisher.name).
+
+    Raises:
+        FileNotFoundError: If no publisher uses the name.
+    """
+    def __init__(self, name: str):
+        if shared_memory is None:
+            raise ImportError("TelemetryReader requires Python 3.8 or newer (multiprocessing.shared_memory).")
+        self._name = name
+        self._memory = _attach(name)
+        magic, version, count, history, _ = _HEADER.unpack_from(self._memory.buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._memory.close()
+            raise ValueError(f"Shared memory '{name}' is not a telemetry segment of this version.")
+        self._history = history
+        block = _CHANNEL.size + history * _SAMPLE.size
+        directory = _HEADER_SIZE + count * _NAME_SIZE
+        self._offsets = {}
+        for i in range(count):
+            raw = bytes(self._memory.buf[_HEADER_SIZE + i * _NAME_SIZE:_HEADER_SIZE + (i + 1) * _NAME_SIZE])
+            self._offsets[raw.rstrip(b"\0").decode("utf-8")] = directory + i * block
+        self.retries = 0
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        List[str]: The published channels.
+        """
+        return list(self._offsets)
+
+    @property
+    def active(self) -> bool:
+        """
+        bool: False if the publisher was closed or its process ended.
+        """
+        pid = struct.unpack_from("<q", self._memory.buf, _PID_OFFSET)[0]
+        return pid != 0 and _alive(pid)
+
+    def read(self, channel: str) -> Optional[Tuple[float, float]]:
+        """
+        Returns the latest sample of a channel.
+
+        Args:
+            channel (str): Channel name.
+
+        Returns:
+            Tuple[float, float]: (timestamp, value) or None if nothing was published yet (or the publisher ended while writing it).
+
+        Raises:
+            TimeoutError: If the running publisher does not finish writing the channel.
+        """
+        block = self._consistent(self._offsets[channel], _CHANNEL.size, _CHANNEL.unpack)
+        if block is None:
+            return None
+        _, written, timestamp, value = block
+        return (timestamp, value) if written else None
+
+    def values(self) -> Dict[str, float]:
+        """
+        Returns the latest value of every channel.
+
+        Returns:
+            Dict[str, float]: Value by channel (channels without samples are left out).
+        """
+        values = {}
+        for channel in self._offsets:
+            sample = self.read(channel)
+            if sample is not None:
+                values[channel] = sample[1]
+        return values
+
+    def history(self, channel: str) -> List[Tuple[float, float]]:
+        """
+        Returns the history of a channel.
+
+        Args:
+            channel (str): Channel name.
+
+        Returns:
+            List[Tuple[float, float]]: (timestamp, value) samples, oldest first (empty if the publisher ended while writing the channel).
+
+        Raises:
+            TimeoutError: If the running publisher does not finish writing the channel.
+        """
+        def parse(data: bytes) -> List[Tuple[float, float]]:
+            written = _CHANNEL.unpack_from(data, 0)[1]
+            samples = [_SAMPLE.unpack_from(data, _CHANNEL.size + (i % self._history) * _SAMPLE.size)
+                       for i in range(max(0, written - self._history), written)]
+            return samples
+        samples = self._consistent(self._offsets[channel], _CHANNEL.size + self._history * _SAMPLE.size, parse)
+        return samples if samples is not None else []
+
+    def close(self):
+        """
+        Unmaps the segment.
+        """
+        self._memory.close()
+
+    def __enter__(self) -> "TelemetryReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _consistent(self, offset: int, size: int, parse):
+        """
+        Copies a channel block (seqlock read: retried until the sequence was even and unchanged) and parses the copy.
+        Returns None if the publisher ended while writing the channel (the sequence stays odd).
+        """
+        buffer = self._memory.buf
+        attempts = 0
+        deadline = None
+        while True:
+            before = _SEQUENCE.unpack_from(buffer, offset)[0]
+            if before % 2 == 0:
+                data = bytes(buffer[offset:offset + size])
+                if _SEQUENCE.unpack_from(buffer, offset)[0] == before:
+                    return parse(data)
+            attempts += 1
+            self.retries += 1
+            if attempts % 100 == 0:
+                if not self.active:
+                    return None
+                if deadline is None:
+                    deadline = time.monotonic() + _WRITE_TIMEOUT
+                elif time.monotonic() > deadline:
+                    raise TimeoutError(f"Publisher of '{self._name}' did not finish writing within {_WRITE_TIMEOUT:g} s.")
+                time.sleep(0) # publisher preempted while writing
+
+def segment_name(machine: Any) -> str:
+    """
+    Returns the default segment name of a machine (derived from the IP address or the serial port).
+
+    Args:
+        machine (Any): An OPCUAMachine or a Pump (connected).
+
+    Returns:
+        str: Segment name.
+    """
+    address = getattr(machine, "_ip", None) or getattr(machine, "_port", None)
+    if address is None:
+        raise ValueError("Machine is not connected, pass a name.")
+    if not isinstance(machine, OPCUAMachine):
+        address += "_" + str(getattr(machine, "_frequency_inverter_id", ""))
+    return "mtec_" + re.sub(r"[^A-Za-z0-9]+", "_", address).strip("_")
+
+def _create(name: str, size: int) -> "shared_memory.SharedMemory":
+    try:
+        memory = shared_memory.SharedMemory(name, create=True, size=size)
+        _published.add(name)
+        return memory
+    except FileExistsError:
+        pass
+    # left over by a publisher that ended without close() (the segment outlives the process on Linux)
+    try:
+        old = _attach(name)
+    except FileNotFoundError:
+        return _create(name, size)
+    magic, _, _, _, pid = _HEADER.unpack_from(old.buf, 0) if old.size >= _HEADER.size else (None, 0, 0, 0, 0)
+    old.close()
+    if magic == _MAGIC and pid != 0 and _alive(pid):
+        raise FileExistsError(f"Telemetry of '{name}' is already published by process {pid}.")
+    if magic != _MAGIC and magic is not None:
+        raise FileExistsError(f"Shared memory '{name}' exists and is not a telemetry segment.")
+    stale = shared_memory.SharedMemory(name)
+    stale.close()
+    stale.unlink()
+    return _create(name, size)
+
+def _attach(name: str) -> "shared_memory.SharedMemory":
+    """
+    Opens an existing segment without registering it with the resource tracker (which would remove it when this process ends).
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False) # Python 3.13+
+    except TypeError:
+        pass
+    memory = shared_memory.SharedMemory(name)
+    if name in _published:
+        return memory
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(memory._name, "shared_memory")
+    except Exception:
+        pass
+    return memory
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid() or os.name == "nt":
+        # on Windows the segment is removed with its last handle, it is never left over
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
@@ -0,0 +1,316 @@
+try:
+    import numpy as np
+except ImportError: # optional dependency, see TelemetryRecorder
+    np = None
+
+import csv
+import threading
+import time
+import zipfile
+from typing import Optional, Callable, Any, Dict, List, Tuple, Union
+
+from .Dispatcher import InlineDispatcher
+from .OPCUAMachine import OPCUAMachine, _properties, _variables
+
+_CHUNK = 65536 # samples copied at once while exporting
+
+class TelemetryRecorder:
+    """
+    Records machine values in fixed-size ring buffers (NumPy, one per channel).
+
+    Every channel stores (timestamp, value) pairs in two preallocated arrays. When a channel
+    is full, the oldest samples are overwritten, so the memory use does not grow during long
+    prints. Values are stored as float (bools as 0/1, missing values as NaN), timestamps as
+    Unix time in seconds. Requires NumPy ('pip install numpy').
+
+    Args:
+        capacity (int): Number of samples kept per channel. Default is 100000.
+    """
+    def __init__(self, capacity: int = 100000):
+        if np is None:
+            raise ImportError("TelemetryRecorder requires NumPy ('pip install numpy').")
+        if capacity < 1:
+            raise ValueError("Capacity must be positive.")
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._channels: Dict[str, _Channel] = {}
+        self._handles = []
+        self._pollers: List[Tuple[threading.Thread, threading.Event]] = [] # (thread, stop event) per attached machine
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        List[str]: Names of the recorded channels.
+        """
+        return list(self._channels)
+
+    def attach(self, machine: Any, channels: Optional[List[str]] = None, interval: int = 100):
+        """
+        Records values of a machine.
+        OPC-UA machines are recorded by one subscription (every change), other machines (e.g. Pump) are polled.
+
+        Args:
+            machine (Any): An OPCUAMachine (e.g. Duomix, Printhead) or a Pump.
+            channels (List[str], optional): Property names (e.g. 'm_speed', converted like the property) or OPC-UA variables (raw values).
+                Defaults to all readable properties of an OPCUAMachine, or 'm_speed', 'm_current', 'm_voltage' and 'm_torque' of a Pump.
+            interval (int): Publishing interval (OPC-UA) or polling interval (others) in ms. Default is 100.
+        """
+        channels = _default_channels(machine) if channels is None else list(channels)
+        with self._lock:
+            for channel in channels:
+                self._channel(channel)
+        if isinstance(machine, OPCUAMachine):
+            self._handles.extend(_subscribe(machine, channels, interval, self.record))
+        else:
+            stopped = threading.Event()
+            self._pollers.append((_poll(machine, channels, interval, self.record, stopped), stopped))
+
+    def detach(self):
+        """
+        Stops recording (the recorded samples are kept).
+        """
+        for _, stopped in self._pollers:
+            stopped.set()
+        _unsubscribe(self._handles)
+        self._handles = []
+        self._pollers = []
+
+    def record(self, channel: str, value: Any, timestamp: Optional[float] = None):
+        """
+        Adds a sample (e.g. from an own callback).
+
+        Args:
+            channel (str): Channel name (created if new).
+            value (Any): Value (number or bool, None is stored as NaN).
+            timestamp (float, optional): Unix time in s. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        value = float("nan") if value is None else float(value)
+        with self._lock:
+            self._channel(channel).append(timestamp, value)
+
+    def latest(self, channel: str) -> Optional[Tuple[float, float]]:
+        """
+        Returns the latest sample of a channel.
+
+        Args:
+            channel (str): Channel name.
+
+        Returns:
+            Tuple[float, float]: (timestamp, value) or None if the channel is empty.
+        """
+        with self._lock:
+            data = self._channels[channel]
+            if data.written == 0:
+                return None
+            position = (data.written - 1) % self._capacity
+            return float(data.timestamps[position]), float(data.values[position])
+
+    def window(self, channel: str, start: Optional[float] = None, end: Optional[float] = None) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Returns the samples of a channel in a time window (only the window is copied).
+
+        Args:
+            channel (str): Channel name.
+            start (float, optional): Unix time in s (inclusive). Negative values are relative to now (e.g. -10 = last 10 s). Defaults to the oldest sample.
+            end (float, optional): Unix time in s (exclusive). Defaults to after the latest sample.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Timestamps and values.
+        """
+        with self._lock:
+            data = self._channels[channel]
+            first, last = data.range(_absolute(start), _absolute(end))
+            segments = data.segments(first, last)
+            return (np.concatenate([t for t, _ in segments]) if segments else np.empty(0),
+                    np.concatenate([v for _, v in segments]) if segments else np.empty(0))
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the number of samples per channel.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Channel -> 'samples' (stored), 'recorded' (total) and 'overwritten'.
+        """
+        with self._lock:
+            return {name: {"samples": min(data.written, self._capacity), "recorded": data.written,
+                           "overwritten": max(0, data.written - self._capacity)} for name, data in self._channels.items()}
+
+    def export_npz(self, path: str, channels: Optional[List[str]] = None, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        Exports channels to a NumPy .npz file (arrays '<channel>.timestamp' and '<channel>.value', load with np.load()).
+        The ring buffers are written in chunks, the history is not copied as a whole.
+
+        Args:
+            path (str): File path.
+            channels (List[str], optional): Channels to export. Defaults to all.
+            start (float, optional): Start of the time window (see window()). Defaults to the oldest sample.
+            end (float, optional): End of the time window (see window()). Defaults to after the latest sample.
+        """
+        ranges = self._ranges(channels, start, end)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name, (first, last) in ranges.items():
+                for column in (0, 1):
+                    key = name + (".timestamp" if column == 0 else ".value")
+                    with archive.open(key + ".npy", "w", force_zip64=True) as f:
+                        np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)), "fortran_order": False, "shape": (last - first,)})
+                        for chunk in self._chunks(name, first, last):
+                            f.write(chunk[column].tobytes())
+
+    def export_csv(self, path: str, channels: Optional[List[str]] = None, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        Exports channels to a CSV file with the columns 'channel', 'timestamp' and 'value'.
+        The ring buffers are written in chunks, the history is not copied as a whole.
+
+        Args:
+            path (str): File path.
+            channels (List[str], optional): Channels to export. Defaults to all.
+            start (float, optional): Start of the time window (see window()). Defaults to the oldest sample.
+            end (float, optional): End of the time window (see window()). Defaults to after the latest sample.
+        """
+        ranges = self._ranges(channels, start, end)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["channel", "timestamp", "value"])
+            for name, (first, last) in ranges.items():
+                for timestamps, values in self._chunks(name, first, last):
+                    writer.writerows((name, repr(t), repr(v)) for t, v in zip(timestamps.tolist(), values.tolist()))
+
+    def _ranges(self, channels: Optional[List[str]], start: Optional[float], end: Optional[float]) -> Dict[str, Tuple[int, int]]:
+        with self._lock:
+            names = list(self._channels) if channels is None else channels
+            return {name: self._channels[name].range(_absolute(start), _absolute(end)) for name in names}
+
+    def _chunks(self, channel: str, first: int, last: int):
+        """
+        Copies a range of samples (absolute indices) chunk by chunk, so recording is only blocked briefly.
+        """
+        for begin in range(first, last, _CHUNK):
+            with self._lock:
+                data = self._channels[channel]
+                if begin < data.written - self._capacity:
+                    raise RuntimeError(f"Samples of '{channel}' were overwritten during the export, use a larger capacity or a smaller window.")
+                segments = data.segments(begin, min(begin + _CHUNK, last))
+                chunk = (np.concatenate([t for t, _ in segments]), np.concatenate([v for _, v in segments]))
+            yield chunk
+
+    def _channel(self, name: str) -> "_Channel":
+        channel = self._channels.get(name)
+        if channel is None:
+            channel = _Channel(self._capacity)
+            self._channels[name] = channel
+        return channel
+
+class _Channel:
+    """
+    Ring buffer of one channel. Samples are addressed by absolute index (0 = first sample ever recorded),
+    sample i is stored at position i % capacity while i >= written - capacity.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.written = 0
+
+    def append(self, timestamp: float, value: float):
+        position = self.written % self.capacity
+        self.timestamps[position] = timestamp
+        self.values[position] = value
+        self.written += 1
+
+    def segments(self, first: int, last: int) -> List[Tuple["np.ndarray", "np.ndarray"]]:
+        """
+        Views of the samples first..last-1 (at most two, the buffer wraps around).
+        """
+        result = []
+        while first < last:
+            position = first % self.capacity
+            length = min(last - first, self.capacity - position)
+            result.append((self.timestamps[position:position + length], self.values[position:position + length]))
+            first += length
+        return result
+
+    def range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """
+        Absolute indices of the samples with start <= timestamp < end.
+        """
+        first = max(0, self.written - self.capacity)
+        last = self.written
+        return (self._search(start, first, last) if start is not None else first,
+                self._search(end, first, last) if end is not None else last)
+
+    def _search(self, timestamp: float, first: int, last: int) -> int:
+        offset = first
+        for timestamps, _ in self.segments(first, last):
+            index = int(np.searchsorted(timestamps, timestamp, side="left"))
+            if index < len(timestamps):
+                return offset + index
+            offset += len(timestamps)
+        return last
+
+def _absolute(timestamp: Optional[Union[int, float]]) -> Optional[float]:
+    if timestamp is not None and timestamp < 0:
+        return time.time() + timestamp
+    return timestamp
+
+def _default_channels(machine: Any) -> List[str]:
+    """
+    Channels recorded if none are given: all readable properties of an OPC-UA machine, the measurements of other machines (Pump).
+    """
+    if isinstance(machine, OPCUAMachine):
+        return list(_properties(type(machine)))
+    return ["m_speed", "m_current", "m_voltage", "m_torque"]
+
+def _subscribe(machine: OPCUAMachine, channels: List[str], interval: int, record: Callable[[str, Any, float], Any]) -> list:
+    """
+    Subscribes to the channels (property names or variables) of an OPC-UA machine with one request.
+    record() receives channel, converted value and time received. Returns the subscription handles.
+    """
+    table = _properties(type(machine))
+    variables = _variables(type(machine))
+    targets: Dict[str, List[Tuple[str, Any]]] = {} # variable -> [(channel, conversion)]
+    for channel in channels:
+        if channel in table:
+            variable, conversion = table[channel].variable, table[channel].decode
+        else:
+            variable, conversion = channel, None
+        targets.setdefault(variable, []).append((channel, conversion))
+    def callback(value, parameter):
+        now = time.time()
+        for channel, conversion in targets.get(parameter, ()):
+            record(channel, conversion(value) if conversion is not None and value is not None else value, now)
+    parameters = list(targets)
+    # storing a sample is cheap, no need for the worker threads
+    handles = machine._subscriptions.add_many(parameters, machine._nodes(machine._reader, parameters), callback, interval, InlineDispatcher())
+    # removed by machine.disconnect() as well
+    machine._handles.extend(handles.values())
+    missing = [variable for variable in parameters if variable not in handles and variable in variables]
+    if missing:
+        print("Not recorded (not supported by the machine):", ", ".join(missing))
+    return list(handles.values())
+
+def _unsubscribe(handles: list):
+    for handle in handles:
+        if not handle.deleted:
+            try:
+                handle.delete()
+            except Exception as e:
+                print("Error removing telemetry subscription:", e)
+
+def _poll(machine: Any, channels: List[str], interval: int, record: Callable[[str, Any], Any], stopped: threading.Event) -> threading.Thread:
+    """
+    Reads the channels (property names) of a machine every interval ms until stopped is set.
+    """
+    def run():
+        while not stopped.wait(interval / 1000):
+            for channel in channels:
+                try:
+                    value = getattr(machine, channel)
+                except Exception as e:
+                    print(f"Error reading '{channel}':", e)
+                    value = None
+                record(channel, value)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -9,4 +9,20 @@ from .Duomix import Duomix
 from .DuomixPlus import DuomixPlus
 from .Printhead import Printhead
 from .Dosingpump import Dosingpump
-from .Pump import Pump
\ No newline at end of file
+from .Pump import Pump, PumpSnapshot
+from .ModbusBus import ModbusBus
+from .Dispatcher import Dispatcher, InlineDispatcher, ThreadPoolDispatcher
+from .Parameter import Parameter
+from .SetpointChannel import SetpointChannel
+from .SubscriptionManager import MonitoringOptions
+from .TelemetryRecorder import TelemetryRecorder
+from .TelemetryBus import TelemetryPublisher, TelemetryReader
+from .AsyncOPCUAMachine import AsyncOPCUAMachine
+from .AsyncMixingpump import AsyncMixingpump
+from .AsyncMixingpumpPlus import AsyncMixingpumpPlus
+from .AsyncPrinthead import AsyncPrinthead
+from .AsyncDosingpump import AsyncDosingpump
+from .AsyncDuomix import AsyncDuomix
+from .AsyncDuomixPlus import AsyncDuomixPlus
+from .AsyncSmp import AsyncSmp
+from .AsyncSmpPlus import AsyncSmpPlus
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from mtecconnect3dcp import ModbusCodec
+from mtecconnect3dcp.OPCUAConnection import OPCUAConnection
+from mtecconnect3dcp.Simulator import Simulator
+
+class SimulatorThread:
+    """
+    Simulator running in an event loop of its own thread, can be stopped and started again on the same port.
+    """
+    def __init__(self, model: str, **options):
+        self.model = model
+        self.options = options
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.simulator = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"opc.tcp://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.simulator = Simulator(self.model, port=self.port, **self.options)
+        self._run(self.simulator.start())
+
+    def stop(self):
+        if self.simulator is not None:
+            self._run(self.simulator.stop())
+            self.simulator = None
+
+    def write(self, values):
+        self._run(self.simulator.write(values))
+
+    def close(self):
+        self.stop()
+        self._run(_cancel_tasks())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(30)
+
+async def _cancel_tasks():
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+class ModbusSlave:
+    """
+    Frequency inverters answering Modbus RTU requests on the other end of a pseudo terminal (POSIX only).
+
+    Attributes:
+        path (str): Serial port to connect to.
+        registers (Dict[int, Dict[int, int]]): Registers per slave address, changed by the write requests.
+        requests (List[Tuple[float, int, int, int, int]]): Time (perf_counter), slave, function, register and value/count of every request.
+        delay (float): Time before a response in s.
+        pause (float): Pause between the first 3 bytes of a response and the rest in s.
+        truncate (int, optional): Number of bytes of the responses sent, None for complete responses.
+        silent (Set[int]): Slave addresses that do not answer.
+    """
+    def __init__(self, slaves=(1,), delay: float = 0.002):
+        import pty
+        import tty
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.path = os.ttyname(self._slave)
+        self.registers = {slave: {0xFD00: 2500, 0xFD03: 123, 0xFD05: 23000, 0xFD06: 0x10, 0xFD18: 456, 0xFA00: 0} for slave in slaves}
+        self.requests = []
+        self.delay = delay
+        self.pause = 0.0
+        self.truncate = None
+        self.silent = set()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._closed = True
+        os.close(self._slave)
+        self._thread.join(5)
+        os.close(self._master)
+
+    def _run(self):
+        buffer = b""
+        while not self._closed:
+            try:
+                buffer += os.read(self._master, 256)
+            except OSError:
+                return # closed
+            while len(buffer) >= 8:
+                frame, buffer = buffer[:8], buffer[8:]
+                if ModbusCodec.crc16(frame) != 0:
+                    buffer = b""
+                    break
+                slave, function = frame[0], frame[1]
+                register, value = int.from_bytes(frame[2:4], "big"), int.from_bytes(frame[4:6], "big")
+                self.requests.append((time.perf_counter(), slave, function, register, value))
+                if slave not in self.registers or slave in self.silent:
+                    continue
+                registers = self.registers[slave]
+                time.sleep(self.delay)
+                if function == ModbusCodec.READ_HOLDING_REGISTERS:
+                    data = b"".join(registers.get(register + i, 0).to_bytes(2, "big") for i in range(value))
+                    response = ModbusCodec.with_crc(bytes([slave, function, len(data)]) + data)
+                else:
+                    registers[register] = value
+                    response = frame
+                if self.truncate is not None:
+                    response = response[:self.truncate]
+                if self.pause:
+                    os.write(self._master, response[:3])
+                    time.sleep(self.pause)
+                    response = response[3:]
+                os.write(self._master, response)
+
+def wait_for(predicate, timeout: float = 10.0) -> bool:
+    """
+    Waits until predicate() is true, returns False after the timeout.
+    """
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return bool(predicate())
+
+def _assert_connections_closed():
+    leftover = OPCUAConnection.open_connections()
+    for connection in leftover:
+        connection.close() # do not affect the following tests
+    assert not leftover, f"connections left open: {[connection.url for connection in leftover]}"
+
+@pytest.fixture
+def flowmatic():
+    simulator = SimulatorThread("flow-matic PX")
+    simulator.start()
+    yield simulator
+    simulator.close()
+    _assert_connections_closed()
+
+@pytest.fixture
+def duomix():
+    simulator = SimulatorThread("duo-mix 3DCP+")
+    simulator.start()
+    yield simulator
+    simulator.close()
+    _assert_connections_closed()
+
+@pytest.fixture
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(OPCUAConnection, "check_interval", 0.2)
+    monkeypatch.setattr(OPCUAConnection, "reconnect_delay", 0.1)
+    monkeypatch.setattr(OPCUAConnection, "reconnect_max_delay", 0.5)
+
+@pytest.fixture
+def modbus_slave():
+    slave = ModbusSlave(slaves=(1, 2, 3))
+    yield slave
+    slave.close()
@@ -0,0 +1,55 @@
+from mtecconnect3dcp import DuomixPlus, Printhead
+from mtecconnect3dcp.OPCUAConnection import OPCUAConnection
+
+def test_capabilities_list_variables_and_types(duomix):
+    machine = DuomixPlus()
+    machine.connect(duomix.endpoint)
+    try:
+        capabilities = machine.capabilities
+        assert set(capabilities) == set(duomix.simulator.variables)
+        assert capabilities["Remote_start"] == "Boolean"
+        assert capabilities["set_value_mixingpump"] == "UInt16"
+        assert capabilities["actual_value_pressure"] == "Float"
+        assert machine.supports("Remote_start")
+        assert not machine.supports("state_printhead_on")
+    finally:
+        machine.disconnect()
+
+def test_browsed_once_per_connection(flowmatic, monkeypatch):
+    browsed = []
+    read_capabilities = OPCUAConnection._read_capabilities
+    def counted(self, baseNode):
+        browsed.append(baseNode)
+        return read_capabilities(self, baseNode)
+    monkeypatch.setattr(OPCUAConnection, "_read_capabilities", counted)
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        for _ in range(3):
+            assert printhead.supports("state_printhead_on")
+        printhead.read_many(["state_printhead_on", "error_printhead"])
+        assert len(browsed) == 1
+    finally:
+        printhead.disconnect()
+
+def test_unsupported_variables_are_not_requested(flowmatic, capsys):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        assert printhead.safe_read("Remote_start", "n/a") == "n/a"
+        assert printhead.safe_change("Remote_start", True, "bool") is False
+        assert "not supported" in capsys.readouterr().out
+        assert printhead.safe_read("error_no_printhead", None) == 0
+    finally:
+        printhead.disconnect()
+
+def test_unbrowsable_server_supports_everything(flowmatic, monkeypatch):
+    monkeypatch.setattr(OPCUAConnection, "_read_capabilities", lambda self, baseNode: None)
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        assert printhead.capabilities is None
+        assert printhead.supports("Remote_start")
+        assert printhead.read_many(["error_no_printhead"]) == {"error_no_printhead": 0}
+    finally:
+        printhead.disconnect()
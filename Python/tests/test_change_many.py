@@ -0,0 +1,34 @@
+import pytest
+
+from mtecconnect3dcp import DuomixPlus
+
+@pytest.fixture
+def machine(duomix):
+    machine = DuomixPlus()
+    machine.connect(duomix.endpoint)
+    yield machine
+    machine.disconnect()
+
+def test_status_codes_by_variable(machine):
+    results = machine.change_many({"set_value_water_flow": (120.0, "float"), "Remote_start": (False, "bool"), "no_such_variable": (1, "bool")})
+    assert list(results) == ["set_value_water_flow", "Remote_start", "no_such_variable"]
+    assert results["set_value_water_flow"].is_good()
+    assert results["Remote_start"].is_good()
+    assert not results["no_such_variable"].is_good()
+    assert machine.read("set_value_water_flow") == pytest.approx(120.0)
+
+def test_properties_in_their_unit(machine):
+    results = machine.change_many({"speed": 35, "water": 80})
+    assert all(status.is_good() for status in results.values())
+    assert machine.read("set_value_mixingpump") == int((35 - 20) * 65535 / 30)
+    assert machine.speed == pytest.approx(35, abs=0.01)
+    assert machine.water == pytest.approx(80)
+
+def test_invalid_values(machine):
+    with pytest.raises(ValueError):
+        machine.change_many({"speed": 60}) # above 50 Hz
+    with pytest.raises(ValueError):
+        machine.change_many({"m_pressure": 1}) # read-only property
+    with pytest.raises(ValueError):
+        machine.change_many({"Remote_start": (True, "double")})
+    assert machine.change_many({}) == {}
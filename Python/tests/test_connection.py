@@ -0,0 +1,73 @@
+from asyncua import ua
+import pytest
+
+from mtecconnect3dcp import Printhead, Dosingpump
+from mtecconnect3dcp.OPCUAConnection import OPCUAConnection
+
+from conftest import wait_for
+
+def test_shared_connection_reference_counting(flowmatic):
+    printhead, dosingpump = Printhead(), Dosingpump()
+    printhead.connect(flowmatic.endpoint)
+    dosingpump.connect(flowmatic.endpoint)
+    connection = printhead._connection
+    assert dosingpump._connection is connection and connection._references == 2
+
+    printhead.disconnect()
+    printhead.disconnect() # no second release
+    assert connection._references == 1 and connection.connected
+    assert dosingpump.s_ready is True
+
+    dosingpump.disconnect()
+    assert not connection.connected
+    assert OPCUAConnection.open_connections() == []
+
+def test_connect_again_reuses_no_reference(flowmatic):
+    printhead, dosingpump = Printhead(), Dosingpump()
+    printhead.connect(flowmatic.endpoint)
+    dosingpump.connect(flowmatic.endpoint)
+    printhead.connect(flowmatic.endpoint)
+    assert dosingpump._connection._references == 2
+    printhead.disconnect()
+    dosingpump.disconnect()
+
+def test_access_after_disconnect_raises(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    printhead.disconnect()
+    with pytest.raises(ua.UaError):
+        printhead.read("actual_value_printhead")
+
+def test_client_of_lost_session_raises_uaerror(flowmatic, fast_reconnect):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        reader = printhead._reader
+        printhead._node(reader, "error_no_printhead")
+        flowmatic.stop()
+        flowmatic.start()
+        assert wait_for(lambda: printhead.connection_metrics()["reconnects"] == 1, 15)
+        with pytest.raises(ua.UaError):
+            printhead._node(reader, "error_no_printhead")
+        assert printhead.s_error_no == 0
+    finally:
+        printhead.disconnect()
+
+def test_metrics_count_subscriptions_of_all_machines(flowmatic):
+    printhead, dosingpump = Printhead(), Dosingpump()
+    printhead.connect(flowmatic.endpoint)
+    dosingpump.connect(flowmatic.endpoint)
+    try:
+        base = printhead.connection_metrics()
+        assert base["monitored_items"] >= 1 # Livebit
+        handle, _ = printhead.subscribe("error_printhead", lambda value, parameter: None, 200)
+        dosingpump.subscribe("error_dosingpump", lambda value, parameter: None, 200)
+        metrics = dosingpump.connection_metrics()
+        assert metrics["monitored_items"] == base["monitored_items"] + 2
+        assert metrics["subscriptions"] == base["subscriptions"] + 1
+        handle.delete()
+        assert printhead.connection_metrics()["monitored_items"] == base["monitored_items"] + 1
+        assert OPCUAConnection.open_connections() == [printhead._connection]
+    finally:
+        printhead.disconnect()
+        dosingpump.disconnect()
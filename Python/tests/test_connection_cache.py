@@ -0,0 +1,49 @@
+import json
+import threading
+
+from mtecconnect3dcp import Printhead
+from mtecconnect3dcp.ConnectionCache import ConnectionCache
+from mtecconnect3dcp.OPCUAConnection import OPCUAConnection
+
+def test_put_keeps_concurrent_values(tmp_path):
+    cache = ConnectionCache(str(tmp_path / "cache.json"))
+    threads = [threading.Thread(target=lambda i=i: cache.put("opc.tcp://m:4840", "1.0", "livebit", f"base{i}", i)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get("opc.tcp://m:4840", "1.0")["livebit"] == {f"base{i}": i for i in range(20)}
+    assert ConnectionCache(str(tmp_path / "cache.json")).get("opc.tcp://m:4840", "1.0")["livebit"]["base3"] == 3
+
+def test_get_returns_copies(tmp_path):
+    cache = ConnectionCache(str(tmp_path / "cache.json"))
+    cache.put("opc.tcp://m:4840", "1.0", "livebit", "base", "Livebit2machine")
+    cache.get("opc.tcp://m:4840", "1.0")["livebit"]["base"] = "changed"
+    assert cache.get("opc.tcp://m:4840", "1.0")["livebit"]["base"] == "Livebit2machine"
+
+def test_new_build_discards_entry(tmp_path):
+    cache = ConnectionCache(str(tmp_path / "cache.json"))
+    cache.put("opc.tcp://m:4840", "1.0", "livebit", "base", "Livebit2DuoMix")
+    cache.put("opc.tcp://m:4840", "1.1", "livebit", "base", "Livebit2machine")
+    assert cache.get("opc.tcp://m:4840", "1.0") == {}
+    with open(tmp_path / "cache.json", encoding="utf-8") as f:
+        assert list(json.load(f)) == ["opc.tcp://m:4840|1.1"]
+
+def test_connect_fills_and_uses_cache(flowmatic, tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint, fast=True, cache=path)
+    capabilities = printhead.capabilities
+    printhead.disconnect()
+    with open(path, encoding="utf-8") as f:
+        entry = next(iter(json.load(f).values()))
+    assert entry["capabilities"][printhead._baseNode] == capabilities
+
+    # the second connect does not browse
+    monkeypatch.setattr(OPCUAConnection, "_read_capabilities", lambda self, baseNode: None)
+    printhead.connect(flowmatic.endpoint, fast=True, cache=path)
+    try:
+        assert printhead.capabilities == capabilities
+        assert printhead.livebit.parameter == "Livebit2machine"
+    finally:
+        printhead.disconnect()
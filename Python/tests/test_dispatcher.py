@@ -0,0 +1,98 @@
+import gc
+import inspect
+import threading
+import time
+import weakref
+
+from mtecconnect3dcp import Printhead
+from mtecconnect3dcp.Dispatcher import ThreadPoolDispatcher
+from mtecconnect3dcp.OPCUAMachine import SubscriptionWrapper
+
+from conftest import wait_for
+
+def test_events_of_one_key_keep_their_order():
+    dispatcher = ThreadPoolDispatcher(workers=4)
+    received = []
+    for i in range(100):
+        dispatcher.submit("pressure", received.append, i)
+    assert wait_for(lambda: len(received) == 100, 5)
+    assert received == list(range(100))
+    dispatcher.close()
+    assert dispatcher.metrics()["dispatched"] == 100
+
+def test_full_queue_drops_events():
+    dispatcher = ThreadPoolDispatcher(workers=1, max_queue=2)
+    release = threading.Event()
+    started = threading.Event()
+    dispatcher.submit("a", lambda: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    accepted = [dispatcher.submit("a", lambda: None) for _ in range(4)]
+    assert accepted == [True, True, False, False]
+    assert dispatcher.metrics()["dropped"] == 2
+    release.set()
+    dispatcher.close()
+
+def test_close_with_full_queue_and_blocked_callback():
+    dispatcher = ThreadPoolDispatcher(workers=1, max_queue=3)
+    release = threading.Event()
+    started = threading.Event()
+    dispatcher.submit("a", lambda: (started.set(), release.wait(10)))
+    assert started.wait(5)
+    for _ in range(3):
+        dispatcher.submit("a", lambda: None)
+    begin = time.monotonic()
+    dispatcher.close(timeout=0.2)
+    assert time.monotonic() - begin < 2
+    metrics = dispatcher.metrics()
+    assert metrics["dropped"] == 3 and metrics["queue_depth"] == 0
+    release.set()
+
+    # the next event starts new workers
+    done = threading.Event()
+    dispatcher.submit("a", done.set)
+    assert done.wait(5)
+    dispatcher.close()
+
+def test_disconnect_stops_dispatcher_threads(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    received = threading.Event()
+    printhead.m_pressure = lambda value: received.set()
+    assert received.wait(5)
+    workers = list(printhead.dispatcher._threads)
+    assert workers
+    printhead.disconnect()
+    assert not any(thread.is_alive() for thread in workers)
+
+def test_wrapper_passes_accepted_arguments_only():
+    received = []
+    class Callback:
+        def __call__(self, value):
+            received.append(value)
+    callback = Callback()
+    wrapper = SubscriptionWrapper(callback)
+    wrapper.trigger(4.2, "actual_value_pressure")
+    assert received == [4.2]
+    # the callback is not kept alive by the wrapper class
+    reference = weakref.ref(callback)
+    del wrapper, callback
+    gc.collect()
+    assert reference() is None
+
+def test_property_callback_signature_analysed_once(flowmatic, monkeypatch):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        analysed = []
+        signature = inspect.signature
+        monkeypatch.setattr(inspect, "signature", lambda callback: analysed.append(callback) or signature(callback))
+        values = []
+        def callback(value, subscription):
+            values.append(value)
+        printhead.s_error_no = callback
+        for error in range(1, 4):
+            flowmatic.write({"error_no_printhead": error})
+            assert wait_for(lambda: values and values[-1] == error, 5)
+        assert analysed == [callback]
+    finally:
+        printhead.disconnect()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from mtecconnect3dcp import Printhead
+from conftest import SimulatorThread, wait_for, _assert_connections_closed
+
+@pytest.fixture
+def fast_livebit():
+    simulator = SimulatorThread("flow-matic PX", livebit_interval=0.1, watchdog_timeout=1.0)
+    simulator.start()
+    yield simulator
+    simulator.close()
+    _assert_connections_closed()
+
+def test_echo_keeps_the_watchdog_satisfied(fast_livebit):
+    printhead = Printhead()
+    printhead.connect(fast_livebit.endpoint)
+    try:
+        printhead.livebit.configure(interval=50)
+        assert wait_for(lambda: printhead.livebit.metrics()["echoes"] >= 10, 5)
+        metrics = printhead.livebit.metrics()
+        assert metrics["errors"] == 0 and metrics["warnings"] == 0
+        assert 50 <= metrics["period"] <= 200
+        assert sum(metrics["latency_histogram"].values()) == metrics["echoes"]
+        assert sum(metrics["jitter_histogram"].values()) == metrics["echoes"] - 1
+        server = fast_livebit.simulator.metrics()
+        assert server["echoes"] >= 5 and server["watchdog_trips"] == 0
+    finally:
+        printhead.disconnect()
+
+def test_warning_before_the_watchdog_trips(fast_livebit):
+    printhead = Printhead()
+    printhead.connect(fast_livebit.endpoint)
+    try:
+        livebit = printhead.livebit
+        warnings = []
+        livebit.configure(interval=50, timeout=0.6, warning_ratio=0.5, on_warning=warnings.append)
+        assert wait_for(lambda: livebit.metrics()["echoes"] >= 2, 5)
+        def failing():
+            raise ConnectionError("write failed")
+        target = livebit._target
+        livebit._target = failing
+        assert wait_for(lambda: warnings, 5)
+        assert 0.3 <= warnings[0] < 1.0
+        assert livebit.metrics()["errors"] > 0
+        # echoed again, a new warning needs a new outage
+        livebit._target = target
+        echoes = livebit.metrics()["echoes"]
+        assert wait_for(lambda: livebit.metrics()["echoes"] > echoes, 5)
+        assert len(warnings) == 1
+    finally:
+        printhead.disconnect()
+
+def test_disconnect_waits_for_the_echo_thread(fast_livebit):
+    printhead = Printhead()
+    printhead.connect(fast_livebit.endpoint)
+    livebit = printhead.livebit
+    writing = threading.Event()
+    target = livebit._target
+    def slow():
+        writing.set()
+        time.sleep(0.3)
+        return target()
+    livebit._target = slow
+    assert writing.wait(5)
+    printhead.disconnect()
+    assert not livebit._thread.is_alive()
+
+def test_invalid_settings(fast_livebit):
+    printhead = Printhead()
+    printhead.connect(fast_livebit.endpoint)
+    try:
+        with pytest.raises(ValueError):
+            printhead.livebit.configure(timeout=0)
+        with pytest.raises(ValueError):
+            printhead.livebit.configure(warning_ratio=1.5)
+    finally:
+        printhead.disconnect()
@@ -0,0 +1,54 @@
+import time
+
+from mtecconnect3dcp import Printhead
+from conftest import wait_for
+
+def test_reads_served_from_the_mirror(flowmatic):
+    flowmatic.write({"error_no_printhead": 4})
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        mirror = printhead.mirror(["error_no_printhead", "error_printhead", "not_on_this_machine"], max_age=10, interval=50)
+        assert mirror.parameters == ["error_no_printhead", "error_printhead"]
+        assert wait_for(lambda: mirror.metrics()["size"] == 2, 5)
+        assert printhead.s_error_no == 4
+        assert printhead.read("error_printhead") is False
+        assert mirror.metrics()["hits"] == 2 and mirror.metrics()["misses"] == 0
+
+        flowmatic.write({"error_no_printhead": 6})
+        assert wait_for(lambda: printhead.s_error_no == 6, 5)
+        # not mirrored
+        assert printhead.s_ready is True
+        assert mirror.metrics()["misses"] == 0
+    finally:
+        printhead.disconnect()
+    assert mirror.closed
+
+def test_old_values_are_read_again(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        mirror = printhead.mirror(["error_no_printhead"], max_age=0.2, interval=50)
+        assert wait_for(lambda: mirror.metrics()["size"] == 1, 5)
+        time.sleep(0.3) # the value does not change, no notification
+        assert printhead.s_error_no == 0
+        assert mirror.metrics() == {"hits": 0, "misses": 1, "size": 1}
+        # the read refreshed the copy
+        assert printhead.s_error_no == 0
+        assert mirror.metrics()["hits"] == 1
+    finally:
+        printhead.disconnect()
+
+def test_closed_mirror_reads_from_the_machine(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        mirror = printhead.mirror(["error_no_printhead"], max_age=10, interval=50)
+        assert wait_for(lambda: mirror.metrics()["size"] == 1, 5)
+        mirror.close()
+        assert mirror.lookup("error_no_printhead") == (False, None)
+        flowmatic.write({"error_no_printhead": 2})
+        assert printhead.s_error_no == 2
+        assert mirror.metrics()["hits"] == 0
+    finally:
+        printhead.disconnect()
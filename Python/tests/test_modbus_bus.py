@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from mtecconnect3dcp import ModbusBus
+
+def _keepalives(modbus_slave, slave, since):
+    # keepalive: read FD00 (one register)
+    return sum(1 for t, s, function, register, count in modbus_slave.requests
+               if t >= since and s == slave and function == 3 and register == 0xFD00 and count == 1)
+
+def test_keepalive_skipped_while_polling(modbus_slave):
+    with ModbusBus(modbus_slave.path) as bus:
+        polled, idle = bus.pump(1), bus.pump(2)
+        polled.run = True
+        idle.run = True
+        stopped = threading.Event()
+        def poll():
+            while not stopped.is_set():
+                assert polled.m_voltage == 230.0
+                time.sleep(0.02)
+        poller = threading.Thread(target=poll)
+        start = time.perf_counter()
+        poller.start()
+        time.sleep(1.0)
+        stopped.set()
+        poller.join()
+        assert _keepalives(modbus_slave, 1, start) <= 1 # the polls keep the inverter alive
+        assert _keepalives(modbus_slave, 2, start) >= 3
+        metrics = bus.metrics()
+        assert set(metrics["slaves"]) == {1, 2}
+        assert metrics["slaves"][1]["failed"] == 0 and metrics["slaves"][2]["failed"] == 0
+
+def test_pumps_per_slave_address(modbus_slave):
+    with ModbusBus(modbus_slave.path) as bus:
+        first = bus.pump("01")
+        assert bus.pump(1) is first
+        third = bus.pump(3, timeout=0.1, retries=0)
+        assert bus.pumps == [first, third]
+        assert third.m_voltage == 230.0
+        with pytest.raises(ValueError):
+            bus.pump(0)
+    with pytest.raises(RuntimeError):
+        bus.pump(1)
+
+def test_emergency_stop_of_all_pumps(modbus_slave):
+    with ModbusBus(modbus_slave.path) as bus:
+        for slave in (1, 2, 3):
+            bus.pump(slave).speed = 30
+        start = time.perf_counter()
+        bus.emergency_stop()
+        stops = [(s, value) for t, s, function, register, value in modbus_slave.requests if t >= start and register == 0xFA00]
+        assert stops == [(1, 0x1000), (2, 0x1000), (3, 0x1000)]
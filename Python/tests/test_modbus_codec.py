@@ -0,0 +1,51 @@
+import pytest
+
+from mtecconnect3dcp import ModbusCodec
+
+def test_crc_of_known_frame():
+    # read holding register 0 of slave 1, CRC 0x0A84 sent low byte first
+    assert ModbusCodec.encode_read(1, 0x0000) == bytes.fromhex("010300000001840A")
+
+def test_crc_of_complete_frame_is_zero():
+    frame = ModbusCodec.with_crc(bytes.fromhex("0106FA000C7F"))
+    assert ModbusCodec.crc16(frame) == 0
+    assert ModbusCodec.crc16(memoryview(frame)) == 0
+    assert ModbusCodec.crc16(frame[2:], ModbusCodec.crc16(frame[:2])) == 0
+
+def test_encode_write():
+    frame = ModbusCodec.encode_write(1, 0xFA00, 0xC400)
+    assert frame[:6] == bytes.fromhex("0106FA00C400")
+    assert len(frame) == 8 and ModbusCodec.crc16(frame) == 0
+
+def test_encode_read_count_range():
+    with pytest.raises(ValueError):
+        ModbusCodec.encode_read(1, 0xFD00, 0)
+    with pytest.raises(ValueError):
+        ModbusCodec.encode_read(1, 0xFD00, 126)
+
+def test_decode_read_response():
+    frame = ModbusCodec.with_crc(bytes.fromhex("010304") + (1234).to_bytes(2, "big") + (42).to_bytes(2, "big"))
+    assert ModbusCodec.response_length(frame[:3]) == len(frame)
+    response = ModbusCodec.decode(frame)
+    assert (response.slave, response.function, response.exception) == (1, ModbusCodec.READ_HOLDING_REGISTERS, None)
+    assert response.registers == (1234, 42)
+    assert response.value == (1234 << 16) | 42
+
+def test_decode_write_echo():
+    request = ModbusCodec.encode_write(2, 0xFA01, 5000)
+    response = ModbusCodec.decode(request) # the slave echoes the request
+    assert (response.slave, response.address, response.value) == (2, 0xFA01, 5000)
+
+def test_decode_exception_response():
+    frame = ModbusCodec.with_crc(bytes.fromhex("018302"))
+    assert ModbusCodec.response_length(frame[:3]) == 5
+    response = ModbusCodec.decode(frame)
+    assert (response.function, response.exception) == (ModbusCodec.READ_HOLDING_REGISTERS, 2)
+
+def test_decode_rejects_bad_crc_and_incomplete_frames():
+    frame = bytearray(ModbusCodec.encode_write(1, 0xFA00, 1))
+    frame[4] ^= 0xFF
+    with pytest.raises(ValueError, match="CRC"):
+        ModbusCodec.decode(frame)
+    with pytest.raises(ValueError, match="Incomplete"):
+        ModbusCodec.decode(ModbusCodec.encode_write(1, 0xFA00, 1)[:7])
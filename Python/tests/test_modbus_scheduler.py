@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from mtecconnect3dcp import ModbusCodec
+from mtecconnect3dcp.ModbusScheduler import ModbusScheduler, EMERGENCY, SETPOINT, POLLING
+from conftest import wait_for
+
+class _CountedTimeout:
+    """
+    Serial port counting the changes of its timeout (each one reconfigures the port).
+    """
+    def __init__(self, port):
+        self._port = port
+        self.changes = 0
+
+    @property
+    def timeout(self):
+        return self._port.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.changes += 1
+        self._port.timeout = value
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+def test_response_read_in_parts(modbus_slave):
+    modbus_slave.pause = 0.02 # header and body arrive separately
+    scheduler = ModbusScheduler.acquire(modbus_slave.path)
+    try:
+        scheduler.serial = _CountedTimeout(scheduler.serial)
+        for _ in range(5):
+            transaction = scheduler.execute(ModbusCodec.encode_read(1, 0xFD00), timeout=0.2)
+            assert transaction.response.value == 2500 and transaction.attempts == 1
+        assert scheduler.serial.changes == 0 # same timeout as the port
+        for _ in range(5):
+            assert scheduler.execute(ModbusCodec.encode_read(1, 0xFD03), timeout=0.3).response.value == 123
+        assert scheduler.serial.changes == 1 # once for the new timeout, not per read
+    finally:
+        scheduler.release()
+
+def test_incomplete_response_ends_at_the_deadline(modbus_slave):
+    modbus_slave.truncate = 5
+    scheduler = ModbusScheduler.acquire(modbus_slave.path)
+    try:
+        messages = []
+        start = time.perf_counter()
+        transaction = scheduler.execute(ModbusCodec.encode_read(1, 0xFD00), timeout=0.3, retries=0, log=messages.append)
+        elapsed = time.perf_counter() - start
+        assert transaction.response is None and transaction.timeouts == 1
+        assert messages[0] == "Timeout waiting for response body."
+        assert 0.25 <= elapsed < 0.4 # not a full timeout more for the body
+        modbus_slave.truncate = None
+        assert scheduler.execute(ModbusCodec.encode_read(1, 0xFD00), timeout=0.3).response.value == 2500
+    finally:
+        scheduler.release()
+
+def test_silent_slave_times_out(modbus_slave):
+    modbus_slave.silent.add(2)
+    scheduler = ModbusScheduler.acquire(modbus_slave.path)
+    try:
+        start = time.perf_counter()
+        transaction = scheduler.execute(ModbusCodec.encode_read(2, 0xFD00), timeout=0.1, retries=1)
+        assert transaction.response is None and transaction.attempts == 2 and transaction.timeouts == 2
+        assert time.perf_counter() - start < 0.4
+        assert scheduler.metrics()["slaves"][2]["failed"] == 1
+    finally:
+        scheduler.release()
+
+def test_priority_classes_and_round_robin(modbus_slave):
+    scheduler = ModbusScheduler.acquire(modbus_slave.path)
+    try:
+        modbus_slave.delay = 0.1 # the first transaction keeps the bus busy while the others are queued
+        running = scheduler.submit(ModbusCodec.encode_read(3, 0xFD00), timeout=0.5)
+        assert wait_for(lambda: modbus_slave.requests, 5)
+        modbus_slave.delay = 0.002
+        queued = [
+            scheduler.submit(ModbusCodec.encode_read(1, 0xFD00), priority=POLLING),
+            scheduler.submit(ModbusCodec.encode_read(1, 0xFD03), priority=POLLING),
+            scheduler.submit(ModbusCodec.encode_read(2, 0xFD00), priority=POLLING),
+            scheduler.submit(ModbusCodec.encode_write(1, 0xFA01, 1000), priority=SETPOINT),
+            scheduler.submit(ModbusCodec.encode_write(2, 0xFA00, 0xC400), priority=EMERGENCY),
+        ]
+        for transaction in [running] + queued:
+            assert transaction.wait() is not None
+        order = [(slave, register) for _, slave, _, register, _ in modbus_slave.requests]
+        # emergency, setpoint, then the polling slaves take turns
+        assert order == [(3, 0xFD00), (2, 0xFA00), (1, 0xFA01), (1, 0xFD00), (2, 0xFD00), (1, 0xFD03)]
+        metrics = scheduler.metrics()
+        assert metrics["transactions"] == 6 and metrics["queued"] == 0
+        assert metrics["queue_wait"]["emergency"]["count"] == 1
+        assert metrics["queue_wait"]["polling"]["max"] >= metrics["queue_wait"]["emergency"]["max"]
+    finally:
+        scheduler.release()
+
+def test_shared_per_port(modbus_slave):
+    scheduler = ModbusScheduler.acquire(modbus_slave.path)
+    assert ModbusScheduler.acquire(modbus_slave.path) is scheduler
+    with pytest.raises(ValueError):
+        ModbusScheduler.acquire(modbus_slave.path, 9600)
+    scheduler.release()
+    assert scheduler.serial.is_open
+    scheduler.release()
+    assert not scheduler.serial.is_open
+    with pytest.raises(RuntimeError):
+        scheduler.submit(ModbusCodec.encode_read(1, 0xFD00))
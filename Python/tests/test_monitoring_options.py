@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from mtecconnect3dcp import Printhead, MonitoringOptions
+from conftest import wait_for
+
+def test_deadband_filters_small_changes(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        filtered, unfiltered = [], []
+        printhead.subscribe("set_value_printhead", lambda value, parameter: filtered.append(value), 50, MonitoringOptions(deadband=1.0))
+        printhead.subscribe("set_value_printhead", lambda value, parameter: unfiltered.append(value), 50)
+        assert wait_for(lambda: filtered and unfiltered, 5)
+        for value in (0.5, 2.0, 2.5, 5.0):
+            flowmatic.write({"set_value_printhead": value})
+            time.sleep(0.2)
+        assert wait_for(lambda: unfiltered[-1] == 5.0, 5)
+        assert filtered == [0.0, 2.0, 5.0]
+        assert unfiltered == [0.0, 0.5, 2.0, 2.5, 5.0]
+    finally:
+        printhead.disconnect()
+
+def test_subscription_options_used_by_properties(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        printhead.subscription_options("speed", interval=50, deadband=1.0)
+        received = []
+        printhead.speed = lambda value: received.append(value)
+        assert wait_for(lambda: received == [0.0], 5)
+        flowmatic.write({"set_value_printhead": 0.5})
+        flowmatic.write({"set_value_printhead": 3.0})
+        assert wait_for(lambda: received[-1] == 3.0, 5)
+        assert 0.5 not in received
+        handle = [handle for handle in printhead._handles if handle.parameter == "set_value_printhead"][0]
+        assert handle._item.interval == 50 and handle._item.options == MonitoringOptions(deadband=1.0)
+    finally:
+        printhead.disconnect()
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        MonitoringOptions(deadband=-1)
+    with pytest.raises(ValueError):
+        MonitoringOptions(deadband=1, deadband_type="relative")
+    with pytest.raises(ValueError):
+        MonitoringOptions(queue_size=-1)
+    # the deadband type does not matter without deadband
+    assert MonitoringOptions(deadband_type="percent") == MonitoringOptions()
@@ -0,0 +1,34 @@
+import pytest
+
+from mtecconnect3dcp import Printhead
+
+@pytest.mark.parametrize("register_nodes", [False, True])
+def test_nodes_resolved_once_per_session(flowmatic, register_nodes):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint, register_nodes=register_nodes)
+    try:
+        reader, writer = printhead._reader, printhead._writer
+        resolved = []
+        get_node = reader.get_node
+        reader.get_node = lambda nodeid: resolved.append(nodeid) or get_node(nodeid)
+
+        node = printhead._node(reader, "error_no_printhead")
+        assert printhead._node(reader, "error_no_printhead") is node
+        nodes = printhead._nodes(reader, ["error_no_printhead", "error_printhead"])
+        assert nodes[0] is node
+        assert [nodeid.rsplit(".", 1)[1] for nodeid in resolved] == ["error_no_printhead", "error_printhead"]
+        # handles are per session
+        assert printhead._node(writer, "error_no_printhead") is not node
+        assert printhead.s_error_no == 0
+    finally:
+        printhead.disconnect()
+
+def test_new_connection_resolves_again(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    node = printhead._node(printhead._reader, "error_no_printhead")
+    printhead.connect(flowmatic.endpoint)
+    try:
+        assert printhead._node(printhead._reader, "error_no_printhead") is not node
+    finally:
+        printhead.disconnect()
@@ -0,0 +1,57 @@
+from asyncua import ua
+import pytest
+
+from mtecconnect3dcp import Duomix, DuomixPlus, Printhead, Parameter
+from mtecconnect3dcp.AsyncPrinthead import AsyncPrinthead
+from mtecconnect3dcp.OPCUAMachine import _properties
+
+def test_scaled_parameter_round_trip():
+    speed = Duomix.schema()["speed"]
+    variant = speed.encode(35)
+    assert variant.VariantType == ua.VariantType.UInt16 and variant.Value == int((35 - 20) * 65535 / 30)
+    assert speed.decode(variant.Value) == pytest.approx(35, abs=0.001)
+    with pytest.raises(ValueError, match="Speed in Hz cannot be below 20"):
+        speed.encode(10)
+    with pytest.raises(ValueError, match="cannot be above 50"):
+        speed.encode(60)
+
+def test_inverted_and_cast_parameters():
+    flag = Parameter("state_fc_error", "bool", inverted=True)
+    assert flag.decode(False) is True and flag.decode(1) is False
+    count = Parameter("error_no", "uint16")
+    assert count.decode(7.0) == 7 and isinstance(count.decode(7.0), int)
+    assert count.encode is None # not writable
+    raw = Parameter("reserve_AI_1")
+    assert raw.decode is None
+    custom = Parameter("Silo_Level", "float", conversion=lambda raw: raw / 10)
+    assert custom.decode(500) == 50
+
+def test_invalid_declarations():
+    with pytest.raises(ValueError):
+        Parameter("x", "double")
+    with pytest.raises(ValueError):
+        Parameter("x", writable=True)
+    with pytest.raises(ValueError):
+        Parameter("x", "float", scale=0)
+
+def test_schema_merged_along_the_class_hierarchy():
+    schema = DuomixPlus.schema()
+    assert set(Duomix.schema()) < set(schema)
+    assert schema["speed"] is Duomix.schema()["speed"]
+    assert all(isinstance(parameter, Parameter) and parameter.typ is not None for parameter in schema.values())
+    # the async classes use the same tables
+    assert _properties(AsyncPrinthead) == Printhead.schema()
+
+def test_generated_properties(flowmatic):
+    flowmatic.write({"error_no_printhead": 11, "state_fc_error_printhead": True})
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        assert Printhead.s_error_no.__doc__ == Printhead.schema()["s_error_no"].doc
+        assert printhead.s_error_no == 11 and printhead.s_fc is False
+        printhead.speed = 120.0
+        assert printhead.read("set_value_printhead") == 120.0
+        with pytest.raises(ValueError):
+            printhead.m_speed = 5 # read-only, only callbacks can be assigned
+    finally:
+        printhead.disconnect()
@@ -0,0 +1,54 @@
+import time
+
+from mtecconnect3dcp import ModbusBus, Pump
+
+def _reads(modbus_slave, since):
+    return [(register, count) for t, _, function, register, count in modbus_slave.requests if t >= since and function == 3]
+
+def test_snapshot_with_one_request(modbus_slave):
+    pump = Pump()
+    pump.connect(modbus_slave.path)
+    try:
+        start = time.perf_counter()
+        snapshot = pump.snapshot()
+        assert _reads(modbus_slave, start) == [(0xFD00, 0x19)]
+        assert (snapshot.frequency, snapshot.current, snapshot.voltage, snapshot.torque) == (25.0, 1.23, 230.0, 4.56)
+        assert snapshot.switches == 0x10 and snapshot.s_ready
+        assert snapshot.m_speed == 25.0 and snapshot.age < 1.0
+        assert pump.snapshot(max_age=10) is snapshot
+        assert pump.snapshot() is not snapshot
+    finally:
+        pump.disconnect()
+
+def test_properties_served_from_the_snapshot(modbus_slave):
+    pump = Pump(snapshot_max_age=10)
+    pump.connect(modbus_slave.path)
+    try:
+        start = time.perf_counter()
+        values = (pump.m_speed, pump.m_voltage, pump.m_current, pump.m_torque, pump.s_ready)
+        assert values == (25.0, 230.0, 1.23, 4.56, True)
+        assert _reads(modbus_slave, start) == [(0xFD00, 0x19)]
+    finally:
+        pump.disconnect()
+
+def test_snapshot_sign_follows_the_commanded_direction(modbus_slave):
+    pump = Pump()
+    pump.connect(modbus_slave.path)
+    try:
+        pump.speed = -25
+        pump.run = True
+        assert pump.snapshot().m_speed == -25.0
+        pump.emergency_stop()
+        assert modbus_slave.registers[1][0xFA00] == Pump._EMERGENCY_STOP
+        assert pump.snapshot().m_speed == 25.0 # no longer commanded to run in reverse
+    finally:
+        pump.disconnect()
+
+def test_snapshot_sign_after_emergency_stop_of_the_bus(modbus_slave):
+    with ModbusBus(modbus_slave.path) as bus:
+        pump = bus.pump(2)
+        pump.speed = -25
+        pump.run = True
+        assert pump.snapshot().m_speed == -25.0
+        bus.emergency_stop()
+        assert pump.snapshot().m_speed == 25.0
@@ -0,0 +1,48 @@
+from mtecconnect3dcp import Printhead
+
+def _count_reads(machine):
+    calls = []
+    reader = machine._reader
+    read_attributes = reader.read_attributes
+    def counted(nodes, *args, **kwargs):
+        calls.append(len(nodes))
+        return read_attributes(nodes, *args, **kwargs)
+    reader.read_attributes = counted
+    return calls
+
+def test_read_many_uses_one_request(flowmatic):
+    flowmatic.write({"error_no_printhead": 7, "error_printhead": True})
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        calls = _count_reads(printhead)
+        values = printhead.read_many(["error_no_printhead", "error_printhead", "Ready_for_operation_printhead", "error_no_printhead"])
+        assert calls == [3]
+        assert values == {"error_no_printhead": 7, "error_printhead": True, "Ready_for_operation_printhead": True}
+    finally:
+        printhead.disconnect()
+
+def test_read_many_unsupported_variable(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        calls = _count_reads(printhead)
+        assert printhead.read_many(["not_on_this_machine"]) == {"not_on_this_machine": None}
+        assert calls == []
+    finally:
+        printhead.disconnect()
+
+def test_snapshot_converts_like_the_properties(flowmatic):
+    flowmatic.write({"error_no_printhead": 3, "state_fc_error_printhead": False})
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        calls = _count_reads(printhead)
+        snapshot = printhead.snapshot()
+        assert calls == [len(Printhead.schema())]
+        assert set(snapshot) == set(Printhead.schema())
+        assert snapshot["s_error_no"] == 3 and snapshot["s_ready"] is True
+        assert snapshot["s_fc"] is True # inverted error flag
+        assert printhead.snapshot(["s_error_no", "s_fc"]) == {"s_error_no": printhead.s_error_no, "s_fc": printhead.s_fc}
+    finally:
+        printhead.disconnect()
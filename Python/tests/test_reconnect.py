@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from mtecconnect3dcp import Printhead, Dosingpump
+from conftest import wait_for
+
+@pytest.mark.parametrize("register_nodes", [False, True])
+def test_subscriptions_restored_after_reconnect(flowmatic, fast_reconnect, register_nodes):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint, register_nodes=register_nodes)
+    values = []
+    printhead.subscribe("actual_value_pressure_printhead", lambda value, parameter: values.append(value), 50)
+    assert wait_for(lambda: values)
+
+    flowmatic.stop()
+    assert wait_for(lambda: not printhead._connection.connected)
+    flowmatic.start()
+    assert wait_for(lambda: printhead._connection.connected)
+
+    values.clear()
+    flowmatic.write({"actual_value_pressure_printhead": 12.5})
+    assert wait_for(lambda: 12.5 in values)
+    assert printhead.connection_metrics()["reconnects"] == 1
+    printhead.disconnect()
+
+def test_disconnect_while_offline_is_not_restored(flowmatic, fast_reconnect):
+    printhead, dosingpump = Printhead(), Dosingpump()
+    printhead.connect(flowmatic.endpoint)
+    dosingpump.connect(flowmatic.endpoint)
+    printhead_values, dosingpump_values = [], []
+    printhead.subscribe("actual_value_pressure_printhead", lambda value, parameter: printhead_values.append(value), 50)
+    dosingpump.subscribe("actual_value_pressure_dosingpump", lambda value, parameter: dosingpump_values.append(value), 50)
+    printhead.mirror(["actual_value_printhead"])
+    connection = dosingpump._connection
+
+    flowmatic.stop()
+    assert wait_for(lambda: not connection.connected)
+    printhead.disconnect()
+    assert sorted(item.parameter for item in connection.subscriptions._items.values()) == ["Livebit2extern", "actual_value_pressure_dosingpump"]
+
+    flowmatic.start()
+    assert wait_for(lambda: connection.connected)
+    printhead_values.clear()
+    flowmatic.write({"actual_value_pressure_printhead": 3.0, "actual_value_pressure_dosingpump": 4.0})
+    assert wait_for(lambda: 4.0 in dosingpump_values)
+    assert printhead_values == []
+    dosingpump.disconnect()
+
+def test_disconnect_while_reconnecting_stops_supervisor(flowmatic, fast_reconnect):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    connection = printhead._connection
+    supervisor = connection._supervisor
+    assert supervisor.is_alive()
+
+    flowmatic.stop()
+    assert wait_for(lambda: not connection.connected)
+    printhead.disconnect()
+    assert not supervisor.is_alive()
+    # no session is opened once the server is back
+    flowmatic.start()
+    time.sleep(1.0)
+    assert not connection.connected and not connection._clients_open
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from mtecconnect3dcp import Printhead
+
+def test_only_the_latest_value_is_written(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        channel = printhead.speed_channel(max_rate=5)
+        start = time.perf_counter()
+        for speed in range(1, 101):
+            channel.set(float(speed))
+        assert time.perf_counter() - start < 0.5 # set() does not wait for the writes
+        assert channel.flush(5)
+        metrics = channel.metrics()
+        assert metrics["written"] < 10
+        assert metrics["written"] + metrics["superseded"] == 100
+        assert metrics["errors"] == 0
+        assert printhead.read("set_value_printhead") == 100.0
+    finally:
+        printhead.disconnect()
+
+def test_rate_limit(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        channel = printhead.setpoint_channel("set_value_printhead", "float", max_rate=10)
+        end = time.perf_counter() + 1.0
+        value = 0.0
+        while time.perf_counter() < end:
+            value += 1
+            channel.set(value)
+            time.sleep(0.005)
+        assert channel.flush(5)
+        assert 5 <= channel.metrics()["written"] <= 12
+        assert printhead.read("set_value_printhead") == value
+    finally:
+        printhead.disconnect()
+
+def test_invalid_and_closed(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        with pytest.raises(ValueError):
+            printhead.property_channel("m_speed") # read-only
+        with pytest.raises(ValueError):
+            printhead.setpoint_channel("set_value_printhead", "double")
+        channel = printhead.setpoint_channel("set_value_printhead", "float")
+        with pytest.raises(ValueError): # raised by set(), not by the writer thread
+            channel.set("fast")
+        channel.close()
+        with pytest.raises(RuntimeError):
+            channel.set(1)
+        other = printhead.speed_channel()
+    finally:
+        printhead.disconnect()
+    with pytest.raises(RuntimeError): # closed by disconnect()
+        other.set(1.0)
@@ -0,0 +1,48 @@
+import threading
+
+from mtecconnect3dcp import Printhead
+
+from conftest import wait_for
+
+def test_one_subscription_per_interval(flowmatic):
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        manager = printhead._subscriptions
+        first, second, third = [], [], []
+        a, _ = printhead.subscribe("error_no_printhead", lambda value, parameter: first.append(value), interval=200)
+        b, _ = printhead.subscribe("error_no_printhead", lambda value, parameter: second.append(value), interval=200)
+        c, _ = printhead.subscribe("error_printhead", lambda value, parameter: third.append(value), interval=200)
+        d, _ = printhead.subscribe("error_printhead", lambda value, parameter: None, interval=300)
+        # one monitored item per variable and interval, one subscription per interval
+        assert a.server_handle == b.server_handle != c.server_handle
+        assert d.server_handle is not None
+        assert {200, 300} <= set(manager._subscriptions)
+        assert wait_for(lambda: first and second and third)
+
+        flowmatic.write({"error_no_printhead": 5})
+        assert wait_for(lambda: first[-1] == 5 and second[-1] == 5)
+
+        a.delete()
+        assert b.server_handle is not None and 200 in manager._subscriptions
+        b.delete()
+        c.delete()
+        assert 200 not in manager._subscriptions and 300 in manager._subscriptions
+        d.delete()
+        assert 300 not in manager._subscriptions
+    finally:
+        printhead.disconnect()
+
+def test_late_callback_receives_current_value(flowmatic):
+    flowmatic.write({"error_no_printhead": 9})
+    printhead = Printhead()
+    printhead.connect(flowmatic.endpoint)
+    try:
+        first = threading.Event()
+        printhead.subscribe("error_no_printhead", lambda value, parameter: first.set(), interval=200)
+        assert first.wait(5)
+        late = []
+        printhead.subscribe("error_no_printhead", lambda value, parameter: late.append(value), interval=200)
+        assert wait_for(lambda: late == [9], 5)
+    finally:
+        printhead.disconnect()
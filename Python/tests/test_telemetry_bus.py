@@ -0,0 +1,73 @@
+import os
+import struct
+import subprocess
+import sys
+
+import pytest
+
+from mtecconnect3dcp import TelemetryPublisher, TelemetryReader
+from mtecconnect3dcp.TelemetryBus import _CHANNEL, _PID_OFFSET, _SEQUENCE
+from conftest import wait_for
+
+class _Polled:
+    m_speed = 25.0
+    m_current = 3.5
+
+@pytest.fixture
+def publisher():
+    publisher = TelemetryPublisher(_Polled(), name=f"mtec_test_{os.getpid()}", channels=["m_speed", "m_current"], history=4, interval=10)
+    yield publisher
+    publisher.close()
+
+def test_read_published_values(publisher):
+    with TelemetryReader(publisher.name) as reader:
+        assert reader.channels == ["m_speed", "m_current"]
+        assert wait_for(lambda: reader.values() == {"m_speed": 25.0, "m_current": 3.5}, 5)
+        for i in range(6):
+            publisher.publish("m_speed", i, timestamp=1000.0 + i)
+        assert reader.read("m_speed") == (1005.0, 5.0)
+        assert [value for _, value in reader.history("m_speed")][-4:] == [2.0, 3.0, 4.0, 5.0]
+        assert reader.active
+        publisher.close()
+        assert not reader.active
+        assert reader.read("m_speed") == (1005.0, 5.0) # still mapped
+
+def test_read_from_another_process(publisher):
+    publisher.publish("m_current", 7.25)
+    code = ("import sys; from mtecconnect3dcp import TelemetryReader; "
+            "reader = TelemetryReader(sys.argv[1]); print(reader.read('m_current')[1]); reader.close()")
+    result = subprocess.run([sys.executable, "-c", code, publisher.name], capture_output=True, text=True, timeout=30,
+                            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+    assert result.returncode == 0, result.stderr
+    assert float(result.stdout) in (7.25, 3.5) # the poller may publish again meanwhile
+
+def test_publisher_ended_while_writing(publisher):
+    with TelemetryReader(publisher.name) as reader:
+        assert wait_for(lambda: reader.read("m_speed") is not None, 5)
+        publisher._stopped.set()
+        publisher._poller.join()
+        offset = reader._offsets["m_speed"]
+        with publisher._lock:
+            sequence = _CHANNEL.unpack_from(publisher._memory.buf, offset)[0]
+            _SEQUENCE.pack_into(publisher._memory.buf, offset, sequence + 1) # odd, as if the process ended while writing
+            ended = subprocess.Popen([sys.executable, "-c", "pass"])
+            ended.wait()
+            struct.pack_into("<q", publisher._memory.buf, _PID_OFFSET, ended.pid)
+        assert not reader.active
+        assert reader.read("m_speed") is None
+        assert reader.history("m_speed") == []
+        assert reader.read("m_current") is not None
+
+def test_running_publisher_stuck_while_writing(publisher):
+    with TelemetryReader(publisher.name) as reader:
+        assert wait_for(lambda: reader.read("m_speed") is not None, 5)
+        publisher._stopped.set()
+        publisher._poller.join()
+        offset = reader._offsets["m_speed"]
+        with publisher._lock:
+            sequence = _CHANNEL.unpack_from(publisher._memory.buf, offset)[0]
+            _SEQUENCE.pack_into(publisher._memory.buf, offset, sequence + 1)
+            with pytest.raises(TimeoutError):
+                reader.read("m_speed")
+            _SEQUENCE.pack_into(publisher._memory.buf, offset, sequence + 2)
+        assert reader.read("m_speed") is not None
@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mtecconnect3dcp import TelemetryRecorder
+
+class _Polled:
+    m_speed = 25.0
+
+def test_attach_again_after_detach():
+    recorder = TelemetryRecorder(1000)
+    recorder.attach(_Polled(), ["m_speed"], interval=10)
+    time.sleep(0.2)
+    recorder.detach()
+    first = recorder.metrics()["m_speed"]["recorded"]
+    assert first > 0
+    recorder.attach(_Polled(), ["m_speed"], interval=10)
+    time.sleep(0.2)
+    recorder.detach()
+    assert recorder.metrics()["m_speed"]["recorded"] > first
+
+def test_ring_buffer_keeps_the_latest_samples():
+    recorder = TelemetryRecorder(5)
+    for i in range(8):
+        recorder.record("m_speed", i, timestamp=1000.0 + i)
+    assert recorder.metrics()["m_speed"] == {"samples": 5, "recorded": 8, "overwritten": 3}
+    assert recorder.latest("m_speed") == (1007.0, 7.0)
+    timestamps, values = recorder.window("m_speed")
+    assert list(values) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    timestamps, values = recorder.window("m_speed", 1004.0, 1006.0)
+    assert list(timestamps) == [1004.0, 1005.0] and list(values) == [4.0, 5.0]